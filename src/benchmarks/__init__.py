@@ -0,0 +1,5 @@
+"""
+Benchmarks for fintrack. Run from the src directory, e.g.:
+    `python -m benchmarks.startup`
+    `python -m benchmarks.suite --output baseline.json`
+"""
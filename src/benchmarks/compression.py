@@ -0,0 +1,54 @@
+"""
+Compression benchmark. Saves a synthetic ledger as JSON and CSV with every
+available codec and reports file size, save time and load time.
+
+Usage:
+    `python -m benchmarks.compression [n] [level]`
+"""
+
+from benchmarks import synth
+from fintrack.expense import ExpenseList
+from fintrack import compression
+import argparse
+import pathlib as pl
+import tempfile
+import time
+
+def timed(fn) -> tuple[float, object]:
+    """Returns the wall time of fn() in seconds and its result."""
+
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compression")
+    parser.add_argument("n", type=int, nargs="?", default=1_000_000,
+                        help="expenses in the synthetic ledger")
+    # the levels every codec accepts
+    parser.add_argument("level", type=int, nargs="?", choices=range(1, 10),
+                        metavar="level", help="compression level, 1 to 9")
+    args = parser.parse_args(argv)
+    n, level = args.n, args.level
+    exp = synth.ledger(n)
+
+    print(f"{n} expenses, level {level or 'default'}")
+    print(f"{'file':<16}{'MB':>10}{'ratio':>8}{'save s':>9}{'load s':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in (".json", ".csv"):
+            plain = None
+            for codec in [None] + compression.available():
+                name = f"exp{fmt}{compression.SUFFIXES.get(codec, '')}"
+                path = pl.Path(tmp) / name
+                save_s, _ = timed(lambda: exp.save(path, level))
+                load_s, loaded = timed(lambda: ExpenseList.load(path))
+                assert len(loaded) == n
+
+                size = path.stat().st_size
+                plain = plain or size
+                print(f"{name:<16}{size / 1e6:>10.1f}{plain / size:>8.1f}"
+                      f"{save_s:>9.2f}{load_s:>9.2f}")
+                path.unlink()
+
+if __name__ == "__main__":
+    main()
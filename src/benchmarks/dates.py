@@ -0,0 +1,58 @@
+"""
+Date parsing microbenchmark. Parses the dates of a synthetic ledger (as
+they appear in JSON and CSV files) with strptime, date.fromisoformat, a
+fixed-offset slice parse and the memoized parse_day, then times
+Expense.from_dict, and reports the cost per row.
+
+Usage:
+    `python -m benchmarks.dates [n]`
+"""
+
+from benchmarks import synth
+from fintrack.expense import Expense, parse_day
+import argparse
+import datetime as dt
+import time
+
+def strptime_day(s: str) -> int:
+    return dt.datetime.strptime(s, "%Y-%m-%d").toordinal()
+
+def isoformat_day(s: str) -> int:
+    return dt.date.fromisoformat(s).toordinal()
+
+def slice_day(s: str) -> int:
+    return dt.date(int(s[:4]), int(s[5:7]), int(s[8:10])).toordinal()
+
+def per_row_ns(fn, items: list) -> float:
+    """Returns the best of three runs of fn over items, in ns per item."""
+
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for x in items:
+            fn(x)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e9
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.dates")
+    parser.add_argument("n", type=int, nargs="?", default=200_000,
+                        help="expenses in the synthetic ledger")
+    n = parser.parse_args(argv).n
+    records = [x.to_dict() for x in synth.expenses(n) if x.date is not None]
+    dates = [x["date"] for x in records]
+
+    print(f"{len(dates)} dates, {len(set(dates))} distinct")
+    print(f"{'parser':<24}{'ns/row':>10}")
+    for name, fn in (("strptime", strptime_day),
+                     ("date.fromisoformat", isoformat_day),
+                     ("slice", slice_day),
+                     ("parse_day (memoized)", parse_day)):
+        parse_day.cache_clear()
+        print(f"{name:<24}{per_row_ns(fn, dates):>10.0f}")
+
+    parse_day.cache_clear()
+    print(f"{'Expense.from_dict':<24}{per_row_ns(Expense.from_dict, records):>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Load test for the HTTP server (fintrack.server). Opens a number of
+keep-alive connections to a server on localhost, sends a mix of
+/totals, /expenses, /summary and /rollup requests (and some adds) over all
+of them concurrently, and reports requests per second and latency
+percentiles.
+
+Unless --port is given, a server is started in a separate process on a
+synthetic ledger of --size expenses, so it does not share the client's
+interpreter.
+
+Usage:
+    `python -m benchmarks.loadtest [--requests 20000] [--connections 32]
+        [--size 100000] [--port N] [--writes 0.05]`
+"""
+
+from benchmarks import synth
+import argparse
+import asyncio
+import json
+import os
+import pathlib as pl
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+READS = ("/totals",
+         "/totals?from=2018-01-01&to=2018-03-31",
+         "/totals?category=food",
+         "/expenses?from=2019-06-01&to=2019-06-07&limit=20",
+         "/summary",
+         "/rollup?period=month")
+
+async def request(reader: asyncio.StreamReader,
+                  writer: asyncio.StreamWriter,
+                  method: str,
+                  target: str,
+                  body: bytes = b"") -> int:
+    """Sends one keep-alive request and reads the response. Returns the status."""
+
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        k, _, v = line.decode("latin-1").partition(":")
+        if k.lower() == "content-length":
+            length = int(v)
+    await reader.readexactly(length)
+    return status
+
+async def client(port: int, n: int, writes: float, seed: int,
+                 latencies: list[float]) -> int:
+    """Sends n requests over one connection. Returns the number of errors."""
+
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    errors = 0
+    for _ in range(n):
+        if rng.random() < writes:
+            method, target = "POST", "/expenses"
+            # dated after the synthetic ledger, as new expenses usually are
+            body = json.dumps({"amount" : 5.0, "category" : "food",
+                               "desc" : "load test", "date" : "2025-06-01"}).encode()
+        else:
+            method, target, body = "GET", rng.choice(READS), b""
+        start = time.perf_counter()
+        status = await request(reader, writer, method, target, body)
+        latencies.append(time.perf_counter() - start)
+        errors += status >= 400
+    writer.close()
+    return errors
+
+def start_server(size: int, tmp: pl.Path) -> tuple[subprocess.Popen, int]:
+    """Starts `fintrack serve` on a synthetic ledger. Returns it and its port."""
+
+    path = tmp / "exp.ftb"
+    synth.ledger(size)._write_bin(path)
+    src = pl.Path(__file__).resolve().parents[1]
+    proc = subprocess.Popen([sys.executable, "-m", "fintrack", "serve", str(path),
+                             "--port", "0"],
+                            cwd=tmp, stdout=subprocess.PIPE, text=True,
+                            env={**os.environ, "PYTHONPATH" : str(src)})
+    line = proc.stdout.readline()
+    if not line:
+        raise RuntimeError("Server failed to start.")
+    return proc, int(line.rsplit(":", 1)[1])
+
+def percentile(xs: list[float], p: float) -> float:
+    """p-th percentile of sorted xs, nearest rank."""
+
+    return xs[min(len(xs) - 1, int(len(xs) * p / 100))]
+
+async def run(port: int, requests: int, connections: int, writes: float) -> None:
+    latencies: list[float] = []
+    per = max(1, requests // connections)
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(client(port, per, writes, i, latencies)
+                                    for i in range(connections)))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests over {connections} connections "
+          f"in {seconds:.2f} s, {sum(errors)} errors")
+    print(f"{len(latencies) / seconds:.0f} requests/s")
+    print("latency ms: " + ", ".join(
+            f"p{p} {percentile(latencies, p) * 1e3:.2f}" for p in (50, 90, 99))
+          + f", max {latencies[-1] * 1e3:.2f}")
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadtest")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--size", type=int, default=100_000,
+                        help="expenses in the ledger of the server started")
+    parser.add_argument("--port", type=int, help="use a server already running")
+    parser.add_argument("--writes", type=float, default=0.05,
+                        help="share of requests that add an expense")
+    args = parser.parse_args(argv)
+
+    if args.port is not None:
+        asyncio.run(run(args.port, args.requests, args.connections, args.writes))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        proc, port = start_server(args.size, pl.Path(tmp))
+        try:
+            asyncio.run(run(port, args.requests, args.connections, args.writes))
+        finally:
+            proc.terminate()
+            proc.wait()
+
+if __name__ == "__main__":
+    main()
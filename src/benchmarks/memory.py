@@ -0,0 +1,63 @@
+"""
+Memory benchmark for expense records. Measures bytes per record for
+1M expenses kept as objects the old way (per-instance __dict__ and a copy
+per add), as slotted Expense records, and as ExpenseList columns.
+
+Usage:
+    `python -m benchmarks.memory [n]`
+"""
+
+from benchmarks import synth
+from fintrack.expense import Expense, ExpenseList
+import argparse
+import copy
+import tracemalloc
+
+class LegacyExpense():
+    """Expense as it was before slots: four attributes in a __dict__."""
+
+    def __init__(self, amount, category, desc, date=None):
+        self.__amount = amount
+        self.__category = category
+        self.__desc = desc
+        self.__date = date
+
+def measure(build) -> float:
+    """Returns the bytes still allocated by what build() returns."""
+
+    tracemalloc.start()
+    kept = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory")
+    parser.add_argument("n", type=int, nargs="?", default=1_000_000,
+                        help="expenses to build")
+    n = parser.parse_args(argv).n
+    src = list(synth.expenses(n))
+
+    def legacy():
+        return [copy.copy(LegacyExpense(x.amount, x.category, x.desc, x.date))
+                for x in src]
+
+    def slotted():
+        return [Expense(x.amount, x.category, x.desc, x.date) for x in src]
+
+    def columns():
+        exp = ExpenseList()
+        for x in src:
+            exp.add(x)
+        return exp
+
+    print(f"{n} expenses")
+    print(f"{'layout':<28}{'bytes/record':>14}")
+    for name, build in (("__dict__ objects + copy", legacy),
+                        ("__slots__ Expense", slotted),
+                        ("ExpenseList columns", columns)):
+        print(f"{name:<28}{measure(build) / n:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Startup time benchmark. Compares importing the CLI modules on their own
+(what `python -m fintrack` does now) with importing them plus pandas
+(what it did when pandas was imported at module level), and checks that
+adding expenses, totals and JSON saves never import pandas.
+
+Usage:
+    `python -m benchmarks.startup [runs]`
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+CASES = {
+        "fintrack.cli" : "import fintrack.cli",
+        "fintrack.cli + pandas" : "import fintrack.cli, pandas",
+        }
+
+SESSION = """
+import pathlib as pl, sys, tempfile
+from fintrack.expense import Expense, ExpenseList, Category
+exp = ExpenseList()
+for i in range(3):
+    exp.add(Expense(10 * i, Category.FOOD, "lunch"))
+exp._print_total_expenses()
+exp.to_json(pl.Path(tempfile.mkdtemp()))
+print("pandas" in sys.modules, "numpy" in sys.modules)
+"""
+
+def time_import(code: str, runs: int) -> list[float]:
+    """Times `runs` fresh interpreters running the given code."""
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("runs", type=int, nargs="?", default=10,
+                        help="interpreters started per case")
+    runs = parser.parse_args(argv).runs
+
+    print(f"{'case':<24}{'min ms':>10}{'median ms':>12}")
+    for name, code in CASES.items():
+        times = time_import(code, runs)
+        print(f"{name:<24}{min(times) * 1e3:>10.1f}"
+              f"{statistics.median(times) * 1e3:>12.1f}")
+
+    out = subprocess.run([sys.executable, "-c", SESSION], check=True,
+                         capture_output=True, text=True).stdout.split()
+    print(f"add/total/save JSON imported pandas: {out[-2]}, numpy: {out[-1]}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Benchmark suite for ExpenseList operations. Times adding, JSON and CSV
+loads and saves, and the views on seeded synthetic ledgers of several
+sizes, measuring wall time (best of a few runs) and peak traced memory
+(one separate run under tracemalloc). Results are written as JSON and can
+be compared against a saved baseline; the exit status is 1 if any case got
+slower or bigger than the baseline by more than the threshold.
+
+Usage:
+    `python -m benchmarks.suite [--sizes 1000 100000 1000000] [--runs 3]
+        [--output results.json] [--baseline baseline.json] [--threshold 0.25]`
+
+To record a baseline, run once with --output baseline.json; later runs
+with --baseline baseline.json check against it.
+"""
+
+from benchmarks import synth
+from fintrack.expense import ExpenseList, Category
+from collections.abc import Callable
+import argparse
+import contextlib
+import datetime as dt
+import json
+import os
+import pathlib as pl
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SIZES = (1_000, 100_000, 1_000_000)
+
+THRESHOLD = 0.25
+"""Allowed relative slowdown or memory growth before a case fails."""
+
+MIN_SECONDS = 0.005
+"""Cases faster than this in the baseline are not checked for time,
+their timings are mostly noise."""
+
+VIEW_FROM = dt.date(2018, 1, 1)
+VIEW_TO = dt.date(2018, 3, 31)
+
+Case = Callable[[int, pl.Path], Callable[[], object]]
+"""Prepares a case for a ledger size in a scratch directory and returns
+the function to measure."""
+
+_ledgers: dict[int, ExpenseList] = {}
+
+def ledger(n: int) -> ExpenseList:
+    """Returns a fresh copy of the synthetic ledger of n rows, so no run
+    benefits from caches filled by an earlier one."""
+
+    if n not in _ledgers:
+        _ledgers[n] = synth.ledger(n)
+    new = ExpenseList()
+    new.extend(_ledgers[n])
+    return new
+
+def case_add(n: int, tmp: pl.Path):
+    src = list(ledger(n).exp_list)
+
+    def run():
+        exp = ExpenseList()
+        for x in src:
+            exp.add(x)
+    return run
+
+def case_from_json(n: int, tmp: pl.Path):
+    path = tmp / "exp.json"
+    if not path.exists():
+        ledger(n).save(path)
+    return lambda: ExpenseList.from_json(path)
+
+def case_from_csv(n: int, tmp: pl.Path):
+    path = tmp / "exp.csv"
+    if not path.exists():
+        ledger(n).save(path)
+    return lambda: ExpenseList.from_csv(path)
+
+def case_to_json(n: int, tmp: pl.Path):
+    exp = ledger(n)
+    out = pl.Path(tempfile.mkdtemp(dir=tmp))
+    return lambda: exp.to_json(out)
+
+def case_to_csv(n: int, tmp: pl.Path):
+    exp = ledger(n)
+    out = pl.Path(tempfile.mkdtemp(dir=tmp))
+    return lambda: exp.to_csv(out)
+
+def case_view_all(n: int, tmp: pl.Path):
+    exp = ledger(n)
+    return lambda: exp.view_all()
+
+def case_view_by_date(n: int, tmp: pl.Path):
+    exp = ledger(n)
+    return lambda: exp.view_by_date(VIEW_FROM, VIEW_TO)
+
+def case_view_cat(n: int, tmp: pl.Path):
+    exp = ledger(n)
+    return lambda: exp.view_cat(Category.FOOD)
+
+def case_summary_by_cat(n: int, tmp: pl.Path):
+    exp = ledger(n)
+    return lambda: exp.summary_by_cat()
+
+def case_rollup(n: int, tmp: pl.Path):
+    exp = ledger(n)
+    return lambda: exp.rollup("month", by_cat=True)
+
+CASES: dict[str, Case] = {
+        "add" : case_add,
+        "from_json" : case_from_json,
+        "from_csv" : case_from_csv,
+        "to_json" : case_to_json,
+        "to_csv" : case_to_csv,
+        "view_all" : case_view_all,
+        "view_by_date" : case_view_by_date,
+        "view_cat" : case_view_cat,
+        "summary_by_cat" : case_summary_by_cat,
+        "rollup" : case_rollup
+        }
+
+def measure(case: Case, n: int, runs: int, tmp: pl.Path) -> dict[str, float]:
+    """
+    Measures one case at one size.
+
+    Returns
+    -------
+    dict[str, float]
+        Best wall time in seconds and peak traced memory in bytes.
+    """
+
+    best = float("inf")
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        for _ in range(runs):
+            run = case(n, tmp)
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+
+        run = case(n, tmp)
+        tracemalloc.start()
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {"seconds" : best, "peak_bytes" : peak}
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Lists the regressions of results against a baseline: cases whose time
+    or peak memory grew by more than threshold (relative).
+    """
+
+    failures = []
+    for key, new in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        if (old["seconds"] >= MIN_SECONDS
+                and new["seconds"] > old["seconds"] * (1 + threshold)):
+            failures.append(f"{key}: {old['seconds']:.4f}s -> {new['seconds']:.4f}s")
+        if new["peak_bytes"] > old["peak_bytes"] * (1 + threshold):
+            failures.append(f"{key}: {old['peak_bytes']} B -> {new['peak_bytes']} B peak")
+    return failures
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--runs", type=int, default=3, help="timed runs, best is kept")
+    parser.add_argument("--output", type=pl.Path, help="write results to this JSON file")
+    parser.add_argument("--baseline", type=pl.Path, help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'case':<28}{'seconds':>12}{'peak MB':>10}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in args.cases:
+                key = f"{name}/{n}"
+                results[key] = measure(CASES[name], n, args.runs, pl.Path(tmp))
+                print(f"{key:<28}{results[key]['seconds']:>12.4f}"
+                      f"{results[key]['peak_bytes'] / 1e6:>10.1f}")
+        _ledgers.pop(n, None)
+
+    if args.output is not None:
+        doc = {
+                "meta" : {
+                    "python" : platform.python_version(),
+                    "platform" : platform.platform(),
+                    "date" : dt.datetime.now().isoformat(timespec="seconds"),
+                    "runs" : args.runs
+                    },
+                "results" : results
+                }
+        args.output.write_text(json.dumps(doc, indent=2))
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        failures = compare(results, baseline, args.threshold)
+        for x in failures:
+            print(f"REGRESSION {x}")
+        if failures:
+            return 1
+        print(f"No regressions over {args.threshold:.0%} against {args.baseline}.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
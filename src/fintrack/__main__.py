@@ -2,68 +2,260 @@
 Fintrack app entry point. Prompts the user for input.
 
 Usage:
-    `python -m fintrack`
+    `python -m fintrack [--stats] [--profile FILE] [LEDGER]`
+    `python -m fintrack [--stats] [--profile FILE] COMMAND ...`
+
+LEDGER is an optional JSON, CSV, JSONL, binary ledger or SQLite file, or a
+journaled or partitioned ledger directory, to start with. COMMAND runs one
+of the non-interactive batch commands instead of the menu, see
+fintrack.batch.
+
+--stats records timings, rows and bytes of ledger operations (also enabled
+by the FINTRACK_STATS environment variable, see fintrack.stats); the menu
+shows them on request, batch commands print them to stderr when done.
+--profile runs everything under cProfile and writes the profile to FILE,
+readable with pstats.
 """
 
 from fintrack.expense import ExpenseList
-from fintrack import cli
+from fintrack.db import ExpenseDB
+from fintrack.autosave import AutoSaver
+from fintrack.shared import SharedLedger
+from fintrack import batch, cli, stats
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import contextlib
+import cProfile
 import logging
+import pathlib as pl
+import queue
 import sys
 
-logging.basicConfig(
-        filename="expense_tracker.log",
-        filemode="w",
-        level=logging.INFO,
-        format="%(asctime)s - %(levelname)s - %(message)s"
-        )
+def _start_logging() -> QueueListener:
+    """
+    Sends log records through a queue to a listener thread that writes
+    them to the log file, so logging calls never wait on disk. The listener
+    is stopped, flushing the queue, at exit.
+    """
+
+    handler = logging.FileHandler("expense_tracker.log", mode="w")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(records, handler)
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(records))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+def _close(exp: ExpenseList | ExpenseDB) -> None:
+    """Saves and closes the ledger if it is a database, journaled or shared."""
+
+    if isinstance(exp, ExpenseDB):
+        exp.close()
+    elif exp.journal is not None:
+        exp.journal.close()
+
+def _refresh(exp: ExpenseList | ExpenseDB) -> None:
+    """Picks up the expenses other sessions added to a shared ledger."""
+
+    if not isinstance(exp, ExpenseList) or not isinstance(exp.journal, SharedLedger):
+        return
+    try:
+        n = exp.journal.refresh()
+    except OSError as e:
+        print(f"Failed to read shared ledger: {e}")
+        logging.error(f"Failed to read shared ledger: {e}")
+        return
+    if n:
+        print(f"{n} new expenses from other sessions.")
+
+def _start_autosave(saver: AutoSaver | None) -> AutoSaver | None:
+    """Replaces the autosaver with one for a file the user picks, or turns
+    autosave off on an empty answer. Pending changes are saved first."""
+
+    path = cli.input_autosave()
+    if saver is not None:
+        saver.close()
+    if path is None:
+        print("Autosave off.")
+        return None
+    print(f"Autosaving to {path}.")
+    return AutoSaver(path)
+
+def _parse_flags(argv: list[str]) -> tuple[list[str], str | None]:
+    """Removes the leading --stats and --profile FILE flags from argv and
+    applies --stats. Returns the other arguments and the profile path."""
+
+    profile = None
+    while argv and argv[0] in ("--stats", "--profile"):
+        if argv[0] == "--stats":
+            stats.enable()
+            argv = argv[1:]
+        elif len(argv) < 2:
+            print("--profile needs a file name.")
+            sys.exit(2)
+        else:
+            profile = argv[1]
+            argv = argv[2:]
+    return argv, profile
 
 def main() -> None:
+    _start_logging()
     logging.info("Application started.")
 
-    exp = ExpenseList()
-    while True:
-        cli.print_options()
+    argv, profile = _parse_flags(sys.argv[1:])
+    if profile is None:
+        _run(argv)
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(_run, argv)
+    finally:
+        profiler.dump_stats(profile)
+        logging.info(f"Profile written to {profile}.")
 
+def _run(argv: list[str]) -> None:
+    if argv and argv[0] in batch.COMMANDS:
         try:
-            choice = int(input("Enter option number: "))
-        except ValueError:
-            print("Invalid  input.")
-            continue
-        
-        match choice:
-            case 1:
-                logging.info(f"Choice {choice} - adding expense.")
-                cli.input_add_expense(exp)
-            case 2:
-                logging.info(f"Choice {choice} - view all.")
-                exp.view_all()
-            case 3:
-                logging.info(f"Choice {choice} - filtering by date.")
-                cli.input_expense_by_date(exp)
-            case 4:
-                logging.info(f"Choice {choice} - filtering by category.")
-                cli.input_expense_by_cat(exp)
-            case 5:
-                logging.info(f"Choice {choice} - summary by category.")
-                exp.summary_by_cat()
-            case 6:
-                logging.info(f"Choice {choice} - to JSON.")
-                cli.input_to_json(exp)
-            case 7:
-                logging.info(f"Choice {choice} - to CSV.")
-                cli.input_to_csv(exp)
-            case 8:
-                logging.info(f"Choice {choice} - loading from JSON.")
-                exp = cli.input_load_json()
-            case 9:
-                logging.info(f"Choice {choice} - loading from CSV.")
-                exp = cli.input_load_csv()
-            case 10:
-                logging.info(f"Choice {choice} - exit.")
-                sys.exit(0)
-            case _:
-                print("Invalid number.")
+            status = batch.run(argv)
+        finally:
+            if stats.enabled():
+                stats.print_report(sys.stderr)
+        sys.exit(status)
+
+    exp = None
+    if argv:
+        exp = cli.open_ledger(pl.Path(argv[0]))
+    if exp is None:
+        exp = ExpenseList()
+
+    saver = None
+    # saves, flushes and closes on any way out, EOF and Ctrl-C included
+    try:
+        while True:
+            cli.print_options()
+
+            try:
+                choice = int(input("Enter option number: "))
+            except ValueError:
+                print("Invalid  input.")
                 continue
 
+            if choice == 23:
+                logging.info(f"Choice {choice} - autosave.")
+                saver = _start_autosave(saver)
+                continue
+            if choice == 27:
+                logging.info(f"Choice {choice} - exit.")
+                break
+
+            # the autosave worker copies the ledger only between commands
+            with saver.lock if saver is not None else contextlib.nullcontext():
+                _refresh(exp)
+                match choice:
+                    case 1:
+                        logging.info(f"Choice {choice} - adding expense.")
+                        cli.input_add_expense(exp)
+                    case 2:
+                        logging.info(f"Choice {choice} - view all.")
+                        cli.input_browse(exp)
+                    case 3:
+                        logging.info(f"Choice {choice} - filtering by date.")
+                        cli.input_expense_by_date(exp)
+                    case 4:
+                        logging.info(f"Choice {choice} - filtering by category.")
+                        cli.input_expense_by_cat(exp)
+                    case 5:
+                        logging.info(f"Choice {choice} - summary by category.")
+                        exp.summary_by_cat()
+                    case 6:
+                        logging.info(f"Choice {choice} - to JSON.")
+                        cli.input_to_json(exp)
+                    case 7:
+                        logging.info(f"Choice {choice} - to CSV.")
+                        cli.input_to_csv(exp)
+                    case 8:
+                        logging.info(f"Choice {choice} - to JSONL.")
+                        cli.input_to_jsonl(exp)
+                    case 9:
+                        logging.info(f"Choice {choice} - to binary.")
+                        cli.input_to_bin(exp)
+                    case 10:
+                        logging.info(f"Choice {choice} - loading from JSON.")
+                        _close(exp)
+                        exp = cli.input_load_json()
+                    case 11:
+                        logging.info(f"Choice {choice} - loading from CSV.")
+                        _close(exp)
+                        exp = cli.input_load_csv()
+                    case 12:
+                        logging.info(f"Choice {choice} - loading from JSONL.")
+                        _close(exp)
+                        exp = cli.input_load_jsonl()
+                    case 13:
+                        logging.info(f"Choice {choice} - loading from binary.")
+                        _close(exp)
+                        exp = cli.input_load_bin()
+                    case 14:
+                        logging.info(f"Choice {choice} - converting to binary.")
+                        cli.input_convert_bin()
+                    case 15:
+                        logging.info(f"Choice {choice} - summarizing CSV.")
+                        cli.input_summarize_csv()
+                    case 16:
+                        logging.info(f"Choice {choice} - to SQLite.")
+                        cli.input_to_db(exp)
+                    case 17:
+                        logging.info(f"Choice {choice} - opening SQLite.")
+                        _close(exp)
+                        exp = cli.input_open_db()
+                    case 18:
+                        logging.info(f"Choice {choice} - opening journaled ledger.")
+                        _close(exp)
+                        exp = cli.input_open_journal()
+                    case 19:
+                        logging.info(f"Choice {choice} - to partitioned directory.")
+                        cli.input_to_partitions(exp)
+                    case 20:
+                        logging.info(f"Choice {choice} - loading from partitioned directory.")
+                        _close(exp)
+                        exp = cli.input_load_partitions()
+                    case 21:
+                        logging.info(f"Choice {choice} - importing files in parallel.")
+                        _close(exp)
+                        exp = cli.input_import_files()
+                    case 22:
+                        logging.info(f"Choice {choice} - stats.")
+                        stats.print_report()
+                    case 24:
+                        logging.info(f"Choice {choice} - totals by period.")
+                        cli.input_rollup(exp)
+                    case 25:
+                        logging.info(f"Choice {choice} - opening shared ledger.")
+                        _close(exp)
+                        exp = cli.input_open_shared()
+                    case 26:
+                        logging.info(f"Choice {choice} - filtering CSV.")
+                        cli.input_filter_csv()
+                    case _:
+                        print("Invalid number.")
+
+            if saver is not None and isinstance(exp, ExpenseList):
+                saver.notify(exp)
+    except (EOFError, KeyboardInterrupt):
+        print()
+    finally:
+        if saver is not None:
+            if isinstance(exp, ExpenseList):
+                saver.notify(exp)
+            saver.close()
+        stats.log_report()
+        _close(exp)
+    sys.exit(0)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,125 @@
+"""
+Background autosave for the interactive session. After every change the
+ledger is written to a file by a worker thread, once no further change has
+come for AUTOSAVE_DELAY seconds, so bursts of edits cost one save and the
+prompt never waits for the disk.
+
+The ledger must only be changed while holding AutoSaver.lock; the worker
+takes it just long enough to copy the columns, then writes the copy.
+"""
+
+from fintrack.expense import ExpenseList
+import logging
+import pathlib as pl
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+AUTOSAVE_DELAY = 2.0
+"""Seconds without changes after which the ledger is saved."""
+
+class AutoSaver():
+    def __init__(self, store_path: pl.Path, delay: float = AUTOSAVE_DELAY):
+        """
+        AutoSaver constructor. Starts the worker thread.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            File to save to, in any format ExpenseList.save supports.
+        delay : float, optional
+            Seconds without changes after which the ledger is saved.
+
+        Returns
+        -------
+        AutoSaver
+            A class instance.
+        """
+
+        self.__path = store_path
+        self.__delay = delay
+        self.__lock = threading.Lock()
+        self.__cond = threading.Condition()
+        self.__exp: ExpenseList | None = None
+        self.__seen: tuple[int, int] | None = None
+        self.__pending = False
+        self.__closing = False
+        self.__changed_at = 0.0
+        self.__saves = 0
+        self.__thread = threading.Thread(target=self._loop,
+                                         name="fintrack-autosave",
+                                         daemon=True)
+        self.__thread.start()
+
+    @property
+    def path(self) -> pl.Path:
+        return self.__path
+
+    @property
+    def lock(self) -> threading.Lock:
+        """Lock to hold while changing the ledger."""
+
+        return self.__lock
+
+    @property
+    def saves(self) -> int:
+        """Number of saves written so far."""
+
+        return self.__saves
+
+    def notify(self, exp: ExpenseList) -> None:
+        """
+        Tells the worker the current ledger, which may be a new list or have
+        changed. Saving is scheduled only if it did change. Returns at once.
+        """
+
+        with self.__cond:
+            seen = (id(exp), exp.version)
+            if seen == self.__seen:
+                return
+            self.__seen = seen
+            self.__exp = exp
+            self.__pending = True
+            self.__changed_at = time.monotonic()
+            self.__cond.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self.__cond:
+                while not self.__pending and not self.__closing:
+                    self.__cond.wait()
+                if not self.__pending:
+                    return
+                while not self.__closing:
+                    remaining = self.__changed_at + self.__delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.__cond.wait(remaining)
+                exp = self.__exp
+                self.__pending = False
+            self._save(exp)
+
+    def _save(self, exp: ExpenseList) -> None:
+        """Copies the ledger under the lock and writes the copy."""
+
+        try:
+            with self.__lock:
+                snapshot = ExpenseList()
+                snapshot.extend(exp)
+            if snapshot.save(self.__path):
+                self.__saves += 1
+                logger.info("Autosaved %d expenses to %s.", len(snapshot), self.__path)
+        except OSError as e:
+            logger.error("Autosave to %s failed: %s", self.__path, e)
+        except Exception:
+            # anything else is a bug, but must not stop the worker
+            logger.exception("Autosave to %s failed.", self.__path)
+
+    def close(self) -> None:
+        """Writes any pending change and stops the worker thread."""
+
+        with self.__cond:
+            self.__closing = True
+            self.__cond.notify()
+        self.__thread.join()
@@ -0,0 +1,462 @@
+"""
+Non-interactive subcommands for scripts and cron jobs. Each command opens
+a ledger file, does its work and exits, without prompting.
+
+Usage:
+    `python -m fintrack add LEDGER --amount 12.5 --category food [--desc D] [--date YYYY-MM-DD]`
+    `python -m fintrack import LEDGER [--format csv|jsonl] [FILE]`
+    `python -m fintrack total LEDGER [--from D] [--to D] [--category C]`
+    `python -m fintrack summary LEDGER`
+    `python -m fintrack filter LEDGER [--from D] [--to D] [--category C] [--format csv|jsonl]`
+    `python -m fintrack export LEDGER OUTPUT [--level N]`
+    `python -m fintrack serve LEDGER [--host H] [--port N]`
+
+LEDGER and OUTPUT may be JSON, CSV, JSONL, binary ledger or SQLite files;
+LEDGER may also be a journaled or partitioned ledger directory. JSONL,
+SQLite and journaled ledgers are appended to in place, JSONL ones under the
+lock shared ledgers take (see fintrack.shared); partitioned ledgers
+rewrite only the months that changed; the other formats are rewritten
+atomically. JSON, CSV and JSONL files may be compressed, picked by a .gz,
+.bz2, .xz or .zst suffix (see fintrack.compression). total and summary of
+a partitioned ledger read only the partitions they cannot answer from its
+manifest. import reads records from stdin when FILE is omitted.
+
+serve loads the ledger once and answers HTTP JSON queries from memory until
+interrupted (see fintrack.server); expenses added through it are appended
+to the ledger when it stops, or as they come for journaled ledgers.
+"""
+
+from fintrack.expense import (Expense, ExpenseList, Category, CAT_TO_STR,
+                              STR_TO_CAT, _append_jsonl)
+from fintrack.db import ExpenseDB
+from fintrack import db, compression
+from fintrack.wal import Journal, JournalError
+from fintrack.partition import PartitionedLedger
+import argparse
+import datetime as dt
+import json
+import logging
+import pathlib as pl
+import sys
+
+logger = logging.getLogger(__name__)
+
+COMMANDS = ("add", "import", "total", "summary", "filter", "export", "serve")
+
+class BatchError(Exception):
+    """Raised when a command cannot be completed."""
+
+def _date(s: str) -> dt.date:
+    """argparse type for YYYY-MM-DD dates."""
+
+    try:
+        return dt.date.fromisoformat(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: {s!r}")
+
+def _category(s: str) -> Category:
+    """argparse type for category names."""
+
+    if s not in STR_TO_CAT:
+        raise argparse.ArgumentTypeError(
+                f"invalid category: {s!r} (choose from {', '.join(STR_TO_CAT)})")
+    return STR_TO_CAT[s]
+
+def _level(s: str) -> int:
+    """argparse type for compression levels, in the range of any codec;
+    the codec's own range is checked when writing."""
+
+    lo = min(r[0] for r in compression.LEVEL_RANGES.values())
+    hi = max(r[-1] for r in compression.LEVEL_RANGES.values())
+    try:
+        level = int(s)
+    except ValueError:
+        level = None
+    if level is None or not lo <= level <= hi:
+        raise argparse.ArgumentTypeError(f"invalid level: {s!r} (choose from {lo} to {hi})")
+    return level
+
+def build_parser() -> argparse.ArgumentParser:
+    """Creates the argument parser with one subparser per command."""
+
+    parser = argparse.ArgumentParser(prog="python -m fintrack",
+                                     description="Fintrack batch commands.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def ledger_parser(name: str, help: str) -> argparse.ArgumentParser:
+        p = sub.add_parser(name, help=help)
+        p.add_argument("ledger", type=pl.Path, help="ledger file")
+        return p
+
+    def add_filters(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--from", dest="f", type=_date, help="date from, YYYY-MM-DD")
+        p.add_argument("--to", dest="t", type=_date, help="date to, YYYY-MM-DD")
+        p.add_argument("--category", type=_category, help="category name")
+
+    p = ledger_parser("add", "add one expense")
+    p.add_argument("--amount", type=float, required=True)
+    p.add_argument("--category", type=_category, required=True)
+    p.add_argument("--desc", default="")
+    p.add_argument("--date", type=_date)
+
+    p = ledger_parser("import", "add expenses read from a CSV or JSONL file or stdin")
+    p.add_argument("file", nargs="?", type=pl.Path,
+                   help="file to read, stdin if omitted")
+    p.add_argument("--format", choices=("csv", "jsonl"),
+                   help="format of the records, by default from the file suffix "
+                        "or csv for stdin")
+
+    p = ledger_parser("total", "print the total of expenses")
+    add_filters(p)
+
+    ledger_parser("summary", "print totals by category")
+
+    p = ledger_parser("filter", "print matching expenses to stdout")
+    add_filters(p)
+    p.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+
+    p = ledger_parser("export", "write the ledger to another file")
+    p.add_argument("output", type=pl.Path,
+                   help="file to write, format and compression by suffix")
+    p.add_argument("--level", type=_level, help="compression level")
+
+    p = ledger_parser("serve", "answer HTTP JSON queries from the ledger kept in memory")
+    p.add_argument("--host", help="address to listen on, 127.0.0.1 by default")
+    p.add_argument("--port", type=int, help="port to listen on, 8765 by default, "
+                                            "0 for any free one")
+
+    return parser
+
+def _open(path: pl.Path, create: bool = False) -> ExpenseList | ExpenseDB:
+    """
+    Opens a ledger file.
+
+    Parameters
+    ----------
+    path : pl.Path
+        Ledger file.
+    create : bool, optional
+        Start an empty ledger if the file does not exist, or a journaled
+        one in a directory holding none.
+
+    Raises
+    ------
+    BatchError
+        If the file cannot be opened.
+    """
+
+    if path.suffix == db.SUFFIX:
+        if not create and not path.exists():
+            raise BatchError(f"Path {path} does not exists.")
+        ledger = ExpenseDB.open(path)
+    elif path.is_dir() and PartitionedLedger.is_partitioned(path):
+        try:
+            ledger = PartitionedLedger(path).load()
+        except (KeyError, ValueError) as e:
+            raise BatchError(f"Failed to read {path}: {e}")
+    elif path.is_dir():
+        try:
+            ledger = Journal.open(path, create=create)
+        except JournalError as e:
+            raise BatchError(f"Failed to open {path}: {e}")
+    elif create and not path.exists():
+        ledger = ExpenseList()
+    else:
+        ledger = ExpenseList.load(path)
+
+    if ledger is None:
+        raise BatchError(f"Failed to open {path}.")
+    return ledger
+
+def _is_csv(path: pl.Path) -> bool:
+    """Checks if a ledger is a CSV file, which queries read in chunks."""
+
+    return not path.is_dir() and compression.base_suffix(path) == ".csv"
+
+def _read_csv(read, path: pl.Path, *args):
+    """
+    Runs a chunked CSV reader, ExpenseList.summarize_csv or filter_csv, on
+    a CSV ledger, so the file is never loaded whole.
+
+    Raises
+    ------
+    BatchError
+        If the file is missing or cannot be read.
+    """
+
+    if not path.exists():
+        raise BatchError(f"Path {path} does not exists.")
+    try:
+        result = read(path, *args)
+    except compression.READ_ERRORS as e:
+        raise BatchError(f"Failed to read {path}: {e}")
+    if result is None:
+        raise BatchError(f"Invalid CSV contents in {path}.")
+    return result
+
+def _open_whole(path: pl.Path) -> ExpenseList | ExpenseDB:
+    """
+    Opens a ledger that is about to be rewritten, like _open with create.
+    Loading a CSV file skips invalid rows, which the rewrite would delete,
+    so a CSV ledger with any invalid row is refused.
+
+    Raises
+    ------
+    BatchError
+        If the file cannot be opened or has invalid rows.
+    """
+
+    if not _is_csv(path) or not path.exists():
+        return _open(path, create=True)
+
+    ledger = ExpenseList()
+    skipped = _read_csv(ledger.import_csv, path)
+    if skipped:
+        line, reason = skipped[0]
+        raise BatchError(f"{path} has {len(skipped)} invalid rows (line {line}: "
+                         f"{reason}), which rewriting it would lose. Aborting.")
+    return ledger
+
+def append(path: pl.Path, new: ExpenseList) -> None:
+    """
+    Appends expenses to a ledger file, creating it if missing. JSONL files
+    get new lines and SQLite files new rows; other formats are loaded and
+    rewritten, unless they have rows that cannot be loaded. This function
+    returns nothing.
+
+    Parameters
+    ----------
+    path : pl.Path
+        Ledger file.
+    new : ExpenseList
+        Expenses to append.
+
+    Raises
+    ------
+    BatchError
+        If the ledger cannot be opened or written.
+    """
+
+    if path.suffix == ".jsonl":
+        _append_jsonl(path, new.dump_jsonl)
+        return
+    if path.is_dir() and PartitionedLedger.is_partitioned(path):
+        parts = PartitionedLedger(path)
+        ledger = parts.load()
+        ledger.extend(new)
+        parts.save(ledger)
+        return
+
+    ledger = _open_whole(path)
+    if isinstance(ledger, ExpenseDB):
+        ledger.insert_list(new)
+        ledger.close()
+        return
+
+    ledger.extend(new)
+    if ledger.journal is not None:
+        ledger.journal.close()
+    elif not ledger.save(path):
+        raise BatchError(f"Failed to save {path}.")
+
+def _read_jsonl(f) -> tuple[ExpenseList, list[tuple[int, str]]]:
+    """Parses JSONL records from an open file, skipping invalid lines."""
+
+    new = ExpenseList()
+    skipped = []
+    for n, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            new.add(Expense.from_dict(json.loads(line)))
+        except (KeyError, TypeError, ValueError) as e:
+            skipped.append((n, str(e) or type(e).__name__))
+    return new, skipped
+
+def _read_records(path: pl.Path | None, fmt: str | None) -> ExpenseList:
+    """Reads CSV or JSONL records from a file or stdin, reporting skipped ones."""
+
+    if fmt is None:
+        fmt = ("jsonl" if path is not None and compression.base_suffix(path) == ".jsonl"
+               else "csv")
+
+    try:
+        src = sys.stdin if path is None else compression.open_text(path, "r", newline="")
+        try:
+            if fmt == "jsonl":
+                new, skipped = _read_jsonl(src)
+            else:
+                new = ExpenseList()
+                skipped = new.import_csv(src)
+                if skipped is None:
+                    raise BatchError("Invalid CSV contents.")
+        finally:
+            if path is not None:
+                src.close()
+    except compression.READ_ERRORS as e:
+        raise BatchError(f"Failed to read {path}: {e}")
+
+    for line, reason in skipped:
+        print(f"Skipped line {line}: {reason}.", file=sys.stderr)
+    return new
+
+def cmd_add(args: argparse.Namespace) -> None:
+    if args.amount < 0:
+        raise BatchError("Amount cannot be negative.")
+    new = ExpenseList([Expense(args.amount, args.category, args.desc, args.date)])
+    append(args.ledger, new)
+    logger.info("Expense added to %s.", args.ledger)
+
+def cmd_import(args: argparse.Namespace) -> None:
+    new = _read_records(args.file, args.format)
+    append(args.ledger, new)
+    print(f"Imported {len(new)} expenses.")
+    logger.info("Imported %d expenses to %s.", len(new), args.ledger)
+
+def cmd_total(args: argparse.Namespace) -> None:
+    if args.category is None and PartitionedLedger.is_partitioned(args.ledger):
+        print(PartitionedLedger(args.ledger).total(args.f, args.t))
+        return
+    if _is_csv(args.ledger):
+        summary = _read_csv(ExpenseList.summarize_csv, args.ledger, args.f, args.t)
+        print(summary["total"] if args.category is None
+              else summary["by_cat"][args.category])
+        return
+
+    ledger = _open(args.ledger)
+    total = ledger.total(args.f, args.t, args.category)
+    if isinstance(ledger, ExpenseDB):
+        ledger.close()
+    print(total)
+
+def cmd_summary(args: argparse.Namespace) -> None:
+    if PartitionedLedger.is_partitioned(args.ledger):
+        sums = PartitionedLedger(args.ledger).totals_by_cat()
+        for cat, c in CAT_TO_STR.items():
+            print(f"{c}: {sums[cat]}")
+        return
+
+    ledger = _open(args.ledger)
+    if isinstance(ledger, ExpenseDB):
+        sums = ledger.totals_by_cat()
+        ledger.close()
+    else:
+        sums = ledger.totals()["by_cat"]
+    for cat, c in CAT_TO_STR.items():
+        print(f"{c}: {sums[cat]}")
+
+def cmd_filter(args: argparse.Namespace) -> None:
+    if _is_csv(args.ledger):
+        found = _read_csv(ExpenseList.filter_csv, args.ledger,
+                          args.f, args.t, args.category)
+    else:
+        ledger = _open(args.ledger)
+        found = ledger.select(args.f, args.t, args.category)
+        if isinstance(ledger, ExpenseDB):
+            ledger.close()
+    if args.format == "jsonl":
+        found.dump_jsonl(sys.stdout)
+    else:
+        found.dump_csv(sys.stdout)
+
+def cmd_export(args: argparse.Namespace) -> None:
+    ledger = _open(args.ledger)
+    if isinstance(ledger, ExpenseDB):
+        exp = ledger.to_list()
+        ledger.close()
+    else:
+        exp = ledger
+
+    if args.output.suffix == db.SUFFIX:
+        if args.output.exists():
+            raise BatchError("File already exists. Aborting.")
+        out = ExpenseDB(args.output)
+        out.insert_list(exp)
+        out.close()
+    elif not exp.save(args.output, args.level):
+        raise BatchError(f"Failed to save {args.output}.")
+
+class _Appender():
+    """
+    Writes every expense added to a list straight to a ledger file, see
+    append(). Attached to the list in place of a journal, so adds are on
+    disk before they are acknowledged.
+    """
+
+    def __init__(self, path: pl.Path):
+        self.__path = path
+
+    def log_rows(self, exp: ExpenseList, start: int, stop: int) -> None:
+        append(self.__path, exp._take(range(start, stop)))
+
+    def close(self) -> None:
+        pass
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    # asyncio takes long to import, only the server needs it
+    import asyncio
+    from fintrack import server
+
+    ledger = _open(args.ledger)
+    if isinstance(ledger, ExpenseDB):
+        exp = ledger.to_list()
+        ledger.close()
+    else:
+        exp = ledger
+    loaded = len(exp)
+    # JSONL and SQLite ledgers take new rows without being rewritten, so
+    # adds are written as they come; other formats are saved on stop
+    if exp.journal is None and args.ledger.suffix in (".jsonl", db.SUFFIX):
+        exp.attach_journal(_Appender(args.ledger))
+
+    srv = server.LedgerServer(exp,
+                              server.HOST if args.host is None else args.host,
+                              server.PORT if args.port is None else args.port)
+    try:
+        asyncio.run(srv.run())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    except OSError as e:
+        raise BatchError(f"Failed to serve: {e}")
+    finally:
+        logger.info("Server answered %d requests.", srv.requests)
+        if exp.journal is not None:
+            exp.journal.close()
+        elif len(exp) > loaded:
+            append(args.ledger, exp._take(range(loaded, len(exp))))
+            print(f"Saved {len(exp) - loaded} new expenses.")
+
+_HANDLERS = {
+        "add" : cmd_add,
+        "import" : cmd_import,
+        "total" : cmd_total,
+        "summary" : cmd_summary,
+        "filter" : cmd_filter,
+        "export" : cmd_export,
+        "serve" : cmd_serve
+        }
+
+def run(argv: list[str]) -> int:
+    """
+    Parses and runs one command.
+
+    Parameters
+    ----------
+    argv : list[str]
+        Command line arguments, without the program name.
+
+    Returns
+    -------
+    int
+        Exit status: 0 on success, 1 on failure.
+    """
+
+    args = build_parser().parse_args(argv)
+    logger.info("Batch command %s.", args.command)
+    try:
+        _HANDLERS[args.command](args)
+    except BatchError as e:
+        print(e, file=sys.stderr)
+        logger.error("Batch command %s failed: %s", args.command, e)
+        return 1
+    return 0
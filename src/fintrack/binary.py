@@ -0,0 +1,155 @@
+"""
+Fixed-width binary ledger format, read through mmap.
+
+Layout (native byte order, every section starts on an 8 byte boundary):
+    header    magic, version, row count, description count, heap size
+    amounts   float64 per row
+    dates     int32 day number per row
+    cats      int8 category value per row
+    descs     int32 description code per row
+    offsets   uint64 per distinct description, plus one end offset
+    heap      UTF-8 bytes of the distinct descriptions
+
+Descriptions are stored once each in the heap and rows refer to them by
+code, so recurring ones cost 4 bytes per row.
+"""
+
+from collections.abc import Sequence
+import array
+import mmap
+import pathlib as pl
+import struct
+
+MAGIC = b"FTRK"
+VERSION = 1
+SUFFIX = ".ftb"
+
+_HEADER = struct.Struct("=4sHxxQQQ")
+
+class BinaryFormatError(ValueError):
+    """Raised when a file is not a valid binary ledger."""
+
+def _pad(n: int) -> int:
+    """Rounds n up to a multiple of 8."""
+
+    return (n + 7) & ~7
+
+class StringTable(Sequence):
+    """
+    Read-only table of the distinct descriptions, indexed by code and
+    decoded on access from the mapped heap. Each description is decoded at
+    most once.
+    """
+
+    def __init__(self, offsets: memoryview, heap: memoryview):
+        self.__offsets = offsets
+        self.__heap = heap
+        self.__decoded: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.__offsets) - 1
+
+    def __getitem__(self, code):
+        if isinstance(code, slice):
+            return [self[x] for x in range(*code.indices(len(self)))]
+        if not 0 <= code < len(self):
+            raise IndexError("description code out of range")
+
+        s = self.__decoded.get(code)
+        if s is None:
+            s = str(self.__heap[self.__offsets[code]:self.__offsets[code + 1]],
+                    "utf-8")
+            self.__decoded[code] = s
+        return s
+
+def write(store_path: pl.Path,
+          amounts: Sequence[float],
+          cats: Sequence[int],
+          dates: Sequence[int],
+          codes: Sequence[int],
+          table: Sequence[str]) -> None:
+    """
+    Writes columns to a binary ledger file. This function returns nothing.
+
+    Parameters
+    ----------
+    store_path : pl.Path
+        Path of the file to write.
+    amounts : Sequence[float]
+        Amount column.
+    cats : Sequence[int]
+        Category value column.
+    dates : Sequence[int]
+        Day number column.
+    codes : Sequence[int]
+        Description code column, indexes into table.
+    table : Sequence[str]
+        Distinct descriptions.
+    """
+
+    n = len(amounts)
+    encoded = [d.encode("utf-8") for d in table]
+    offsets = [0]
+    for b in encoded:
+        offsets.append(offsets[-1] + len(b))
+
+    with open(store_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, n, len(encoded), offsets[-1]))
+        for fmt, col in (("d", amounts), ("i", dates), ("b", cats), ("i", codes)):
+            raw = array.array(fmt, col).tobytes()
+            f.write(raw + bytes(_pad(len(raw)) - len(raw)))
+        f.write(array.array("Q", offsets).tobytes())
+        f.write(b"".join(encoded))
+
+def open_mapped(store_path: pl.Path):
+    """
+    Maps a binary ledger file into memory. Nothing is read or parsed
+    beyond the header, so this takes the same time for any row count.
+
+    Parameters
+    ----------
+    store_path : pl.Path
+        Path to the binary ledger file.
+
+    Returns
+    -------
+    tuple
+        The mmap object, zero-copy views of the amount ('d'), category
+        ('b'), date ('i') and description code ('i') columns, and a
+        StringTable of the distinct descriptions.
+
+    Raises
+    ------
+    BinaryFormatError
+        If the file is not a binary ledger or is truncated.
+    """
+
+    with open(store_path, "rb") as f:
+        if store_path.stat().st_size < _HEADER.size:
+            raise BinaryFormatError("File too short.")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, n, n_descs, heap_size = _HEADER.unpack_from(mm)
+    if magic != MAGIC or version != VERSION:
+        mm.close()
+        raise BinaryFormatError("Not a fintrack binary ledger.")
+
+    sizes = (8 * n, 4 * n, n, 4 * n, 8 * (n_descs + 1), heap_size)
+    if _HEADER.size + sum(_pad(x) for x in sizes[:-1]) + heap_size > len(mm):
+        mm.close()
+        raise BinaryFormatError("File is truncated.")
+
+    buf = memoryview(mm)
+    pos = _HEADER.size
+    sections = []
+    for size in sizes:
+        sections.append(buf[pos:pos + size])
+        pos += _pad(size)
+
+    amounts, dates, cats, codes, offsets, heap = sections
+    return (mm,
+            amounts.cast("d"),
+            cats.cast("b"),
+            dates.cast("i"),
+            codes.cast("i"),
+            StringTable(offsets.cast("Q"), heap))
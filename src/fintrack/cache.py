@@ -0,0 +1,140 @@
+"""
+Cache of query results (DataFrames) for the ExpenseList views.
+
+Entries are keyed by query kind and parameters and evicted least recently
+used first once either the entry count or the memory cap is exceeded. Each
+lookup carries the list's version counter; any change of it drops every
+entry, so mutating the list invalidates the cache without tracking which
+queries it affects. The most recent result is memoized separately and
+survives even if it is too large for the cap.
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, TypedDict
+import sys
+
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+"""Default memory cap of a query cache, in bytes."""
+
+CACHE_MAX_ENTRIES = 32
+"""Default maximum number of cached query results."""
+
+class CacheStats(TypedDict):
+    """TypedDict for the counters of a query cache."""
+
+    hits: int
+    misses: int
+    entries: int
+    bytes: int
+
+def _size(value: Any) -> int:
+    """Estimates the memory used by a cached result."""
+
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+    return sys.getsizeof(value)
+
+class QueryCache():
+    def __init__(self,
+                 max_bytes: int = CACHE_MAX_BYTES,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        """
+        QueryCache constructor.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Memory cap of the cached results.
+        max_entries : int, optional
+            Maximum number of cached results.
+
+        Returns
+        -------
+        QueryCache
+            A class instance.
+        """
+
+        self.__max_bytes = max_bytes
+        self.__max_entries = max_entries
+        self.__entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self.__bytes = 0
+        self.__version = -1
+        self.__last: tuple[Hashable, Any] | None = None
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def stats(self) -> CacheStats:
+        """Returns the hit and miss counters and the current cache size."""
+
+        return {
+                "hits" : self.__hits,
+                "misses" : self.__misses,
+                "entries" : len(self.__entries),
+                "bytes" : self.__bytes
+                }
+
+    def clear(self) -> None:
+        """Drops every cached result. The counters are kept."""
+
+        self.__entries.clear()
+        self.__bytes = 0
+        self.__last = None
+
+    def get(self, version: int, key: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Returns the cached result of a query, building and caching it on a
+        miss. Results must be treated as read-only by the caller.
+
+        Parameters
+        ----------
+        version : int
+            Version counter of the queried list. A new version drops all
+            entries cached under an older one.
+        key : Hashable
+            Query kind and parameters.
+        build : Callable[[], Any]
+            Computes the result on a miss.
+
+        Returns
+        -------
+        Any
+            The query result.
+        """
+
+        if version != self.__version:
+            self.clear()
+            self.__version = version
+
+        if self.__last is not None and self.__last[0] == key:
+            self.__hits += 1
+            return self.__last[1]
+
+        entry = self.__entries.get(key)
+        if entry is not None:
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+            self.__last = (key, entry[0])
+            return entry[0]
+
+        self.__misses += 1
+        value = build()
+        self.__last = (key, value)
+
+        size = _size(value)
+        if size <= self.__max_bytes:
+            self.__entries[key] = (value, size)
+            self.__bytes += size
+            while (self.__bytes > self.__max_bytes
+                   or len(self.__entries) > self.__max_entries):
+                _, (_, evicted) = self.__entries.popitem(last=False)
+                self.__bytes -= evicted
+        return value
@@ -1,4 +1,11 @@
-from fintrack.expense import Expense, ExpenseList
+from fintrack.expense import (Expense, ExpenseList, CAT_TO_STR, CSV_CHUNK_SIZE,
+                              IMPORT_SUFFIXES, ROLLUP_PERIODS)
+from fintrack.db import ExpenseDB
+from fintrack import db, compression
+from fintrack.wal import Journal, JournalError
+from fintrack.partition import PartitionedLedger
+from fintrack.pager import Pager
+from fintrack.shared import SharedLedger
 import datetime as dt
 import pathlib as pl
 import logging
@@ -10,15 +17,32 @@ def print_options() -> None:
 
     print()
     print("1.  Add expense")
-    print("2.  View all expenses")
+    print("2.  Browse all expenses")
     print("3.  View expenses by date")
     print("4.  View expenses by category")
     print("5.  View expenses summary by category")
     print("6.  Save to JSON")
     print("7.  Save to CSV")
-    print("8.  Load from JSON")
-    print("9.  Load from CSV")
-    print("10. Exit")
+    print("8.  Save to JSONL")
+    print("9.  Save to binary")
+    print("10. Load from JSON")
+    print("11. Load from CSV")
+    print("12. Load from JSONL")
+    print("13. Load from binary")
+    print("14. Convert a file to binary")
+    print("15. Summarize a CSV file without loading it")
+    print("16. Save to SQLite")
+    print("17. Open SQLite database")
+    print("18. Open journaled ledger directory")
+    print("19. Save to partitioned directory")
+    print("20. Load from partitioned directory")
+    print("21. Import many files in parallel")
+    print("22. Show timing stats")
+    print("23. Autosave after changes")
+    print("24. View totals by day, week, month or year")
+    print("25. Open shared ledger file")
+    print("26. Filter a CSV file without loading it")
+    print("27. Exit")
     print()
 
 def _input_date() -> dt.date | None:
@@ -108,6 +132,54 @@ def input_add_expense(exp: ExpenseList) -> None:
     exp.add(Expense(amt, cat, desc, date))
     logging.info("Expense added succesfully")
 
+def input_browse(exp: ExpenseList | ExpenseDB) -> None:
+    """
+    Shows the expenses page by page, reading navigation commands from the
+    user until they quit. A database is shown with its view_all instead.
+    This function returns nothing.
+
+    Parameters
+    ----------
+    exp : ExpenseList or ExpenseDB
+        Expenses to browse.
+    """
+
+    if isinstance(exp, ExpenseDB):
+        exp.view_all()
+        return
+
+    logging.info("Browsing expenses.")
+
+    pager = Pager(exp)
+    while True:
+        print(pager.render())
+        cmd = input("[n]ext, [p]revious, [f]irst, [l]ast, page number, "
+                    "[d]ate, [o]rder, [q]uit: ").strip().lower()
+        match cmd:
+            case "n" | "":
+                if not pager.next():
+                    print("This is the last page.")
+            case "p":
+                if not pager.prev():
+                    print("This is the first page.")
+            case "f":
+                pager.first()
+            case "l":
+                pager.last()
+            case "d":
+                d = _input_date()
+                if d is not None and not pager.jump_to_date(d):
+                    print("No expenses on or after that date.")
+            case "o":
+                pager.sort_by_date(not pager.by_date)
+            case "q":
+                break
+            case _ if cmd.isdigit():
+                if not pager.go(int(cmd) - 1):
+                    print("No such page.")
+            case _:
+                print("Invalid command.")
+
 def input_expense_by_date(exp: ExpenseList) -> None:
     """
     Filters and prints expenses by date, based on user input.
@@ -156,6 +228,30 @@ def input_expense_by_cat(exp: ExpenseList) -> None:
         return
     exp.view_cat(cat)
 
+def input_rollup(exp: ExpenseList | ExpenseDB) -> None:
+    """
+    Prints the totals by a period chosen by the user, optionally split by
+    category. This function returns nothing.
+
+    Parameters
+    ----------
+    exp : ExpenseList or ExpenseDB
+        Expenses to sum up.
+    """
+
+    logging.info("Viewing totals by period.")
+
+    period = input(f"Enter period ({', '.join(ROLLUP_PERIODS)}): ").strip().lower()
+    if period not in ROLLUP_PERIODS:
+        print("Invalid period.")
+        return
+
+    by_cat = None
+    while by_cat != "y" and by_cat != "n":
+        by_cat = input("Split by category? (y/n) ")
+
+    exp.view_rollup(period, by_cat == "y")
+
 def input_to_json(exp: ExpenseList) -> None:
     """
     Saves the expense list to JSON, to the location provided by the user.
@@ -229,3 +325,471 @@ def input_load_csv() -> ExpenseList:
         print("Failed to load.")
         logging.info("Failed to load from CSV.")
     return exp
+
+def input_to_jsonl(exp: ExpenseList) -> None:
+    """
+    Saves the expense list to JSONL, to the location provided by the user.
+    Expenses already saved there by this list are not written again.
+    This function returns nothing.
+
+    exp : ExpenseList
+        List of expenses to save.
+    """
+
+    logging.info("Saving to JSONL.")
+
+    path = input("Store path: ")
+    exp.to_jsonl(pl.Path(path))
+
+def input_load_jsonl() -> ExpenseList:
+    """
+    Loads an expense list from JSONL file. Path to the file is provided
+    by the user. This function takes no parameters.
+
+    Returns
+    -------
+    ExpenseList
+        The expense list object created from loaded JSONL contents.
+    """
+
+    logging.info("Loading from JSONL.")
+
+    print("Warning: this will overwrite the current expense list.")
+    exp = None
+    path = input("Enter a path to the JSONL file of expenses: ")
+    exp = ExpenseList.from_jsonl(pl.Path(path))
+    if exp is None:
+        exp = ExpenseList()
+        print("Failed to load.")
+        logging.info("Failed to load from JSONL.")
+    return exp
+
+def input_to_bin(exp: ExpenseList) -> None:
+    """
+    Saves the expense list to a binary ledger, to the location provided by
+    the user. This function returns nothing.
+
+    exp : ExpenseList
+        List of expenses to save.
+    """
+
+    logging.info("Saving to binary.")
+
+    path = input("Store path: ")
+    exp.to_bin(pl.Path(path))
+
+def input_load_bin() -> ExpenseList:
+    """
+    Opens an expense list from a binary ledger file. Path to the file is
+    provided by the user. This function takes no parameters.
+
+    Returns
+    -------
+    ExpenseList
+        The expense list object backed by the memory mapped file.
+    """
+
+    logging.info("Loading from binary.")
+
+    print("Warning: this will overwrite the current expense list.")
+    exp = None
+    path = input("Enter a path to the binary ledger file: ")
+    exp = ExpenseList.from_bin(pl.Path(path))
+    if exp is None:
+        exp = ExpenseList()
+        print("Failed to load.")
+        logging.info("Failed to load from binary.")
+    return exp
+
+def input_convert_bin() -> None:
+    """
+    Converts a JSON, CSV or JSONL file of expenses to a binary ledger.
+    Both paths are provided by the user. This function takes no parameters
+    and returns nothing.
+    """
+
+    logging.info("Converting to binary.")
+
+    src = input("Enter a path to the JSON, CSV or JSONL file of expenses: ")
+    exp = ExpenseList.load(pl.Path(src))
+    if exp is None:
+        print("Failed to load.")
+        logging.info("Failed to load file to convert.")
+        return
+
+    path = input("Store path: ")
+    exp.to_bin(pl.Path(path))
+
+def _input_csv_chunks() -> tuple[pl.Path, int, dt.date | None, dt.date | None] | None:
+    """
+    Prompts for a CSV file to read in chunks, the chunk size and an
+    optional time period.
+
+    Returns
+    -------
+    tuple[pl.Path, int, dt.date or None, dt.date or None] or None
+        Path, chunk size, date from and date to, or None on invalid input.
+    """
+
+    path = pl.Path(input("Enter a path to the CSV file of expenses: "))
+    if not path.exists():
+        print(f"Path {path} does not exists.")
+        return None
+
+    chunk = input(f"Enter chunk size (default {CSV_CHUNK_SIZE}): ")
+    try:
+        chunk_size = int(chunk) if chunk else CSV_CHUNK_SIZE
+    except ValueError:
+        print("Enter a numeric value.")
+        return None
+    if chunk_size <= 0:
+        print("Chunk size needs to be positive.")
+        return None
+
+    f = t = None
+    want_date = None
+    while want_date != "y" and want_date != "n":
+        want_date = input("Do you want to limit the time period? (y/n) ")
+
+    if want_date == "y":
+        print("Date FROM")
+        f = _input_date()
+        if f is None:
+            return None
+        print("Date TO")
+        t = _input_date()
+        if t is None:
+            return None
+
+    return path, chunk_size, f, t
+
+def input_summarize_csv() -> None:
+    """
+    Prints totals of a CSV file of expenses, read in chunks so the file is
+    never fully loaded. Path, chunk size and an optional time period are
+    provided by the user. This function takes no parameters and returns
+    nothing.
+    """
+
+    logging.info("Summarizing CSV in chunks.")
+
+    args = _input_csv_chunks()
+    if args is None:
+        return
+    path, chunk_size, f, t = args
+
+    summary = ExpenseList.summarize_csv(path, f, t, chunk_size)
+    if summary is None:
+        print("Invalid CSV contents.")
+        logging.info("Failed to summarize CSV.")
+        return
+
+    print(f"Expenses: {summary['rows']} (skipped {summary['skipped']} invalid rows)")
+    print(f"Total expenses: {summary['total']}")
+    print("Summary of expenses by category:")
+    for cat, c in CAT_TO_STR.items():
+        print(f"{c}: {summary['by_cat'][cat]}")
+
+def input_filter_csv() -> None:
+    """
+    Browses the expenses of a CSV file matching an optional time period
+    and category, read in chunks so only the matching rows are kept in
+    memory. This function takes no parameters and returns nothing.
+    """
+
+    logging.info("Filtering CSV in chunks.")
+
+    args = _input_csv_chunks()
+    if args is None:
+        return
+    path, chunk_size, f, t = args
+
+    cat = None
+    name = input("Enter category (rent, food, health, lifestyle, savings, "
+                 "leisure) or leave empty for all: ")
+    if name:
+        cat = ExpenseList.str_to_cat(name)
+        if cat is None:
+            return
+
+    found = ExpenseList.filter_csv(path, f, t, cat, chunk_size)
+    if found is None:
+        print("Invalid CSV contents.")
+        logging.info("Failed to filter CSV.")
+        return
+    input_browse(found)
+
+def open_ledger(path: pl.Path) -> ExpenseList | ExpenseDB | None:
+    """
+    Opens a ledger file of any supported format. SQLite databases are
+    opened in place, journaled ledger directories with their journal, other
+    formats are loaded into an ExpenseList.
+
+    Parameters
+    ----------
+    path : pl.Path
+        Path to the ledger file.
+
+    Returns
+    -------
+    ExpenseList or ExpenseDB or None
+        The opened ledger, None if it could not be opened. Partitioned
+        ledger directories are loaded whole.
+    """
+
+    if path.suffix == db.SUFFIX:
+        return ExpenseDB.open(path)
+    if path.is_dir() and PartitionedLedger.is_partitioned(path):
+        return _load_partitions(path)
+    if path.is_dir():
+        return _open_journal(path)
+    return ExpenseList.load(path)
+
+def input_to_db(exp: ExpenseList | ExpenseDB) -> None:
+    """
+    Saves the expense list, or a copy of the open database, to a new
+    SQLite database, in the location provided by the user. This function
+    returns nothing.
+
+    exp : ExpenseList or ExpenseDB
+        Expenses to save.
+    """
+
+    logging.info("Saving to SQLite.")
+
+    path = pl.Path(input("Store path: "))
+    if not path.is_dir():
+        print(f"Path {path} does not point to a directory.")
+        return
+
+    path = path / f"exp{db.SUFFIX}"
+    if path.exists():
+        print("File already exists. Aborting.")
+        return
+
+    new = ExpenseDB(path)
+    new.insert_list(exp)
+    new.close()
+
+def input_open_db() -> ExpenseList | ExpenseDB:
+    """
+    Opens a SQLite database of expenses, creating it if missing. Path to
+    the file is provided by the user. The session then works on the
+    database directly. This function takes no parameters.
+
+    Returns
+    -------
+    ExpenseDB or ExpenseList
+        The opened database, or an empty list if it could not be opened.
+    """
+
+    logging.info("Opening SQLite database.")
+
+    print("Warning: this will overwrite the current expense list.")
+    path = input("Enter a path to the database file: ")
+    exp = ExpenseDB.open(pl.Path(path))
+    if exp is None:
+        print("Failed to open.")
+        logging.info("Failed to open SQLite database.")
+        return ExpenseList()
+    return exp
+
+def _open_journal(path: pl.Path, create: bool = False) -> ExpenseList | None:
+    """Opens a journaled ledger directory, None if it cannot be recovered.
+    A new one is started in a directory holding none only if create is set."""
+
+    try:
+        return Journal.open(path, create=create)
+    except (JournalError, OSError) as e:
+        print(f"Failed to open journaled ledger: {e}")
+        logging.error(f"Failed to open journaled ledger {path}: {e}")
+        return None
+
+def input_open_journal() -> ExpenseList:
+    """
+    Opens a journaled ledger directory, creating it if missing. Path to
+    the directory is provided by the user. Every expense added afterwards
+    is journaled to it. This function takes no parameters.
+
+    Returns
+    -------
+    ExpenseList
+        The recovered expense list, or an empty list if recovery failed.
+    """
+
+    logging.info("Opening journaled ledger.")
+
+    print("Warning: this will overwrite the current expense list.")
+    path = input("Enter a path to the ledger directory: ")
+    exp = _open_journal(pl.Path(path), create=True)
+    if exp is None:
+        print("Failed to open.")
+        return ExpenseList()
+    return exp
+
+def input_open_shared() -> ExpenseList:
+    """
+    Opens a JSONL ledger file shared with other sessions, creating it if
+    missing. Path to the file is provided by the user. Every expense added
+    afterwards is appended to it, and expenses other sessions add show up
+    before each command. This function takes no parameters.
+
+    Returns
+    -------
+    ExpenseList
+        The expenses in the file, or an empty list if it cannot be opened.
+    """
+
+    logging.info("Opening shared ledger.")
+
+    print("Warning: this will overwrite the current expense list.")
+    path = pl.Path(input("Enter a path to the shared JSONL file: "))
+    if path.suffix != ".jsonl":
+        print(f"Path {path} does not point to a JSONL file.")
+        return ExpenseList()
+
+    try:
+        return SharedLedger.open(path)
+    except OSError as e:
+        print(f"Failed to open shared ledger: {e}")
+        logging.error(f"Failed to open shared ledger {path}: {e}")
+        return ExpenseList()
+
+def input_to_partitions(exp: ExpenseList | ExpenseDB) -> None:
+    """
+    Saves the expense list to a partitioned ledger directory provided by
+    the user, one file per month. Only the partitions that changed since
+    the last save to that directory are rewritten. This function returns
+    nothing.
+
+    exp : ExpenseList or ExpenseDB
+        List of expenses to save.
+    """
+
+    logging.info("Saving to partitioned directory.")
+
+    path = pl.Path(input("Store path: "))
+    if not path.is_dir():
+        print(f"Path {path} does not point to a directory.")
+        return
+
+    if isinstance(exp, ExpenseDB):
+        exp = exp.to_list()
+    try:
+        written = PartitionedLedger(path).save(exp)
+    except (ValueError, OSError) as e:
+        print(f"Failed to save: {e}")
+        logging.error(f"Failed to save partitions to {path}: {e}")
+        return
+    print(f"Rewrote {len(written)} partitions.")
+
+def _load_partitions(path: pl.Path,
+                     f: dt.date | None = None,
+                     t: dt.date | None = None) -> ExpenseList | None:
+    """Loads a partitioned ledger directory, None if it cannot be read."""
+
+    try:
+        return PartitionedLedger(path).load(f, t)
+    except (ValueError, KeyError, OSError) as e:
+        print(f"Failed to read partitioned ledger: {e}")
+        logging.error(f"Failed to read partitioned ledger {path}: {e}")
+        return None
+
+def input_load_partitions() -> ExpenseList:
+    """
+    Loads expenses from a partitioned ledger directory, optionally only the
+    ones of a time period; then only the overlapping partitions are read.
+    Path and period are provided by the user. This function takes no
+    parameters.
+
+    Returns
+    -------
+    ExpenseList
+        The loaded expense list, or an empty list if loading failed.
+    """
+
+    logging.info("Loading from partitioned directory.")
+
+    print("Warning: this will overwrite the current expense list.")
+    path = pl.Path(input("Enter a path to the ledger directory: "))
+    if not PartitionedLedger.is_partitioned(path):
+        print(f"Path {path} is not a partitioned ledger.")
+        return ExpenseList()
+
+    f = t = None
+    if input("Load only a time period? (y/n): ").strip().lower() == "y":
+        print("Date FROM")
+        f = _input_date()
+        print("Date TO")
+        t = _input_date()
+        if f is None or t is None:
+            return ExpenseList()
+
+    exp = _load_partitions(path, f, t)
+    if exp is None:
+        print("Failed to load.")
+        return ExpenseList()
+    return exp
+
+def input_import_files() -> ExpenseList:
+    """
+    Imports every file of a directory, or every file matching a glob
+    pattern, parsing them in parallel. The pattern and the merge order are
+    provided by the user. Prints rows and errors per file. This function
+    takes no parameters.
+
+    Returns
+    -------
+    ExpenseList
+        The merged expense list, empty if no file could be imported.
+    """
+
+    logging.info("Importing files in parallel.")
+
+    print("Warning: this will overwrite the current expense list.")
+    pattern = input("Enter a directory or a glob pattern of files: ")
+    by_date = input("Sort by date? (y/n): ").strip().lower() == "y"
+
+    exp, reports = ExpenseList.from_files(pattern, by_date=by_date)
+    if not reports:
+        print("No files found.")
+        return exp
+
+    for report in reports:
+        if report["error"] is not None:
+            print(f"{report['path']}: failed, {report['error']}")
+            logging.error(f"Failed to import {report['path']}: {report['error']}")
+            continue
+        print(f"{report['path']}: {report['rows']} rows, "
+              f"{len(report['skipped'])} skipped")
+        for line, reason in report["skipped"][:3]:
+            print(f"    Skipped line {line}: {reason}.")
+    print(f"Imported {len(exp)} expenses from {len(reports)} files.")
+    return exp
+
+def input_autosave() -> pl.Path | None:
+    """
+    Asks for the file to autosave the ledger to after every change, in
+    any format supported by ExpenseList.save. This function takes no
+    parameters.
+
+    Returns
+    -------
+    pl.Path or None
+        The file, None to turn autosave off or if the path is unusable.
+    """
+
+    logging.info("Setting up autosave.")
+
+    path = input("Autosave file (empty to turn autosave off): ").strip()
+    if not path:
+        return None
+
+    path = pl.Path(path)
+    if not path.parent.is_dir():
+        print(f"Path {path.parent} does not point to a directory.")
+        return None
+    if compression.base_suffix(path) not in IMPORT_SUFFIXES:
+        print(f"Path {path} has an unknown format.")
+        return None
+    return path
@@ -0,0 +1,168 @@
+"""
+Compressed text ledgers. JSON, CSV and JSONL files can be gzip, bz2, xz
+(lzma) or zstd compressed. The codec is picked by the last suffix when
+writing (exp.json.gz) and by the suffix or the file's magic bytes when
+reading. Files are read and written as streams through the codec; no
+uncompressed copy is ever written to disk.
+
+zstd needs the zstandard package (or Python 3.14's compression.zstd) and is
+only available when one of them is installed.
+"""
+
+from typing import IO
+import bz2
+import gzip
+import lzma
+import pathlib as pl
+
+SUFFIXES = {
+        "gzip" : ".gz",
+        "bz2" : ".bz2",
+        "lzma" : ".xz",
+        "zstd" : ".zst"
+        }
+"""File suffix of every codec."""
+
+DEFAULT_LEVELS = {
+        "gzip" : 6,
+        "bz2" : 9,
+        "lzma" : 6,
+        "zstd" : 3
+        }
+"""Compression level used when none is given."""
+
+LEVEL_RANGES = {
+        "gzip" : range(0, 10),
+        "bz2" : range(1, 10),
+        "lzma" : range(0, 10),
+        "zstd" : range(1, 23)
+        }
+"""Compression levels accepted by each codec."""
+
+_CODEC_OF_SUFFIX = {v : k for k, v in SUFFIXES.items()}
+
+_MAGIC = (
+        (b"\x1f\x8b", "gzip"),
+        (b"BZh", "bz2"),
+        (b"\xfd7zXZ\x00", "lzma"),
+        (b"\x28\xb5\x2f\xfd", "zstd")
+        )
+
+class CompressionError(ValueError):
+    """Raised when a codec is unknown or not installed, or a compression
+    level is out of its range."""
+
+READ_ERRORS = (OSError, EOFError, lzma.LZMAError, CompressionError)
+"""Exceptions raised when a compressed file is corrupt or truncated."""
+
+def _zstd():
+    """Returns the zstd module in use, None if none is installed."""
+
+    try:
+        from compression import zstd
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+def available() -> list[str]:
+    """Lists the codecs usable in this environment."""
+
+    return [c for c in SUFFIXES if c != "zstd" or _zstd() is not None]
+
+def codec_of(store_path: pl.Path) -> str | None:
+    """Returns the codec named by the last suffix of a path, if any."""
+
+    return _CODEC_OF_SUFFIX.get(store_path.suffix)
+
+def base_suffix(store_path: pl.Path) -> str:
+    """Returns the format suffix of a path, below any compression suffix,
+    e.g. '.json' for exp.json.gz."""
+
+    if codec_of(store_path) is not None:
+        return pl.Path(store_path.stem).suffix
+    return store_path.suffix
+
+def sniff(store_path: pl.Path) -> str | None:
+    """Returns the codec a file is compressed with, from its magic bytes."""
+
+    with open(store_path, "rb") as f:
+        head = f.read(6)
+    for magic, codec in _MAGIC:
+        if head.startswith(magic):
+            return codec
+    return None
+
+def open_text(store_path: pl.Path,
+              mode: str = "r",
+              codec: str | None = None,
+              level: int | None = None,
+              newline: str | None = None) -> IO[str]:
+    """
+    Opens a possibly compressed text file as a text stream.
+
+    Parameters
+    ----------
+    store_path : pl.Path
+        Path of the file.
+    mode : str, optional
+        'r', 'w' or 'a'. Appending adds a new compressed member, which all
+        the codecs read back as one stream.
+    codec : str, optional
+        Codec to use. By default picked by the suffix and, when reading,
+        by the magic bytes. Plain text if neither names one.
+    level : int, optional
+        Compression level within LEVEL_RANGES, DEFAULT_LEVELS by default.
+        Ignored when reading.
+    newline : str, optional
+        Newline translation, as for open().
+
+    Returns
+    -------
+    IO[str]
+        The open text stream.
+
+    Raises
+    ------
+    CompressionError
+        If the codec is unknown or not installed, or the level is out of
+        the codec's range.
+    """
+
+    if codec is None:
+        codec = codec_of(store_path)
+    if codec is None and mode == "r":
+        codec = sniff(store_path)
+    if codec is None:
+        return open(store_path, mode, newline=newline)
+
+    if codec not in SUFFIXES:
+        raise CompressionError(f"Unknown compression {codec!r}.")
+    writing = mode != "r"
+    if level is None:
+        level = DEFAULT_LEVELS[codec]
+    elif writing and level not in LEVEL_RANGES[codec]:
+        levels = LEVEL_RANGES[codec]
+        raise CompressionError(f"Compression level of {codec} needs to be "
+                               f"{levels[0]} to {levels[-1]}, not {level}.")
+
+    if codec == "gzip":
+        return gzip.open(store_path, mode + "t", compresslevel=level, newline=newline)
+    if codec == "bz2":
+        return bz2.open(store_path, mode + "t", compresslevel=level, newline=newline)
+    if codec == "lzma":
+        return lzma.open(store_path, mode + "t", preset=level if writing else None,
+                         newline=newline)
+
+    zstd = _zstd()
+    if zstd is None:
+        raise CompressionError("zstd compression needs the zstandard package.")
+    if zstd.__name__ == "zstandard":
+        cctx = zstd.ZstdCompressor(level=level) if writing else None
+        return zstd.open(store_path, mode, cctx=cctx, encoding="utf-8", newline=newline)
+    return zstd.open(store_path, mode + "t", level=level if writing else None,
+                     encoding="utf-8", newline=newline)
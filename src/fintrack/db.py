@@ -0,0 +1,399 @@
+"""
+SQLite storage backend. An ExpenseDB works directly on a database file:
+adds are inserted in batched transactions and views run as indexed SQL
+queries, so the ledger never has to be loaded into memory as a whole.
+"""
+
+from fintrack.expense import (Expense, ExpenseList, Category, CAT_TO_STR,
+                              NO_DATE, N_CODES, rollup_cube, rollup_result,
+                              print_rollup)
+import array
+import datetime as dt
+import pathlib as pl
+import sqlite3
+
+SUFFIX = ".db"
+
+DB_BATCH_SIZE = 1000
+"""Number of added expenses buffered before they are inserted."""
+
+DB_VIEW_ROWS = 60
+"""Maximum number of rows printed by the views."""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY,
+    amount REAL NOT NULL CHECK (amount >= 0),
+    category INTEGER NOT NULL,
+    desc TEXT NOT NULL,
+    day INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS expenses_day ON expenses (day, amount);
+CREATE INDEX IF NOT EXISTS expenses_category ON expenses (category, amount);
+"""
+
+_COLUMNS = "id, amount, category, desc, day"
+
+class ExpenseDB():
+    def __init__(self, store_path: pl.Path, batch_size: int = DB_BATCH_SIZE):
+        """
+        ExpenseDB constructor. Opens (or creates) the database file and its
+        tables and indexes.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            Path to the SQLite database file.
+        batch_size : int, optional
+            Number of added expenses buffered before they are inserted.
+
+        Returns
+        -------
+        ExpenseDB
+            A class instance.
+
+        Raises
+        ------
+        sqlite3.DatabaseError
+            If the file is not a valid database.
+        """
+
+        self.__path = store_path
+        self.__batch_size = batch_size
+        self.__pending: list[tuple[float, int, str, int]] = []
+        self.__conn = sqlite3.connect(store_path)
+        self.__conn.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, store_path: pl.Path):
+        """
+        Opens a database file, creating it if missing.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            Path to the SQLite database file.
+
+        Returns
+        -------
+        ExpenseDB
+            An object instance, None if the file is not a database.
+        """
+
+        if not store_path.suffix == SUFFIX:
+            print(f"Path {store_path} does not point to a database file.")
+            return None
+
+        try:
+            return cls(store_path)
+        except sqlite3.DatabaseError as e:
+            print(f"Invalid database: {e}")
+            return None
+
+    @property
+    def path(self) -> pl.Path:
+        return self.__path
+
+    def __len__(self) -> int:
+        self.save()
+        return self.__conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+
+    def add(self, new: Expense) -> None:
+        """Adds a new expense. It is inserted with the next batch."""
+
+        self.__pending.append((new.amount,
+                               new.category.value,
+                               new.desc,
+                               new.day))
+        if len(self.__pending) >= self.__batch_size:
+            self.save()
+
+    def save(self) -> None:
+        """
+        Inserts the expenses added since the last save in one transaction.
+        This function takes no parameters and returns nothing.
+        """
+
+        if not self.__pending:
+            return
+        with self.__conn:
+            self.__conn.executemany(
+                    "INSERT INTO expenses (amount, category, desc, day) "
+                    "VALUES (?, ?, ?, ?)", self.__pending)
+        self.__pending = []
+
+    def close(self) -> None:
+        """Saves pending expenses and closes the database."""
+
+        self.save()
+        self.__conn.close()
+
+    def insert_list(self, exp: "ExpenseList | ExpenseDB") -> None:
+        """
+        Inserts all expenses of a list, or of another database, in one
+        transaction. This function returns nothing.
+
+        Parameters
+        ----------
+        exp : ExpenseList or ExpenseDB
+            Expenses to insert.
+        """
+
+        self.save()
+        if isinstance(exp, ExpenseDB):
+            exp.save()
+            exp = exp.to_list()
+        rows = exp._rows()
+        with self.__conn:
+            self.__conn.executemany(
+                    "INSERT INTO expenses (amount, category, desc, day) "
+                    "VALUES (?, ?, ?, ?)", rows)
+
+    def _fetch(self, where: str = "", params: tuple = (),
+               limit: int | None = None) -> tuple[list[int], ExpenseList]:
+        """
+        Runs a query over the expenses table.
+
+        Parameters
+        ----------
+        where : str, optional
+            SQL condition, without the WHERE keyword.
+        params : tuple, optional
+            Parameters of the condition.
+        limit : int, optional
+            Maximum number of rows.
+
+        Returns
+        -------
+        tuple[list[int], ExpenseList]
+            Row ids and the matching expenses, in id order.
+        """
+
+        self.save()
+        sql = f"SELECT {_COLUMNS} FROM expenses"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+
+        ids: list[int] = []
+        amounts, cats, dates = array.array("d"), array.array("b"), array.array("i")
+        descs: list[str] = []
+        for i, amount, cat, desc, day in self.__conn.execute(sql, params):
+            ids.append(i)
+            amounts.append(amount)
+            cats.append(cat)
+            descs.append(desc)
+            dates.append(day)
+        return ids, ExpenseList._from_columns(amounts, cats, dates, descs)
+
+    def _sum(self, where: str = "", params: tuple = ()) -> float:
+        """Sums amounts of the rows matching a condition."""
+
+        self.save()
+        sql = "SELECT TOTAL(amount) FROM expenses"
+        if where:
+            sql += f" WHERE {where}"
+        return self.__conn.execute(sql, params).fetchone()[0]
+
+    def _count(self, where: str, params: tuple) -> int:
+        """Counts the rows matching a condition."""
+
+        sql = f"SELECT COUNT(*) FROM expenses WHERE {where}"
+        return self.__conn.execute(sql, params).fetchone()[0]
+
+    def _print_rows(self, where: str = "", params: tuple = ()) -> None:
+        """Prints up to DB_VIEW_ROWS matching rows and how many were left out."""
+
+        ids, exp = self._fetch(where, params, DB_VIEW_ROWS)
+        df = exp._to_df()
+        df.index = ids
+        print(df)
+
+        n = self._count(where or "1", params)
+        if n > len(ids):
+            print(f"... {n - len(ids)} more rows")
+
+    @staticmethod
+    def _where(f: dt.date | None,
+               t: dt.date | None,
+               cat: Category | None) -> tuple[str, tuple]:
+        """Builds the SQL condition and parameters used by select() and total()."""
+
+        conds = []
+        params: list[int] = []
+        if f is not None or t is not None:
+            conds.append("day BETWEEN ? AND ?")
+            params += [max((f or dt.date.min).toordinal(), NO_DATE + 1),
+                       (t or dt.date.max).toordinal()]
+        if cat is not None:
+            conds.append("category = ?")
+            params.append(cat.value)
+        return " AND ".join(conds), tuple(params)
+
+    def select(self,
+               f: dt.date | None = None,
+               t: dt.date | None = None,
+               cat: Category | None = None) -> ExpenseList:
+        """
+        Loads the expenses matching all given conditions, see
+        ExpenseList.select.
+
+        Returns
+        -------
+        ExpenseList
+            The matching expenses, in insertion order.
+        """
+
+        return self._fetch(*self._where(f, t, cat))[1]
+
+    def total(self,
+              f: dt.date | None = None,
+              t: dt.date | None = None,
+              cat: Category | None = None) -> float:
+        """
+        Sums the expenses matching all given conditions, with one indexed
+        query.
+
+        Returns
+        -------
+        float
+            Sum of amounts of the matching expenses.
+        """
+
+        return self._sum(*self._where(f, t, cat))
+
+    def totals_by_cat(self) -> dict[Category, float]:
+        """Returns the total of every category, with one indexed query."""
+
+        self.save()
+        sums = dict(self.__conn.execute(
+                "SELECT category, TOTAL(amount) FROM expenses GROUP BY category"))
+        return {c : sums.get(c.value, 0.0) for c in Category}
+
+    def rollup(self,
+               period: str = "month",
+               by_cat: bool = False,
+               f: dt.date | None = None,
+               t: dt.date | None = None) -> dict:
+        """
+        Returns the totals of dated expenses by period, see
+        ExpenseList.rollup, from one query grouping by day and category.
+        """
+
+        self.save()
+        where, params = self._where(f or dt.date.min, t, None)
+        days: dict[int, list[float]] = {}
+        for day, code, v in self.__conn.execute(
+                "SELECT day, category, TOTAL(amount) FROM expenses "
+                f"WHERE {where} GROUP BY day, category", params):
+            days.setdefault(day, [0.0] * N_CODES)[code] += v
+        return rollup_result(rollup_cube(days.items(), period).items(), by_cat)
+
+    def view_rollup(self, period: str = "month", by_cat: bool = False) -> None:
+        """Prints the totals by period, see ExpenseList.view_rollup."""
+
+        print_rollup(self.rollup(period, by_cat), by_cat)
+        self._print_total_expenses()
+
+    def to_list(self) -> ExpenseList:
+        """Loads the whole database into an ExpenseList."""
+
+        return self._fetch()[1]
+
+    def _total_expenses(self) -> float:
+        """Sums current expenses."""
+
+        return self._sum()
+
+    def _print_total_expenses(self) -> None:
+        print(f"Total expenses: {self._total_expenses()}")
+
+    def total_between(self, f: dt.date, t: dt.date) -> float:
+        """
+        Sums expenses within a time period.
+
+        Parameters
+        ----------
+        f : dt.date
+            Date from.
+        t : dt.date
+            Date to.
+
+        Returns
+        -------
+        float
+            Sum of amounts of expenses dated between f and t, inclusive.
+        """
+
+        return self._sum("day BETWEEN ? AND ?",
+                         (max(f.toordinal(), NO_DATE + 1), t.toordinal()))
+
+    def view_all(self) -> None:
+        """Prints the first expenses in the database and the total."""
+
+        self._print_rows()
+        self._print_total_expenses()
+
+    def view_cat(self, cat: Category) -> None:
+        """
+        View expenses of a given category. Returns nothing.
+
+        Parameters
+        ----------
+        cat : Category
+            Category to view expenses of.
+        """
+
+        self._print_rows("category = ?", (cat.value,))
+        exp = self._sum("category = ?", (cat.value,))
+        print(f"Expenses on {CAT_TO_STR[cat]}: {exp}")
+
+    def view_by_date(self, f: dt.date, t: dt.date) -> None:
+        """
+        View expenses within a time period. Returns nothing.
+
+        Parameters
+        ----------
+        f : dt.date
+            Date from.
+        t : dt.date
+            Date to.
+        """
+
+        params = (max(f.toordinal(), NO_DATE + 1), t.toordinal())
+        self._print_rows("day BETWEEN ? AND ?", params)
+        print(f"Expenses between {f} and {t}: {self.total_between(f, t)}")
+
+    def summary_by_cat(self) -> None:
+        """
+        Prints a summary of expenses by category. Takes no parameters and
+        returns nothing.
+        """
+
+        sums = self.totals_by_cat()
+
+        print("Summary of expenses by category:")
+        for cat, c in CAT_TO_STR.items():
+            print(f"{c}: {sums[cat]}")
+
+    def to_json(self, store_path: pl.Path) -> None:
+        """Saves the database contents to a JSON file, see ExpenseList.to_json."""
+
+        self.to_list().to_json(store_path)
+
+    def to_csv(self, store_path: pl.Path) -> None:
+        """Saves the database contents to a CSV file, see ExpenseList.to_csv."""
+
+        self.to_list().to_csv(store_path)
+
+    def to_jsonl(self, store_path: pl.Path) -> None:
+        """Saves the database contents to a JSONL file, see ExpenseList.to_jsonl."""
+
+        self.to_list().to_jsonl(store_path)
+
+    def to_bin(self, store_path: pl.Path) -> None:
+        """Saves the database contents to a binary ledger, see ExpenseList.to_bin."""
+
+        self.to_list().to_bin(store_path)
@@ -1,10 +1,38 @@
+"""
+Expense records and the ExpenseList ledger.
+
+numpy and pandas are imported inside the methods that need them, so adding
+expenses, totals and JSON/JSONL/binary saves do not pay their import cost.
+"""
+
+from __future__ import annotations
 from enum import Enum, auto
 import datetime as dt
-from typing import TypedDict, cast
-import copy
+from typing import IO, TYPE_CHECKING, TypedDict, cast
+from collections.abc import Callable, Iterable, Iterator, Sequence
+import array
+import bisect
+import functools
+import glob
+import math
+import os
+import sys
+import tempfile
 import pathlib as pl
 import json
-import pandas as pd
+from fintrack import binary, compression, stats
+from fintrack.cache import QueryCache
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from fintrack.wal import Journal
+    from fintrack.shared import SharedLedger
 
 class Category(Enum):
     """Enum for categories."""
@@ -28,6 +56,300 @@ CAT_TO_STR = {
 
 STR_TO_CAT = {v : k for k, v in CAT_TO_STR.items()}
 
+_STR_TO_CODE = {k : v.value for k, v in STR_TO_CAT.items()}
+
+_MAX_REPORTED = 10
+"""How many skipped rows are printed when importing."""
+
+CSV_CHUNK_SIZE = 100_000
+"""Default number of rows read or written at once for CSV files."""
+
+NO_DATE = 0
+"""Day number stored for expenses without a date."""
+
+ENCODED_FORMAT = "fintrack-dict-1"
+"""Format tag of dictionary-encoded JSON ledgers, see ExpenseList.to_encoded."""
+
+IMPORT_SUFFIXES = (".json", ".csv", ".jsonl", binary.SUFFIX)
+"""Suffixes of the files picked up when importing a whole directory."""
+
+DAY_CACHE_SIZE = 8192
+"""Number of distinct dates memoized by parse_day and format_day."""
+
+ROLLUP_PERIODS = ("day", "week", "month", "year")
+"""Bucket sizes of ExpenseList.rollup."""
+
+_EPOCH_DAY = dt.date(1970, 1, 1).toordinal()
+
+N_CODES = max(c.value for c in Category) + 1
+"""Length of lists of totals indexed by Category value."""
+
+_CODE_TO_STR: list[str | None] = [None] * N_CODES
+for _cat, _name in CAT_TO_STR.items():
+    _CODE_TO_STR[_cat.value] = _name
+
+def _read_csv_chunks(store_path: pl.Path, chunk_size: int):
+    """
+    Reads an expense CSV file as string DataFrames of chunk_size rows.
+
+    Yields
+    ------
+    tuple[pd.DataFrame, int]
+        A chunk and the file line number of its first row.
+
+    Raises
+    ------
+    ValueError
+        If the file does not have the expected columns.
+    """
+
+    import pandas as pd
+
+    if isinstance(store_path, (str, os.PathLike)):
+        with compression.open_text(pl.Path(store_path), "r", newline="") as f:
+            yield from _read_csv_chunks(f, chunk_size)
+        return
+
+    line = 2
+    with pd.read_csv(store_path, dtype=str, keep_default_na=False,
+                     chunksize=chunk_size) as reader:
+        for df in reader:
+            if set(df.columns) != {"amount", "date", "desc", "category"}:
+                raise ValueError("Invalid CSV columns.")
+            yield df, line
+            line += len(df)
+
+def _atomic_write(store_path: pl.Path, write: Callable[[pl.Path], None]) -> None:
+    """
+    Writes a file so that it is never seen half written: write() fills a
+    temporary file in the same directory, which is fsynced and then renamed
+    over store_path.
+
+    Parameters
+    ----------
+    store_path : pl.Path
+        Path of the file to create or replace.
+    write : Callable[[pl.Path], None]
+        Writes the contents to the path it is given.
+    """
+
+    fd, tmp = tempfile.mkstemp(dir=store_path.parent, prefix=f".{store_path.name}.")
+    os.close(fd)
+    tmp_path = pl.Path(tmp)
+    try:
+        write(tmp_path)
+        stats.add_bytes(tmp_path.stat().st_size)
+        fd = os.open(tmp_path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, store_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+def _atomic_write_text(store_path: pl.Path,
+                       dump: Callable[[IO[str]], None],
+                       level: int | None = None) -> None:
+    """Atomically writes a text file whose contents dump() writes to a file
+    object, compressed if the suffix of store_path names a codec."""
+
+    codec = compression.codec_of(store_path)
+
+    def write(tmp_path: pl.Path) -> None:
+        with compression.open_text(tmp_path, "w", codec, level, newline="") as f:
+            dump(f)
+
+    _atomic_write(store_path, write)
+
+def _finish_torn_line(fd: int, store_path: pl.Path) -> int:
+    """
+    Repairs the last line of a JSON Lines file when a writer died before
+    ending it, so it does not swallow the next line appended: a complete
+    record only missing its newline gets one, anything else is cut off.
+    The caller must hold the exclusive lock of the file.
+
+    Parameters
+    ----------
+    fd : int
+        Descriptor of the file, open for reading and appending.
+    store_path : pl.Path
+        Path of the file, for the report.
+
+    Returns
+    -------
+    int
+        Size of the file after the repair.
+    """
+
+    end = os.fstat(fd).st_size
+    if not end or os.pread(fd, 1, end - 1) == b"\n":
+        return end
+
+    start = end
+    while start:
+        n = min(start, 1 << 16)
+        i = os.pread(fd, n, start - n).rfind(b"\n")
+        if i >= 0:
+            start += i + 1 - n
+            break
+        start -= n
+    try:
+        Expense.from_dict(json.loads(os.pread(fd, end - start, start)))
+    except (KeyError, TypeError, ValueError):
+        print(f"Dropped a torn last line of {store_path}.")
+        os.ftruncate(fd, start)
+        return start
+    os.write(fd, b"\n")
+    return end + 1
+
+def _append_jsonl(store_path: pl.Path, dump: Callable[[IO[str]], None]) -> None:
+    """
+    Appends to a JSON Lines file, created if missing, under the exclusive
+    fcntl lock shared ledgers write under (see fintrack.shared), so appends
+    from several processes never interleave. A torn last line is repaired
+    first, see _finish_torn_line(). Unlocked where fcntl is not available.
+
+    Parameters
+    ----------
+    store_path : pl.Path
+        Path of the file to append to.
+    dump : Callable[[IO[str]], None]
+        Writes the new lines to a file object.
+    """
+
+    with open(store_path, "a+") as f:
+        if fcntl is not None:
+            # released when the file is closed, after the final flush
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        pos = _finish_torn_line(f.fileno(), store_path)
+        f.seek(0, os.SEEK_END)
+        dump(f)
+        stats.add_bytes(f.tell() - pos)
+
+def expand_paths(pattern: str | pl.Path) -> list[pl.Path]:
+    """
+    Lists the files to import for a directory or a glob pattern, in sorted
+    path order. A directory yields its files with a supported suffix.
+    """
+
+    path = pl.Path(pattern)
+    if path.is_dir():
+        return sorted(x for x in path.iterdir()
+                      if x.is_file() and compression.base_suffix(x) in IMPORT_SUFFIXES)
+    return sorted(pl.Path(x) for x in glob.glob(str(pattern)) if os.path.isfile(x))
+
+@functools.lru_cache(maxsize=DAY_CACHE_SIZE)
+def parse_day(s: str) -> int:
+    """
+    Parses a YYYY-MM-DD date into its day number, NO_DATE for 'None'.
+    Results are memoized, so the dates repeating across a ledger are parsed
+    once each.
+
+    Raises
+    ------
+    ValueError
+        If s is not a valid date.
+    """
+
+    if s == str(None):
+        return NO_DATE
+    if len(s) == 10 and s[4] == s[7] == "-":
+        return dt.date.fromisoformat(s).toordinal()
+    # rare unpadded forms like 2025-1-5
+    return dt.datetime.strptime(s, "%Y-%m-%d").toordinal()
+
+@functools.lru_cache(maxsize=DAY_CACHE_SIZE)
+def format_day(day: int) -> str:
+    """Formats a day number as YYYY-MM-DD, 'None' for NO_DATE. Memoized."""
+
+    return str(None) if day == NO_DATE else dt.date.fromordinal(day).isoformat()
+
+def _bucket(day: int, period: str):
+    """
+    Returns the rollup bucket of a day number: the date for days, the date
+    of its week's Monday for weeks, (year, month) for months and the year
+    for years.
+    """
+
+    if period == "week":
+        day -= (day - 1) % 7  # day 1 (0001-01-01) is a Monday
+    d = dt.date.fromordinal(day)
+    if period == "month":
+        return d.year, d.month
+    if period == "year":
+        return d.year
+    return d
+
+def rollup_cube(days: Iterable[tuple[int, Sequence[float]]],
+                 period: str) -> dict:
+    """
+    Adds up (day number, totals by category value) pairs into rollup
+    buckets, see ExpenseList.rollup, keeping totals by category value.
+    Undated totals are left out. Shared by the rollups of ExpenseList and
+    ExpenseDB, whatever their day totals come from.
+
+    Raises
+    ------
+    ValueError
+        If period is not one of ROLLUP_PERIODS.
+    """
+
+    if period not in ROLLUP_PERIODS:
+        raise ValueError(f"Unknown rollup period {period!r}.")
+
+    out: dict = {}
+    for day, day_sums in sorted(days):
+        if day == NO_DATE:
+            continue
+        key = _bucket(day, period)
+        sums = out.get(key)
+        if sums is None:
+            sums = out[key] = [0.0] * N_CODES
+        for code, v in enumerate(day_sums):
+            sums[code] += v
+    return out
+
+def rollup_result(buckets: Iterable[tuple], by_cat: bool) -> dict:
+    """Turns (bucket, totals by category value) pairs into the result of
+    ExpenseList.rollup."""
+
+    if by_cat:
+        return {k : {c : v[c.value] for c in Category} for k, v in buckets}
+    return {k : sum(v) for k, v in buckets}
+
+def print_rollup(rollup: dict, by_cat: bool) -> None:
+    """Prints a rollup as a table, one line per bucket."""
+
+    cats = list(CAT_TO_STR)
+    head = f"{'period':<12}"
+    if by_cat:
+        head += "".join(f"{CAT_TO_STR[c]:>12}" for c in cats)
+    print(head + f"{'total':>12}")
+
+    for key, v in rollup.items():
+        if isinstance(key, tuple):
+            key = f"{key[0]}-{key[1]:02}"
+        line = f"{str(key):<12}"
+        if by_cat:
+            line += "".join(f"{v[c]:>12.2f}" for c in cats)
+            v = sum(v.values())
+        print(line + f"{v:>12.2f}")
+
+def _intern(desc: str) -> str:
+    """Interns a description, so repeated ones share one string object."""
+
+    return sys.intern(desc if isinstance(desc, str) else str(desc))
+
+def _encode_descs(descs: Iterable[str]) -> tuple[array.array, list[str]]:
+    """Dictionary-encodes descriptions into a code column and a table of
+    the distinct ones, in order of first appearance."""
+
+    index: dict[str, int] = {}
+    codes = array.array("i", [index.setdefault(_intern(d), len(index)) for d in descs])
+    return codes, list(index)
+
 class ExpenseDict(TypedDict):
     """TypedDict for easier type annotations."""
 
@@ -36,7 +358,53 @@ class ExpenseDict(TypedDict):
     desc: str
     date: str | None
 
+class Totals(TypedDict):
+    """TypedDict for the aggregates kept by ExpenseList."""
+
+    total: float
+    by_cat: dict[Category, float]
+    by_day: dict[dt.date, float]
+    by_month: dict[tuple[int, int], float]
+
+class CsvSummary(TypedDict):
+    """TypedDict for totals computed by streaming over a CSV file."""
+
+    rows: int
+    total: float
+    by_cat: dict[Category, float]
+    skipped: int
+
+class EncodedLedger(TypedDict):
+    """TypedDict for the dictionary-encoded JSON ledger. Categories and
+    descriptions are listed once; rows hold indexes into those lists."""
+
+    format: str
+    categories: list[str]
+    descs: list[str]
+    amount: list[float]
+    category: list[int]
+    desc: list[int]
+    date: list[str | None]
+
+class FileReport(TypedDict):
+    """TypedDict for the outcome of importing one file of a batch."""
+
+    path: str
+    rows: int
+    skipped: list[tuple[int, str]]
+    error: str | None
+
 class Expense():
+    """
+    Immutable expense record. Attributes live in slots and are read-only,
+    so instances are hashable, can be shared without copying and cache
+    their serialized forms. The date is kept as a day number and the date
+    object created on first access.
+    """
+
+    __slots__ = ("__amount", "__category", "__desc", "__day", "__date",
+                 "__dict_cache", "__json_cache")
+
     def __init__(self,
                  amount: float,
                  category: Category,
@@ -73,21 +441,38 @@ class Expense():
         self.__amount = amount
         self.__category = category
         self.__desc = desc
+        self.__day = NO_DATE if date is None else date.toordinal()
         self.__date = date
+        self.__dict_cache: ExpenseDict | None = None
+        self.__json_cache: str | None = None
 
     def __eq__(self, new: object):
         """Standard eq function for comparison."""
 
+        if self is new:
+            return True
         if not isinstance(new, Expense):
             return False
 
         return (
-                self.amount == new.amount
-                and self.category == new.category
-                and self.desc == new.desc
-                and self.date == new.date
+                self.__amount == new.__amount
+                and self.__category is new.__category
+                and self.__day == new.__day
+                and self.__desc == new.__desc
                 )
 
+    def __hash__(self):
+        return hash((self.__amount, self.__category, self.__desc, self.__day))
+
+    @classmethod
+    def _from_day(cls, amount: float, category: Category, desc: str, day: int):
+        """Creates an instance dated by day number (NO_DATE for none),
+        without creating a date object."""
+
+        new = cls(amount, category, desc)
+        new.__day = day
+        return new
+
     @classmethod
     def from_dict(cls, new: ExpenseDict):
         """
@@ -105,11 +490,11 @@ class Expense():
         """
 
         new_cat = STR_TO_CAT[new["category"]]
-        new_date = dt.datetime.strptime(str(new["date"]), "%Y-%m-%d").date()
-        return cls(new["amount"],
-                   new_cat,
-                   new["desc"],
-                   new_date)
+        date = new["date"]
+        return cls._from_day(new["amount"],
+                             new_cat,
+                             new["desc"],
+                             NO_DATE if date is None else parse_day(str(date)))
 
     @property
     def amount(self) -> float:
@@ -125,22 +510,70 @@ class Expense():
 
     @property
     def date(self) -> dt.date | None:
+        if self.__date is None and self.__day != NO_DATE:
+            self.__date = dt.date.fromordinal(self.__day)
         return self.__date
 
+    @property
+    def day(self) -> int:
+        """Day number (proleptic ordinal) of the date, NO_DATE if none."""
+
+        return self.__day
+
     def to_dict(self) -> ExpenseDict:
         """Creates a dictionary out of the class instance."""
 
-        return {
-                "amount" : self.amount,
-                "category" : CAT_TO_STR[self.category],
-                "desc" : self.desc,
-                "date" : str(self.date)
-                }
+        if self.__dict_cache is None:
+            self.__dict_cache = {
+                    "amount" : self.amount,
+                    "category" : CAT_TO_STR[self.category],
+                    "desc" : self.desc,
+                    "date" : format_day(self.__day)
+                    }
+        return cast(ExpenseDict, dict(self.__dict_cache))
+
+    def to_json(self) -> str:
+        """Returns the JSON encoding of to_dict(), computed once."""
+
+        if self.__json_cache is None:
+            self.__json_cache = json.dumps(self.to_dict())
+        return self.__json_cache
+
+class ExpenseView(Sequence):
+    """
+    Read-only, lazy view of an ExpenseList as a sequence of Expense objects.
+    Expenses are only built from the list's columns when accessed.
+    """
+
+    def __init__(self, owner: "ExpenseList"):
+        self.__owner = owner
+
+    def __len__(self) -> int:
+        return len(self.__owner)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.__owner._row(x) for x in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("ExpenseView index out of range.")
+        return self.__owner._row(i)
+
+    def __eq__(self, new: object):
+        """Compares element-wise with any other sequence of expenses."""
+
+        if not isinstance(new, Sequence):
+            return False
+        return len(self) == len(new) and all(a == b for a, b in zip(self, new))
 
 class ExpenseList():
     def __init__(self, new: list[Expense] | None = None):
         """
-        ExpenseList constructor.
+        ExpenseList constructor. Expenses are stored column by column:
+        amounts as float64, categories as Category values, dates as day
+        numbers (proleptic ordinals, NO_DATE for missing) and descriptions
+        as int32 codes into a table holding each distinct description once.
 
         Parameters
         ----------
@@ -153,20 +586,206 @@ class ExpenseList():
             A class instance.
         """
 
-        self.__list = [] if new is None else list(new)
+        self.__amounts = array.array("d")
+        self.__cats = array.array("b")
+        self.__dates = array.array("i")
+        self.__desc_codes = array.array("i")
+        self.__desc_table: Sequence[str] = []
+        self.__desc_index: dict[str, int] = {}
+
+        self.__total = 0.0
+        self.__cat_totals = [0.0] * N_CODES
+        # day by category cube: day number -> totals by category value
+        self.__day_cat_totals: dict[int, list[float]] = {}
+        self.__month_totals: dict[tuple[int, int], float] = {}
+        # rollup cubes by period, see rollup(), kept once asked for
+        self.__period_totals: dict[str, dict] = {}
+        self.__totals_ok = True
+
+        # mmap backing the columns when loaded from a binary ledger
+        self.__mapped = None
+
+        # date index: row numbers sorted by date, their day numbers and
+        # prefix sums of their amounts (one more entry than rows)
+        self.__date_order = array.array("i")
+        self.__date_keys = array.array("i")
+        self.__date_sums = array.array("d", [0.0])
+        self.__date_index_ok = True
+
+        # JSONL file this list was last loaded from or saved to, and how
+        # many of its rows are already in there
+        self.__jsonl_synced: tuple[pl.Path, int] | None = None
+
+        # partitioned ledger directory and period this list holds part of,
+        # when it was loaded for a period only (fintrack.partition)
+        self.__partial_load: tuple[pl.Path, dt.date | None, dt.date | None] | None = None
+
+        # write-ahead journal (fintrack.wal) or shared ledger file
+        # (fintrack.shared) every added expense is logged to
+        self.__journal: Journal | SharedLedger | None = None
+
+        # bumped on every change, invalidates the query cache of the views
+        self.__version = 0
+        self.__cache: QueryCache | None = None
+
+        if new is not None:
+            for x in new:
+                self.add(x)
 
     def __eq__(self, new: object):
         """Typical eq function for comparison."""
 
         if not isinstance(new, ExpenseList):
             return False
-        return self.exp_list == new.exp_list
+
+        # array.array and memoryview columns compare item by item
+        if len(self) != len(new):
+            return False
+        return (
+                self.__amounts == new.__amounts
+                and self.__cats == new.__cats
+                and self.__dates == new.__dates
+                and self._desc_list() == new._desc_list()
+                )
+
+    def __len__(self) -> int:
+        return len(self.__amounts)
+
+    @classmethod
+    def _from_columns(cls, amounts, cats, dates, descs):
+        """
+        Creates an object instance around existing array.array columns,
+        see _from_coded, encoding the description column.
+
+        Parameters
+        ----------
+        amounts, cats, dates : array.array
+            Columns with the 'd', 'b' and 'i' item formats.
+        descs : Sequence[str]
+            Description column.
+        """
+
+        codes, table = _encode_descs(descs)
+        new = cls._from_coded(amounts, cats, dates, codes, table)
+        new.__desc_index = {x : i for i, x in enumerate(table)}
+        return new
+
+    @classmethod
+    def _from_coded(cls, amounts, cats, dates, codes, table, mapped=None):
+        """
+        Creates an object instance around existing columns without copying
+        them. Totals and the date index are built on first use.
+
+        Parameters
+        ----------
+        amounts, cats, dates, codes
+            Columns with the 'd', 'b', 'i' and 'i' item formats. Either
+            array.array or read-only memoryviews.
+        table : Sequence[str]
+            Distinct descriptions, indexed by the codes.
+        mapped : mmap.mmap, optional
+            Memory map the columns point into, kept open while in use.
+
+        Returns
+        -------
+        ExpenseList
+            An object instance.
+        """
+
+        new = cls()
+        new.__amounts = amounts
+        new.__cats = cats
+        new.__dates = dates
+        new.__desc_codes = codes
+        new.__desc_table = table
+        new.__mapped = mapped
+        new.__totals_ok = False
+        new.__date_index_ok = False
+        return new
+
+    def _make_writable(self) -> None:
+        """
+        Copies read-only (memory mapped) columns into growable ones.
+        Done once, before the first add() to a mapped list.
+        """
+
+        if isinstance(self.__amounts, array.array):
+            return
+
+        cols = []
+        for code, col in (("d", self.__amounts), ("b", self.__cats),
+                          ("i", self.__dates), ("i", self.__desc_codes)):
+            new = array.array(code)
+            new.frombytes(col.cast("B"))
+            cols.append(new)
+        self.__amounts, self.__cats, self.__dates, self.__desc_codes = cols
+        self.__desc_table = [_intern(x) for x in self.__desc_table]
+        self.__desc_index = {x : i for i, x in enumerate(self.__desc_table)}
+        self.__mapped = None
+
+    @property
+    def exp_list(self) -> ExpenseView:
+        return ExpenseView(self)
+
+    def _desc_code(self, desc: str) -> int:
+        """Returns the code of a description, adding it to the table if new.
+        The list must be writable."""
+
+        code = self.__desc_index.get(desc)
+        if code is None:
+            desc = _intern(desc)
+            code = self.__desc_index.setdefault(desc, len(self.__desc_table))
+            if code == len(self.__desc_table):
+                self.__desc_table.append(desc)
+        return code
+
+    def _desc(self, i: int) -> str:
+        """Returns the description of row i."""
+
+        return self.__desc_table[self.__desc_codes[i]]
+
+    def _desc_list(self) -> list[str]:
+        """Returns the description column decoded into a list."""
+
+        table = self.__desc_table
+        return [table[c] for c in self.__desc_codes]
 
     @property
-    def exp_list(self) -> list[Expense]:
-        return self.__list
+    def descriptions(self) -> Sequence[str]:
+        """The table of distinct descriptions. Read-only."""
+
+        return self.__desc_table
+
+    def _rows(self) -> Iterator[tuple[float, int, str, int]]:
+        """Yields the rows as (amount, category value, description, day
+        number) tuples, straight from the columns."""
+
+        table = self.__desc_table
+        for amount, code, day, c in zip(self.__amounts, self.__cats,
+                                        self.__dates, self.__desc_codes):
+            yield amount, code, table[c], day
+
+    def _row(self, i: int) -> Expense:
+        """Builds the Expense stored at row i."""
+
+        return Expense._from_day(self.__amounts[i],
+                                 Category(self.__cats[i]),
+                                 self._desc(i),
+                                 self.__dates[i])
+
+    def _row_dict(self, i: int) -> ExpenseDict:
+        """Builds the dictionary representation of row i, same as
+        Expense.to_dict(), without creating an Expense."""
+
+        return {
+                "amount" : self.__amounts[i],
+                "category" : CAT_TO_STR[Category(self.__cats[i])],
+                "desc" : self._desc(i),
+                "date" : format_day(self.__dates[i])
+                }
 
     @classmethod
+    @stats.instrument("from_json")
     def from_json(cls, store_path: pl.Path):
         """
         Creates an object instance out of a JSON file.
@@ -186,22 +805,83 @@ class ExpenseList():
             print(f"Path {store_path} does not exists.")
             return None
 
-        if not store_path.suffix == ".json":
+        if not compression.base_suffix(store_path) == ".json":
             print(f"Path {store_path} does not point to a JSON file.")
             return None
 
-        new = None
-        with open(store_path, "r") as f:
-            new = json.load(f)
+        try:
+            with compression.open_text(store_path, "r") as f:
+                new = json.load(f)
+        except (*compression.READ_ERRORS, ValueError) as e:
+            print(f"Failed to read {store_path}: {e}")
+            return None
 
-        if "exp_list" not in new.keys():
-            print("Invalid JSON contents.")
+        try:
+            return cls._from_json_doc(new)
+        except (KeyError, TypeError, ValueError, IndexError) as e:
+            print(f"Invalid JSON contents: {e}")
             return None
 
-        new_list = [Expense.from_dict(x) for x in new["exp_list"]]
-        return cls(new_list)
+    @classmethod
+    def _from_json_doc(cls, new: object):
+        """
+        Creates an object instance out of a parsed JSON document, either
+        dictionary-encoded or a plain list of expense dictionaries.
+
+        Raises
+        ------
+        KeyError, TypeError, ValueError, IndexError
+            If the contents are invalid.
+        """
+
+        if isinstance(new, dict) and new.get("format") == ENCODED_FORMAT:
+            return cls._from_encoded(new)
+        if isinstance(new, dict) and "exp_list" in new:
+            return cls([Expense.from_dict(x) for x in new["exp_list"]])
+        raise ValueError("not an expense ledger")
+
+    @classmethod
+    def _from_encoded(cls, new: EncodedLedger):
+        """
+        Creates an object instance out of a dictionary-encoded ledger, see
+        to_encoded. Rows are validated column by column.
+
+        Raises
+        ------
+        KeyError, TypeError, ValueError, IndexError
+            If the contents are invalid.
+        """
+
+        header = [STR_TO_CAT[c].value for c in new["categories"]]
+        table = [_intern(x) for x in new["descs"]]
+        amounts = array.array("d", new["amount"])
+        cat_idx = array.array("i", new["category"])
+        codes = array.array("i", new["desc"])
+
+        days_of: dict[str | None, int] = {None : NO_DATE}
+        dates = array.array("i")
+        for x in new["date"]:
+            day = days_of.get(x)
+            if day is None:
+                day = days_of[x] = parse_day(x)
+            dates.append(day)
+
+        n = len(amounts)
+        if not len(cat_idx) == len(codes) == len(dates) == n:
+            raise ValueError("Columns differ in length.")
+        if n and (min(amounts) < 0 or not math.isfinite(sum(amounts))):
+            raise ValueError("Amount needs to be 0 or greater.")
+        if n and (min(cat_idx) < 0 or min(codes) < 0 or max(codes) >= len(table)):
+            raise IndexError("Index out of range.")
+
+        cats = array.array("b", [header[i] for i in cat_idx])
+        exp = cls._from_coded(amounts, cats, dates, codes, table)
+        exp.__desc_index = {x : i for i, x in enumerate(table)}
+        exp._build_totals_python()
+        return exp
 
     @classmethod
+    @stats.instrument("from_csv")
     def from_csv(cls, store_path: pl.Path):
         """
         Creates an object instance out of a CSV file.
@@ -221,173 +901,1475 @@ class ExpenseList():
             print(f"Path {store_path} does not exists.")
             return None
 
-        if not store_path.suffix == ".csv":
+        if not compression.base_suffix(store_path) == ".csv":
             print(f"Path {store_path} does not point to a CSV file.")
             return None
 
-        df = pd.read_csv(store_path)
-        if set(df.columns) != {"amount", "date", "desc", "category"}:
+        new = cls()
+        try:
+            skipped = new.import_csv(store_path)
+        except compression.READ_ERRORS as e:
+            print(f"Failed to read {store_path}: {e}")
+            return None
+        if skipped is None:
             print("Invalid CSV contents.")
             return None
 
-        dict_list = df.to_dict(orient="records")
-        tmp_list = [Expense.from_dict(cast(ExpenseDict, x)) for x in dict_list]
-        return cls(tmp_list)
+        for line, reason in skipped[:_MAX_REPORTED]:
+            print(f"Skipped line {line}: {reason}.")
+        if len(skipped) > _MAX_REPORTED:
+            print(f"Skipped {len(skipped) - _MAX_REPORTED} more invalid lines.")
+        return new
 
-    def add(self, new: Expense) -> None:
-        """Adds a new expense."""
+    @stats.instrument("import_csv")
+    def import_csv(self,
+                   store_path: pl.Path,
+                   chunk_size: int = CSV_CHUNK_SIZE) -> list[tuple[int, str]] | None:
+        """
+        Appends the expenses of a CSV file to the list, parsing, validating
+        and mapping one column at a time instead of building an Expense per
+        row. Invalid rows are skipped and reported. The file is read
+        chunk_size rows at a time.
 
-        self.exp_list.append(copy.copy(new))
+        Parameters
+        ----------
+        store_path : pl.Path
+            Path to the CSV file.
+        chunk_size : int, optional
+            Number of rows parsed at once.
 
-    def to_dict(self) -> dict[str, list[ExpenseDict]]:
-        """Creates a dictionary representation of the class instance."""
+        Returns
+        -------
+        list[tuple[int, str]] or None
+            Line number and reason of every skipped row, or None if the file
+            does not have the expected columns.
+        """
 
-        return { "exp_list" : [x.to_dict() for x in self.exp_list] }
+        skipped: list[tuple[int, str]] = []
+        try:
+            for df, line in _read_csv_chunks(store_path, chunk_size):
+                skipped += self._import_frame(df, line)
+        except ValueError:
+            return None
+        return skipped
 
-    def to_json(self, store_path: pl.Path) -> None:
+    @classmethod
+    def iter_csv(cls,
+                 store_path: pl.Path,
+                 chunk_size: int = CSV_CHUNK_SIZE) -> Iterator[tuple["ExpenseList", list[tuple[int, str]]]]:
         """
-        Creates a JSON file with class isntance's contents.
-        This function returns nothing.
+        Lazily reads a CSV file as a sequence of small expense lists, so
+        files larger than memory can be processed.
 
         Parameters
         ----------
         store_path : pl.Path
-            Location of storing the JSON file.
-        """
-
-        if not store_path.exists():
-            print(f"Path {store_path} does not exist.")
-            return
+            Path to the CSV file.
+        chunk_size : int, optional
+            Number of rows per chunk.
 
-        if not store_path.is_dir():
-            print(f"Path {store_path} does not point to a directory.")
-            return 
+        Yields
+        ------
+        tuple[ExpenseList, list[tuple[int, str]]]
+            The chunk's valid expenses and its skipped rows.
 
-        store_path = store_path / "exp.json"
-        if store_path.exists():
-            print("File already exists. Aborting.")
+        Raises
+        ------
+        ValueError
+            If the file does not have the expected columns.
+        """
 
-        with open(store_path, "w") as f:
-            json.dump(self.to_dict(), f)
+        for df, line in _read_csv_chunks(store_path, chunk_size):
+            new = cls()
+            skipped = new._import_frame(df, line)
+            yield new, skipped
 
-    def to_csv(self, store_path: pl.Path) -> None:
+    @classmethod
+    @stats.instrument("summarize_csv")
+    def summarize_csv(cls,
+                      store_path: pl.Path,
+                      f: dt.date | None = None,
+                      t: dt.date | None = None,
+                      chunk_size: int = CSV_CHUNK_SIZE) -> CsvSummary | None:
         """
-        Creates a CSV file with class isntance's contents.
-        This function returns nothing.
+        Computes the total and per-category totals of a CSV file, optionally
+        limited to a time period, holding one chunk in memory at a time.
 
         Parameters
         ----------
         store_path : pl.Path
-            Location of storing the CSV file.
+            Path to the CSV file.
+        f : dt.date, optional
+            Date from. Undated rows are left out if f or t is given.
+        t : dt.date, optional
+            Date to.
+        chunk_size : int, optional
+            Number of rows per chunk.
+
+        Returns
+        -------
+        CsvSummary or None
+            Totals of the matching rows, None if the file is invalid.
         """
 
-        if not store_path.exists():
-            print(f"Path {store_path} does not exist.")
-            return
+        summary: CsvSummary = {
+                "rows" : 0,
+                "total" : 0.0,
+                "by_cat" : {c : 0.0 for c in Category},
+                "skipped" : 0
+                }
+        try:
+            for chunk, skipped in cls.iter_csv(store_path, chunk_size):
+                chunk = chunk.select(f, t)
+                totals = chunk.totals()
+                summary["rows"] += len(chunk)
+                summary["total"] += totals["total"]
+                summary["skipped"] += len(skipped)
+                for c, v in totals["by_cat"].items():
+                    summary["by_cat"][c] += v
+        except ValueError:
+            return None
+        return summary
 
-        if not store_path.is_dir():
-            print(f"Path {store_path} does not point to a directory.")
-            return 
+    @classmethod
+    @stats.instrument("filter_csv")
+    def filter_csv(cls,
+                   store_path: pl.Path,
+                   f: dt.date | None = None,
+                   t: dt.date | None = None,
+                   cat: Category | None = None,
+                   chunk_size: int = CSV_CHUNK_SIZE):
+        """
+        Reads only the expenses of a CSV file matching all given conditions,
+        see select(), holding one chunk of the file in memory at a time.
 
-        store_path = store_path / "exp.csv"
-        if store_path.exists():
-            print("File already exists. Aborting.")
+        Parameters
+        ----------
+        store_path : pl.Path
+            Path to the CSV file.
+        f : dt.date, optional
+            Date from. Undated rows are left out if f or t is given.
+        t : dt.date, optional
+            Date to.
+        cat : Category, optional
+            Category to keep.
+        chunk_size : int, optional
+            Number of rows per chunk.
 
-        tmp_dict = self.to_dict()
-        df = pd.DataFrame(tmp_dict["exp_list"])
-        df.to_csv(store_path, index=False)
+        Returns
+        -------
+        ExpenseList or None
+            The matching expenses, None if the file is invalid.
+        """
+
+        new = cls()
+        try:
+            for chunk, _ in cls.iter_csv(store_path, chunk_size):
+                new.extend(chunk.select(f, t, cat))
+        except ValueError:
+            return None
+        return new
 
-    def _to_df(self) -> pd.DataFrame:
+    def _import_frame(self, df: pd.DataFrame, first_line: int) -> list[tuple[int, str]]:
         """
-        Creates a DataFrame out of the expense list. Takes no parameters.
+        Validates a DataFrame of string columns read from a CSV file and
+        appends its valid rows to the columns.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Rows with amount, category, desc and date string columns.
+        first_line : int
+            File line number of the first row, for error reports.
 
         Returns
         -------
-        pd.DataFrame
-            A pandas dataframe of expenses.
+        list[tuple[int, str]]
+            Line number and reason of every skipped row.
         """
 
-        tmp_dict = self.to_dict()
-        tmp_list = tmp_dict["exp_list"]
-        if not tmp_list:
-            return pd.DataFrame(columns=["amount", "category", "desc", "date"])
+        import numpy as np
+        import pandas as pd
 
-        df = pd.DataFrame(tmp_list)
-        df["date"] = pd.to_datetime(df["date"], format="%Y-%m-%d", errors="coerce")
-        return df
+        amounts = pd.to_numeric(df["amount"], errors="coerce").to_numpy(np.float64)
+        codes = df["category"].map(_STR_TO_CODE).to_numpy(np.float64)
 
-    def _total_expenses(self) -> float:
-        """Sums current expenses."""
+        def day_of(x) -> int:
+            try:
+                return NO_DATE if x == "" else parse_day(str(x))
+            except ValueError:
+                return -1
 
-        df = self._to_df()
-        return sum(df["amount"])
+        # parse each distinct date string once; missing cells (code -1)
+        # pick the invalid marker appended last
+        date_idx, date_strs = pd.factorize(df["date"])
+        days = np.array([day_of(x) for x in date_strs] + [-1], dtype=np.int32)[date_idx]
 
-    def _print_total_expenses(self) -> None:
-        print(f"Total expenses: {self._total_expenses()}")
+        checks = (
+                (np.isnan(amounts), "invalid amount"),
+                (amounts < 0, "amount needs to be 0 or greater"),
+                (np.isnan(codes), "invalid category"),
+                (days < 0, "invalid date")
+                )
+        bad = np.zeros(len(df), dtype=bool)
+        skipped = []
+        for mask, reason in checks:
+            mask &= ~bad
+            bad |= mask
+            skipped += [(int(i) + first_line, reason) for i in np.flatnonzero(mask)]
+        skipped.sort()
+
+        ok = ~bad
+        self._extend(amounts[ok],
+                     codes[ok].astype(np.int8),
+                     days[ok],
+                     df["desc"].to_numpy()[ok].tolist())
+        return skipped
+
+    def _take(self, rows: np.ndarray):
+        """Creates a new list out of the given rows, in the given order."""
+
+        amounts, cats, dates = self._columns()
+        new = ExpenseList()
+        new._extend_coded(amounts[rows], cats[rows], dates[rows],
+                          self._codes()[rows], self.__desc_table)
+        return new
+
+    def extend(self, other: "ExpenseList") -> None:
+        """Appends all expenses of another list, column by column."""
+
+        amounts, cats, dates = other._columns()
+        self._extend_coded(amounts, cats, dates, other._codes(), other.__desc_table)
+
+    @stats.instrument("filter_by_date")
+    def filter_by_date(self, f: dt.date, t: dt.date):
+        """
+        Creates a new list with the expenses within a time period, in their
+        current order.
 
-    def view_all(self) -> None:
-        """Prints all expenses in the list."""
+        Parameters
+        ----------
+        f : dt.date
+            Date from.
+        t : dt.date
+            Date to.
 
-        print(self._to_df())
-        self._print_total_expenses()
+        Returns
+        -------
+        ExpenseList
+            The matching expenses.
+        """
 
-    def __sum_expenses(self, df: pd.DataFrame) -> float:
-        """Sums expenses out of a given dataframe with expenses."""
+        import numpy as np
 
-        return sum(df["amount"])
+        lo, hi = self._date_range(f, t)
+        return self._take(np.sort(np.frombuffer(self.__date_order, dtype=np.int32)[lo:hi]))
 
-    def view_cat(self, cat: Category) -> None:
+    @stats.instrument("filter_by_cat")
+    def filter_by_cat(self, cat: Category):
         """
-        View expenses of a given category. Returns nothing.
+        Creates a new list with the expenses of a given category, in their
+        current order.
 
         Parameters
         ----------
         cat : Category
-            Category to view expenses of.
+            Category to keep.
+
+        Returns
+        -------
+        ExpenseList
+            The matching expenses.
         """
 
-        df = self._to_df()
-        cat_str = CAT_TO_STR[cat]
-        df = df[df["category"] == cat_str]
-        exp = self.__sum_expenses(df)
-        print(df)
-        print(f"Expenses on {cat_str}: {exp}")
+        import numpy as np
 
-    def view_by_date(self, f: dt.date, t: dt.date) -> None:
+        _, cats, _ = self._columns()
+        return self._take(np.flatnonzero(cats == cat.value))
+
+    @stats.instrument("select")
+    def select(self,
+               f: dt.date | None = None,
+               t: dt.date | None = None,
+               cat: Category | None = None):
         """
-        View expenses within a time period. Returns nothing.
+        Creates a new list with the expenses matching all given conditions.
 
         Parameters
         ----------
-        f : dt.date
-            Date from.
-        t : dt.date
+        f : dt.date, optional
+            Date from. Undated expenses are dropped if f or t is given.
+        t : dt.date, optional
             Date to.
+        cat : Category, optional
+            Category to keep.
+
+        Returns
+        -------
+        ExpenseList
+            The matching expenses, or this list itself if no condition is
+            given.
         """
 
-        df = self._to_df()
-        f_pd = pd.to_datetime(f)
-        t_pd = pd.to_datetime(t)
-        df = df[(df["date"] >= f_pd) & (df["date"] <= t_pd)]
-        exp = self.__sum_expenses(df)
-        print(df)
-        print(f"Expenses between {f} and {t}: {exp}")
+        new = self
+        if f is not None or t is not None:
+            new = new.filter_by_date(f or dt.date.min, t or dt.date.max)
+        if cat is not None:
+            new = new.filter_by_cat(cat)
+        return new
+
+    def _extend(self,
+                amounts: np.ndarray,
+                cats: np.ndarray,
+                days: np.ndarray,
+                descs: list[str]) -> None:
+        """
+        Appends already validated rows given as column arrays, with the
+        descriptions as strings. See _extend_coded.
+        """
 
-    def summary_by_cat(self):
+        import numpy as np
+
+        if not len(amounts):
+            return
+
+        self._make_writable()
+        codes = np.fromiter((self._desc_code(x) for x in descs),
+                            dtype=np.int32, count=len(descs))
+        self._extend_coded(amounts, cats, days, codes, self.__desc_table)
+
+    def _extend_coded(self,
+                      amounts: np.ndarray,
+                      cats: np.ndarray,
+                      days: np.ndarray,
+                      codes: np.ndarray,
+                      table: Sequence[str]) -> None:
         """
-        Prints a summary of expenses by category. Takes no parameters and
-        returns nothing.
+        Appends already validated rows given as column arrays, with the
+        descriptions as codes into table. Only the codes in use are mapped
+        to this list's table. Totals are rebuilt on next use; the date
+        index is extended if the new rows come in date order after the
+        current ones.
+        """
+
+        import numpy as np
+
+        if not len(amounts):
+            return
+
+        self._make_writable()
+        if table is not self.__desc_table:
+            used, inverse = np.unique(codes, return_inverse=True)
+            remap = np.array([self._desc_code(table[c]) for c in used.tolist()],
+                             dtype=np.int32)
+            codes = remap[inverse]
+
+        start = len(self)
+        self.__amounts.frombytes(amounts.astype(np.float64).tobytes())
+        self.__cats.frombytes(cats.astype(np.int8).tobytes())
+        self.__dates.frombytes(days.astype(np.int32).tobytes())
+        self.__desc_codes.frombytes(codes.astype(np.int32).tobytes())
+        self.__totals_ok = False
+        self.__version += 1
+        if self.__journal is not None:
+            self.__journal.log_rows(self, start, len(self))
+
+        if not self.__date_index_ok:
+            return
+        if ((self.__date_keys and days[0] < self.__date_keys[-1])
+                or np.any(np.diff(days) < 0)):
+            self.__date_index_ok = False
+            return
+        sums = self.__date_sums[-1] + np.cumsum(amounts)
+        self.__date_order.frombytes(np.arange(start, len(self), dtype=np.int32).tobytes())
+        self.__date_keys.frombytes(days.astype(np.int32).tobytes())
+        self.__date_sums.frombytes(sums.astype(np.float64).tobytes())
+
+    @staticmethod
+    def iter_jsonl(store_path: pl.Path) -> Iterator[Expense]:
+        """
+        Lazily reads a JSON Lines file, one expense per line. Only one line
+        is held in memory at a time. An invalid last line without a newline,
+        left by a writer that died mid-write, is reported and skipped.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            Path to the JSONL file.
+
+        Yields
+        ------
+        Expense
+            Expenses in file order.
+
+        Raises
+        ------
+        ValueError
+            If a line is not a valid expense record.
+        """
+
+        with compression.open_text(store_path, "r") as f:
+            for n, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield Expense.from_dict(json.loads(line))
+                except (KeyError, TypeError, ValueError) as e:
+                    if not line.endswith("\n"):
+                        # torn by a writer that died mid-write
+                        print(f"Skipped the torn last line {n} of {store_path}.")
+                        return
+                    raise ValueError(f"Invalid record on line {n}.") from e
+
+    @classmethod
+    @stats.instrument("from_jsonl")
+    def from_jsonl(cls, store_path: pl.Path):
+        """
+        Creates an object instance out of a JSON Lines file.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            Path to the JSONL file.
+
+        Returns
+        -------
+        ExpenseList
+            An object instance.
+        """
+
+        if not store_path.exists():
+            print(f"Path {store_path} does not exists.")
+            return None
+
+        if not compression.base_suffix(store_path) == ".jsonl":
+            print(f"Path {store_path} does not point to a JSONL file.")
+            return None
+
+        new = cls()
+        try:
+            for x in cls.iter_jsonl(store_path):
+                new.add(x)
+        except compression.READ_ERRORS as e:
+            print(f"Failed to read {store_path}: {e}")
+            return None
+        except ValueError as e:
+            print(f"Invalid JSONL contents: {e}")
+            return None
+
+        new.__jsonl_synced = (store_path.resolve(), len(new))
+        return new
+
+    @staticmethod
+    def append_jsonl(store_path: pl.Path, new: Expense) -> None:
         """
+        Appends one expense to a JSON Lines file without touching the lines
+        already in it, except for repairing a torn last line (see
+        _finish_torn_line). The file is created if missing.
 
-        df = self._to_df()
-        tmp_map = {c : 0 for c in CAT_TO_STR.values()}
-        for c in tmp_map.keys():
-            df_tmp = df[df["category"] == c]
-            tmp_map[c] = self.__sum_expenses(df_tmp)
+        Parameters
+        ----------
+        store_path : pl.Path
+            Path to the JSONL file.
+        new : Expense
+            Expense to append.
+        """
+
+        _append_jsonl(store_path, lambda f: f.write(new.to_json() + "\n"))
+
+    @property
+    def journal(self) -> Journal | SharedLedger | None:
+        return self.__journal
+
+    def attach_journal(self, journal: Journal | None) -> None:
+        """
+        Logs every expense added from now on (through add(), extend() or
+        the importers) to a write-ahead journal or shared ledger file, or
+        stops logging if journal is None. This function returns nothing.
+
+        Parameters
+        ----------
+        journal : Journal, SharedLedger or None
+            Journal to log to.
+        """
+
+        self.__journal = journal
+
+    def add(self, new: Expense) -> None:
+        """Adds a new expense. Amortized O(1)."""
+
+        self._make_writable()
+        day = new.day
+        self.__amounts.append(new.amount)
+        self.__cats.append(new.category.value)
+        self.__dates.append(day)
+        self.__desc_codes.append(self._desc_code(new.desc))
+        self._account(new.amount, new.category.value, day)
+        self.__version += 1
+        if self.__journal is not None:
+            self.__journal.log_rows(self, len(self) - 1, len(self))
+
+        if not self.__date_index_ok:
+            return
+        if self.__date_keys and day < self.__date_keys[-1]:
+            self.__date_index_ok = False
+            return
+        self.__date_order.append(len(self) - 1)
+        self.__date_keys.append(day)
+        self.__date_sums.append(self.__date_sums[-1] + new.amount)
+
+    def _build_date_index(self) -> None:
+        """
+        Rebuilds the date index with a stable sort of the date column.
+        Only needed after rows were added out of date order.
+        """
+
+        import numpy as np
+
+        amounts, _, dates = self._columns()
+        order = np.argsort(dates, kind="stable").astype(np.int32)
+        sums = np.concatenate(([0.0], np.cumsum(amounts[order])))
+
+        self.__date_order = array.array("i", order.tobytes())
+        self.__date_keys = array.array("i", dates[order].tobytes())
+        self.__date_sums = array.array("d", sums.tobytes())
+        self.__date_index_ok = True
+
+    def _date_range(self, f: dt.date, t: dt.date) -> tuple[int, int]:
+        """
+        Finds the dated rows between f and t (inclusive) with two binary
+        searches over the date index.
+
+        Returns
+        -------
+        tuple[int, int]
+            Bounds (lo, hi) of the rows' positions in the date index.
+        """
+
+        if not self.__date_index_ok:
+            self._build_date_index()
+
+        lo = bisect.bisect_left(self.__date_keys, max(f.toordinal(), NO_DATE + 1))
+        hi = bisect.bisect_right(self.__date_keys, t.toordinal())
+        return lo, max(lo, hi)
+
+    def _date_rows(self, lo: int, hi: int) -> list[int]:
+        """Returns the row numbers at positions lo to hi of the date index."""
+
+        if not self.__date_index_ok:
+            self._build_date_index()
+        return self.__date_order[lo:hi].tolist()
+
+    @stats.instrument("total_between")
+    def total_between(self, f: dt.date, t: dt.date) -> float:
+        """
+        Sums expenses within a time period from the date index prefix sums.
+
+        Parameters
+        ----------
+        f : dt.date
+            Date from.
+        t : dt.date
+            Date to.
+
+        Returns
+        -------
+        float
+            Sum of amounts of expenses dated between f and t, inclusive.
+        """
+
+        lo, hi = self._date_range(f, t)
+        return self.__date_sums[hi] - self.__date_sums[lo]
+
+    def total(self,
+              f: dt.date | None = None,
+              t: dt.date | None = None,
+              cat: Category | None = None) -> float:
+        """
+        Sums the expenses matching all given conditions, see select().
+        Answered from the running totals or the date index, unless both a
+        date and a category are given.
+
+        Returns
+        -------
+        float
+            Sum of amounts of the matching expenses.
+        """
+
+        if f is None and t is None:
+            self._ensure_totals()
+            return self.__total if cat is None else self.__cat_totals[cat.value]
+        if cat is None:
+            return self.total_between(f or dt.date.min, t or dt.date.max)
+        return self.select(f, t, cat)._total_expenses()
+
+    def _account(self, amount: float, code: int, day: int, sign: int = 1) -> None:
+        """
+        Updates the running totals for one row. Every path that adds,
+        removes or edits rows must call this (sign=-1 to take a row out).
+
+        Parameters
+        ----------
+        amount : float
+            Amount of the row.
+        code : int
+            Category value of the row.
+        day : int
+            Day number of the row, NO_DATE if it has no date.
+        sign : int, optional
+            1 to account for a new row, -1 to remove one.
+        """
+
+        if not self.__totals_ok:
+            return
+
+        amount *= sign
+        self.__total += amount
+        self.__cat_totals[code] += amount
+        if day == NO_DATE:
+            return
+
+        sums = self.__day_cat_totals.get(day)
+        if sums is None:
+            sums = self.__day_cat_totals[day] = [0.0] * N_CODES
+        sums[code] += amount
+        for period, cube in self.__period_totals.items():
+            key = _bucket(day, period)
+            sums = cube.get(key)
+            if sums is None:
+                sums = cube[key] = [0.0] * N_CODES
+            sums[code] += amount
+        d = dt.date.fromordinal(day)
+        month = (d.year, d.month)
+        self.__month_totals[month] = self.__month_totals.get(month, 0.0) + amount
+
+    def _ensure_totals(self) -> None:
+        """
+        Builds the running totals in one vectorized pass if they were not
+        kept so far (lists created around existing columns).
+        """
+
+        if self.__totals_ok:
+            return
+
+        import numpy as np
+
+        amounts, cats, dates = self._columns()
+        dated = dates != NO_DATE
+        cells = dates[dated].astype(np.int64) * N_CODES + cats[dated]
+        cells, inv = np.unique(cells, return_inverse=True)
+        sums = np.bincount(inv, weights=amounts[dated], minlength=len(cells))
+        days = cells // N_CODES
+        months = (days - _EPOCH_DAY).astype("datetime64[D]")
+        months = months.astype("datetime64[M]").astype(np.int64)
+
+        self.__total = float(amounts.sum())
+        self.__cat_totals = np.bincount(cats, weights=amounts,
+                                        minlength=N_CODES).tolist()
+        self.__day_cat_totals = {}
+        self.__month_totals = {}
+        self.__period_totals = {}
+        for day, code, m, v in zip(days.tolist(), (cells % N_CODES).tolist(),
+                                   months.tolist(), sums.tolist()):
+            day_sums = self.__day_cat_totals.get(day)
+            if day_sums is None:
+                day_sums = self.__day_cat_totals[day] = [0.0] * N_CODES
+            day_sums[code] += v
+            key = (1970 + m // 12, m % 12 + 1)
+            self.__month_totals[key] = self.__month_totals.get(key, 0.0) + v
+        self.__totals_ok = True
+
+    def _build_totals_python(self) -> None:
+        """
+        Builds the running totals in pure Python, for lists decoded row by
+        row anyway (JSON), so that totalling them never imports numpy.
+        """
+
+        cat_totals = [0.0] * N_CODES
+        day_cat_totals: dict[int, list[float]] = {}
+        for amount, code, day in zip(self.__amounts, self.__cats, self.__dates):
+            cat_totals[code] += amount
+            if day != NO_DATE:
+                sums = day_cat_totals.get(day)
+                if sums is None:
+                    sums = day_cat_totals[day] = [0.0] * N_CODES
+                sums[code] += amount
+
+        month_totals: dict[tuple[int, int], float] = {}
+        for day, sums in day_cat_totals.items():
+            d = dt.date.fromordinal(day)
+            month = (d.year, d.month)
+            month_totals[month] = month_totals.get(month, 0.0) + sum(sums)
+
+        self.__total = sum(self.__amounts)
+        self.__cat_totals = cat_totals
+        self.__day_cat_totals = day_cat_totals
+        self.__month_totals = month_totals
+        self.__period_totals = {}
+        self.__totals_ok = True
+
+    @stats.instrument("totals")
+    def totals(self) -> Totals:
+        """
+        Returns a copy of the running totals. Takes no parameters.
+
+        Returns
+        -------
+        Totals
+            Grand total, totals per category, per day and per (year, month).
+        """
+
+        self._ensure_totals()
+        return {
+                "total" : self.__total,
+                "by_cat" : {c : self.__cat_totals[c.value] for c in Category},
+                "by_day" : {dt.date.fromordinal(d) : sum(v)
+                            for d, v in self.__day_cat_totals.items()},
+                "by_month" : dict(self.__month_totals)
+                }
+
+    @stats.instrument("rollup")
+    def rollup(self,
+               period: str = "month",
+               by_cat: bool = False,
+               f: dt.date | None = None,
+               t: dt.date | None = None) -> dict:
+        """
+        Returns the totals of dated expenses by day, week, month or year,
+        optionally split by category. Answered from the day by category
+        cube kept with the running totals, so the cost depends on the number
+        of distinct days rather than of rows. Without f and t, the cube of
+        the period is kept too and updated by add() like the other totals.
+
+        Parameters
+        ----------
+        period : str, optional
+            One of ROLLUP_PERIODS. Weeks start on Monday.
+        by_cat : bool, optional
+            Whether to split every bucket by category.
+        f : dt.date, optional
+            Only count expenses from this date on.
+        t : dt.date, optional
+            Only count expenses up to this date, inclusive.
+
+        Returns
+        -------
+        dict
+            Totals by bucket, in date order. Buckets are keyed by the date
+            for days, the date of the Monday for weeks, (year, month) for
+            months and the year for years. With by_cat, every bucket holds
+            a dict of totals by Category instead.
+
+        Raises
+        ------
+        ValueError
+            If period is not one of ROLLUP_PERIODS.
+        """
+
+        self._ensure_totals()
+        if f is None and t is None:
+            cube = self.__period_totals.get(period)
+            if cube is None:
+                cube = rollup_cube(self.__day_cat_totals.items(), period)
+                self.__period_totals[period] = cube
+        else:
+            lo = (f or dt.date.min).toordinal()
+            hi = (t or dt.date.max).toordinal()
+            cube = rollup_cube(((day, sums) for day, sums in self.__day_cat_totals.items()
+                                 if lo <= day <= hi), period)
+        return rollup_result(sorted(cube.items()), by_cat)
+
+    def view_rollup(self, period: str = "month", by_cat: bool = False) -> None:
+        """
+        Prints the totals by period, see rollup(). Returns nothing.
+
+        Parameters
+        ----------
+        period : str, optional
+            One of ROLLUP_PERIODS.
+        by_cat : bool, optional
+            Whether to add a column per category.
+        """
+
+        print_rollup(self.rollup(period, by_cat), by_cat)
+        self._print_total_expenses()
+
+    def recompute_totals(self) -> Totals:
+        """
+        Recomputes the totals from scratch out of the columns, ignoring the
+        running ones. Meant for consistency checks. Takes no parameters.
+
+        Returns
+        -------
+        Totals
+            Same structure as totals().
+        """
+
+        by_cat = {c : 0.0 for c in Category}
+        by_day: dict[dt.date, float] = {}
+        by_month: dict[tuple[int, int], float] = {}
+        for amount, code, day in zip(self.__amounts, self.__cats, self.__dates):
+            by_cat[Category(code)] += amount
+            if day == NO_DATE:
+                continue
+            d = dt.date.fromordinal(day)
+            by_day[d] = by_day.get(d, 0.0) + amount
+            by_month[(d.year, d.month)] = by_month.get((d.year, d.month), 0.0) + amount
+
+        return {
+                "total" : math.fsum(self.__amounts),
+                "by_cat" : by_cat,
+                "by_day" : by_day,
+                "by_month" : by_month
+                }
+
+    def check_totals(self) -> bool:
+        """
+        Checks the running totals against recompute_totals().
+
+        Returns
+        -------
+        bool
+            True if both agree (up to float rounding).
+        """
+
+        def close(a: float, b: float) -> bool:
+            return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+
+        def same(a: dict, b: dict) -> bool:
+            return (a.keys() == b.keys()
+                    and all(close(v, b[k]) for k, v in a.items()))
+
+        run = self.totals()
+        new = self.recompute_totals()
+        return (close(run["total"], new["total"])
+                and same(run["by_cat"], new["by_cat"])
+                and same(run["by_day"], new["by_day"])
+                and same(run["by_month"], new["by_month"]))
+
+    @classmethod
+    @stats.instrument("from_bin")
+    def from_bin(cls, store_path: pl.Path):
+        """
+        Opens a binary ledger file with mmap. Columns are used in place,
+        so this takes the same time regardless of the number of rows.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            Path to the binary ledger file.
+
+        Returns
+        -------
+        ExpenseList
+            An object instance.
+        """
+
+        if not store_path.exists():
+            print(f"Path {store_path} does not exists.")
+            return None
+
+        if not store_path.suffix == binary.SUFFIX:
+            print(f"Path {store_path} does not point to a binary ledger file.")
+            return None
+
+        try:
+            mm, amounts, cats, dates, codes, table = binary.open_mapped(store_path)
+        except binary.BinaryFormatError as e:
+            print(f"Invalid binary ledger: {e}")
+            return None
+
+        return cls._from_coded(amounts, cats, dates, codes, table, mm)
+
+    @classmethod
+    def _parse_file(cls, store_path: pl.Path) -> tuple[bytes, bytes, bytes, bytes, list[str], FileReport]:
+        """
+        Parses one file for from_files(). Runs in a worker process, so the
+        list is sent back as raw column bytes rather than pickled.
+        """
+
+        report: FileReport = {"path" : str(store_path), "rows" : 0,
+                              "skipped" : [], "error" : None}
+        new = cls()
+        # the loaders would print their errors in the worker; parse with
+        # the raising steps under them so the reason ends up in the report
+        try:
+            suffix = compression.base_suffix(store_path)
+            if suffix == ".csv":
+                for df, line in _read_csv_chunks(store_path, CSV_CHUNK_SIZE):
+                    report["skipped"] += new._import_frame(df, line)
+            elif suffix == ".json":
+                with compression.open_text(store_path, "r") as f:
+                    new = cls._from_json_doc(json.load(f))
+            elif suffix == ".jsonl":
+                for x in cls.iter_jsonl(store_path):
+                    new.add(x)
+            elif suffix == binary.SUFFIX:
+                mm, amounts, cats, dates, codes, table = binary.open_mapped(store_path)
+                new = cls._from_coded(amounts, cats, dates, codes, table, mm)
+            else:
+                raise ValueError(f"Unknown format {suffix}.")
+        except (KeyError, TypeError, ValueError, IndexError,
+                *compression.READ_ERRORS) as e:
+            report["error"] = str(e) or type(e).__name__
+            return b"", b"", b"", b"", [], report
+
+        report["rows"] = len(new)
+        amounts, cats, dates = new._columns()
+        return (amounts.tobytes(), cats.tobytes(), dates.tobytes(),
+                new._codes().tobytes(), list(new.__desc_table), report)
+
+    @classmethod
+    @stats.instrument("from_files")
+    def from_files(cls,
+                   paths: str | pl.Path | list[pl.Path],
+                   workers: int | None = None,
+                   by_date: bool = False) -> tuple["ExpenseList", list[FileReport]]:
+        """
+        Imports many JSON, CSV, JSONL or binary ledger files at once,
+        parsing them in parallel worker processes. Files that fail are
+        reported and left out; the others are merged into one list.
+
+        Parameters
+        ----------
+        paths : str or pl.Path or list[pl.Path]
+            A directory, a glob pattern or a list of files.
+        workers : int, optional
+            Number of worker processes, by default one per CPU. With one
+            worker or one file, files are parsed in this process.
+        by_date : bool, optional
+            Sort the merged list by date, undated expenses last. Otherwise
+            expenses keep their file order, files in sorted path order.
+
+        Returns
+        -------
+        tuple[ExpenseList, list[FileReport]]
+            The merged list and one report per file, in path order.
+        """
+
+        import numpy as np
+
+        if isinstance(paths, list):
+            files = paths
+        else:
+            files = expand_paths(paths)
+
+        if workers == 1 or len(files) < 2:
+            results = [cls._parse_file(x) for x in files]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(cls._parse_file, files))
+
+        new = cls()
+        reports = []
+        for amounts, cats, dates, codes, table, report in results:
+            reports.append(report)
+            new._extend_coded(np.frombuffer(amounts, dtype=np.float64),
+                              np.frombuffer(cats, dtype=np.int8),
+                              np.frombuffer(dates, dtype=np.int32),
+                              np.frombuffer(codes, dtype=np.int32),
+                              table)
+
+        if by_date and len(new):
+            _, _, dates = new._columns()
+            keys = np.where(dates == NO_DATE, np.iinfo(np.int32).max, dates)
+            del dates
+            new = new._take(np.argsort(keys, kind="stable"))
+
+        return new, reports
+
+    @classmethod
+    def load(cls, store_path: pl.Path):
+        """
+        Loads a file in any of the supported formats, picked by suffix.
+        Text formats may be compressed, see fintrack.compression.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            Path to a JSON, CSV, JSONL or binary ledger file.
+
+        Returns
+        -------
+        ExpenseList
+            An object instance, None if the file could not be loaded.
+        """
+
+        loaders = {
+                ".json" : cls.from_json,
+                ".csv" : cls.from_csv,
+                ".jsonl" : cls.from_jsonl,
+                binary.SUFFIX : cls.from_bin
+                }
+        suffix = compression.base_suffix(store_path)
+        if suffix not in loaders:
+            print(f"Path {store_path} has an unknown format.")
+            return None
+        return loaders[suffix](store_path)
+
+    def to_dict(self) -> dict[str, list[ExpenseDict]]:
+        """Creates a dictionary representation of the class instance."""
+
+        return { "exp_list" : [self._row_dict(i) for i in range(len(self))] }
+
+    def to_encoded(self) -> EncodedLedger:
+        """
+        Creates the dictionary-encoded representation of the class instance,
+        written by to_json. Each category and description is listed once in
+        a header, and rows refer to them by index.
+
+        Raises
+        ------
+        KeyError
+            If an expense has a category without a name in CAT_TO_STR.
+        """
+
+        cat_codes = sorted(set(self.__cats))
+        cat_idx = {c : i for i, c in enumerate(cat_codes)}
+        iso = {d : dt.date.fromordinal(d).isoformat()
+               for d in set(self.__dates) if d != NO_DATE}
+        iso[NO_DATE] = None
+
+        return {
+                "format" : ENCODED_FORMAT,
+                "categories" : [CAT_TO_STR[Category(c)] for c in cat_codes],
+                "descs" : list(self.__desc_table),
+                "amount" : self.__amounts.tolist(),
+                "category" : [cat_idx[c] for c in self.__cats],
+                "desc" : self.__desc_codes.tolist(),
+                "date" : [iso[d] for d in self.__dates]
+                }
+
+    @stats.instrument("to_json")
+    def to_json(self,
+                store_path: pl.Path,
+                codec: str | None = None,
+                level: int | None = None) -> None:
+        """
+        Creates a JSON file with class isntance's contents.
+        This function returns nothing.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            Location of storing the JSON file.
+        codec : str, optional
+            Compression codec, see fintrack.compression. The file then gets
+            the codec's suffix, e.g. exp.json.gz.
+        level : int, optional
+            Compression level.
+        """
+
+        if not store_path.exists():
+            print(f"Path {store_path} does not exist.")
+            return
+
+        if not store_path.is_dir():
+            print(f"Path {store_path} does not point to a directory.")
+            return 
+
+        if codec is not None and codec not in compression.available():
+            print(f"Compression {codec} is not available.")
+            return
+
+        store_path = store_path / f"exp.json{compression.SUFFIXES.get(codec, '')}"
+        if store_path.exists():
+            print("File already exists. Aborting.")
+            return
+
+        _atomic_write_text(store_path, self.dump_json, level)
+
+    def dump_json(self, f: IO[str]) -> None:
+        """Writes the dictionary-encoded JSON document of to_encoded() to an
+        open text file."""
+
+        json.dump(self.to_encoded(), f)
+
+    def dump_jsonl(self, f: IO[str], start: int = 0) -> None:
+        """
+        Writes one JSON line per expense to an open text file.
+
+        Parameters
+        ----------
+        f : IO[str]
+            File to write to.
+        start : int, optional
+            First row to write.
+        """
+
+        for i in range(start, len(self)):
+            f.write(json.dumps(self._row_dict(i)) + "\n")
+
+    def dump_csv(self, f: IO[str], chunk_size: int = CSV_CHUNK_SIZE) -> None:
+        """
+        Writes the expenses as CSV to an open text file, chunk_size rows
+        at a time.
+
+        Parameters
+        ----------
+        f : IO[str]
+            File to write to.
+        chunk_size : int, optional
+            Number of rows formatted and written at once.
+        """
+
+        import numpy as np
+
+        dates = self._columns()[2]
+        for start in range(0, max(len(self), 1), chunk_size):
+            rows = np.arange(start, min(start + chunk_size, len(self)))
+            df = self._to_df(rows)
+            # format each distinct day once
+            days, inv = np.unique(dates[rows], return_inverse=True)
+            iso = np.array([format_day(d) for d in days.tolist()], dtype=object)
+            df["date"] = iso[inv]
+            df.to_csv(f, index=False, header=start == 0)
+
+    @stats.instrument("save")
+    def save(self, store_path: pl.Path, level: int | None = None) -> bool:
+        """
+        Writes the list to the given file, in the format picked by its
+        suffix, replacing the file if it exists. The contents are written to
+        a temporary file in the same directory first and then renamed over
+        the target, so the target is never left half written. Text formats
+        are compressed if a compression suffix follows the format suffix,
+        e.g. exp.csv.xz.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            Path of the JSON, CSV, JSONL or binary ledger file.
+        level : int, optional
+            Compression level of compressed text formats.
+
+        Returns
+        -------
+        bool
+            True if saved, False if the suffix is not a supported format.
+        """
+
+        text_writers = {
+                ".json" : self.dump_json,
+                ".csv" : self.dump_csv,
+                ".jsonl" : self.dump_jsonl
+                }
+        suffix = compression.base_suffix(store_path)
+        if store_path.suffix == binary.SUFFIX:
+            self._write_bin(store_path)
+        elif suffix in text_writers:
+            try:
+                _atomic_write_text(store_path, text_writers[suffix], level)
+            except compression.CompressionError as e:
+                print(e)
+                return False
+        else:
+            print(f"Path {store_path} has an unknown format.")
+            return False
+
+        if store_path.suffix == ".jsonl":
+            self.__jsonl_synced = (store_path.resolve(), len(self))
+        return True
+
+    @stats.instrument("to_jsonl")
+    def to_jsonl(self, store_path: pl.Path) -> None:
+        """
+        Saves the list to a JSON Lines file, one expense per line.
+        If the file was loaded from or saved to by this list before,
+        only the expenses added since are appended to it.
+        This function returns nothing.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            Location of storing the JSONL file.
+        """
+
+        if not store_path.exists():
+            print(f"Path {store_path} does not exist.")
+            return
+
+        if not store_path.is_dir():
+            print(f"Path {store_path} does not point to a directory.")
+            return
+
+        store_path = store_path / "exp.jsonl"
+        start = 0
+        if store_path.exists():
+            synced = self.__jsonl_synced
+            if synced is None or synced[0] != store_path.resolve():
+                print("File already exists. Aborting.")
+                return
+            start = synced[1]
+
+        _append_jsonl(store_path, lambda f: self.dump_jsonl(f, start))
+
+        self.__jsonl_synced = (store_path.resolve(), len(self))
+
+    @stats.instrument("to_bin")
+    def to_bin(self, store_path: pl.Path) -> None:
+        """
+        Creates a binary ledger file with class instance's contents.
+        This function returns nothing.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            Location of storing the binary ledger file.
+        """
+
+        if not store_path.exists():
+            print(f"Path {store_path} does not exist.")
+            return
+
+        if not store_path.is_dir():
+            print(f"Path {store_path} does not point to a directory.")
+            return
+
+        store_path = store_path / f"exp{binary.SUFFIX}"
+        if store_path.exists():
+            print("File already exists. Aborting.")
+            return
+
+        self._write_bin(store_path)
+
+    def _write_bin(self, store_path: pl.Path) -> None:
+        """Atomically writes the columns to a binary ledger file."""
+
+        _atomic_write(store_path,
+                      lambda tmp: binary.write(tmp, self.__amounts, self.__cats,
+                                               self.__dates, self.__desc_codes,
+                                               self.__desc_table))
+
+    @stats.instrument("to_csv")
+    def to_csv(self,
+               store_path: pl.Path,
+               chunk_size: int = CSV_CHUNK_SIZE,
+               codec: str | None = None,
+               level: int | None = None) -> None:
+        """
+        Creates a CSV file with class isntance's contents, written
+        chunk_size rows at a time.
+        This function returns nothing.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            Location of storing the CSV file.
+        chunk_size : int, optional
+            Number of rows formatted and written at once.
+        codec : str, optional
+            Compression codec, see fintrack.compression. The file then gets
+            the codec's suffix, e.g. exp.csv.gz.
+        level : int, optional
+            Compression level.
+        """
+
+        if not store_path.exists():
+            print(f"Path {store_path} does not exist.")
+            return
+
+        if not store_path.is_dir():
+            print(f"Path {store_path} does not point to a directory.")
+            return 
+
+        if codec is not None and codec not in compression.available():
+            print(f"Compression {codec} is not available.")
+            return
+
+        store_path = store_path / f"exp.csv{compression.SUFFIXES.get(codec, '')}"
+        if store_path.exists():
+            print("File already exists. Aborting.")
+            return
+
+        _atomic_write_text(store_path, lambda f: self.dump_csv(f, chunk_size), level)
+
+    def _columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns numpy views of the amount, category and date columns.
+        The views share memory with the list, so they must not outlive
+        the calling method (the columns cannot grow while they exist).
+        """
+
+        import numpy as np
+
+        return (np.frombuffer(self.__amounts, dtype=np.float64),
+                np.frombuffer(self.__cats, dtype=np.int8),
+                np.frombuffer(self.__dates, dtype=np.int32))
+
+    def _codes(self) -> np.ndarray:
+        """Returns a numpy view of the description code column, see _columns."""
+
+        import numpy as np
+
+        return np.frombuffer(self.__desc_codes, dtype=np.int32)
+
+    def _to_df(self, rows: np.ndarray | None = None) -> pd.DataFrame:
+        """
+        Creates a DataFrame straight from the columns.
+
+        Parameters
+        ----------
+        rows : np.ndarray, optional
+            Row numbers to include. All rows if None.
+
+        Returns
+        -------
+        pd.DataFrame
+            A pandas dataframe of expenses, indexed by row number.
+        """
+
+        import numpy as np
+        import pandas as pd
+
+        if rows is None:
+            rows = np.arange(len(self))
+
+        amounts, cats, dates = self._columns()
+        days = dates[rows].astype(np.int64)
+        date_col = (days - _EPOCH_DAY).astype("datetime64[D]")
+        date_col[days == NO_DATE] = np.datetime64("NaT")
+
+        return pd.DataFrame({
+            "amount" : amounts[rows],
+            "category" : np.array(_CODE_TO_STR, dtype=object)[cats[rows]],
+            "desc" : [self.__desc_table[c] for c in self._codes()[rows].tolist()],
+            "date" : pd.to_datetime(date_col)
+            }, index=rows)
+
+    @property
+    def version(self) -> int:
+        """Counter bumped by every change to the list."""
+
+        return self.__version
+
+    @property
+    def partial_load(self) -> tuple[pl.Path, dt.date | None, dt.date | None] | None:
+        """Directory and period of the partitioned ledger this list holds
+        one period of, None if it is not such a partial load."""
+
+        return self.__partial_load
+
+    def _mark_partial_load(self,
+                           directory: pl.Path,
+                           f: dt.date | None,
+                           t: dt.date | None) -> None:
+        self.__partial_load = (directory.resolve(), f, t)
+
+    @property
+    def query_cache(self) -> QueryCache:
+        """Cache of the DataFrames built by the views, see fintrack.cache."""
+
+        if self.__cache is None:
+            self.__cache = QueryCache()
+        return self.__cache
+
+    def _cached_df(self,
+                   key: tuple,
+                   rows: Callable[[], np.ndarray | None],
+                   op: str) -> pd.DataFrame:
+        """
+        Returns the DataFrame of a view query from the query cache, building
+        it from the rows selected by rows() on a miss. The result is shared
+        with the cache and must not be modified. Row selection and building
+        are timed as op.select and op.to_df.
+        """
+
+        def build() -> pd.DataFrame:
+            with stats.timer(f"{op}.select"):
+                selected = rows()
+            with stats.timer(f"{op}.to_df") as record:
+                df = self._to_df(selected)
+                if record is not None:
+                    record.rows = len(df)
+            return df
+
+        return self.query_cache.get(self.__version, key, build)
+
+    def _total_expenses(self) -> float:
+        """Returns the running total of current expenses."""
+
+        self._ensure_totals()
+        return self.__total
+
+    def _print_total_expenses(self) -> None:
+        print(f"Total expenses: {self._total_expenses()}")
+
+    @stats.instrument("view_all")
+    def view_all(self) -> None:
+        """
+        Prints the first page of expenses and the total. The page is
+        formatted straight from the columns; browse the rest with
+        fintrack.pager.Pager.
+        """
+
+        from fintrack.pager import Pager
+
+        with stats.timer("view_all.print"):
+            print(Pager(self).render())
+        self._print_total_expenses()
+
+    @stats.instrument("view_cat")
+    def view_cat(self, cat: Category) -> None:
+        """
+        View expenses of a given category. Returns nothing.
+
+        Parameters
+        ----------
+        cat : Category
+            Category to view expenses of.
+        """
+
+        import numpy as np
+
+        def rows() -> np.ndarray:
+            _, cats, _ = self._columns()
+            return np.flatnonzero(cats == cat.value)
+
+        self._ensure_totals()
+        exp = self.__cat_totals[cat.value]
+        df = self._cached_df(("cat", cat), rows, "view_cat")
+        with stats.timer("view_cat.print"):
+            print(df)
+        print(f"Expenses on {CAT_TO_STR[cat]}: {exp}")
+
+    @stats.instrument("view_by_date")
+    def view_by_date(self, f: dt.date, t: dt.date) -> None:
+        """
+        View expenses within a time period. Returns nothing.
+
+        Parameters
+        ----------
+        f : dt.date
+            Date from.
+        t : dt.date
+            Date to.
+        """
+
+        import numpy as np
+
+        lo, hi = self._date_range(f, t)
+        exp = self.__date_sums[hi] - self.__date_sums[lo]
+        df = self._cached_df(
+                ("date", f, t),
+                lambda: np.sort(np.frombuffer(self.__date_order, dtype=np.int32)[lo:hi]),
+                "view_by_date")
+        with stats.timer("view_by_date.print"):
+            print(df)
+        print(f"Expenses between {f} and {t}: {exp}")
+
+    @stats.instrument("summary_by_cat")
+    def summary_by_cat(self):
+        """
+        Prints a summary of expenses by category. Takes no parameters and
+        returns nothing.
+        """
 
+        self._ensure_totals()
         print("Summary of expenses by category:")
-        for c, e in tmp_map.items():
-            print(f"{c}: {e}")
+        for cat, c in CAT_TO_STR.items():
+            print(f"{c}: {self.__cat_totals[cat.value]}")
 
     @staticmethod
     def cat_to_str(c: Category):
@@ -0,0 +1,144 @@
+"""
+Paged display of expense lists. A page is formatted on demand, row by row,
+straight from the list's columns; no DataFrame or list of dictionaries of
+the whole ledger is ever built, so the first page of a ledger of millions
+of rows shows as fast as that of a small one.
+
+Pages follow insertion order or, through the date index, date order with
+undated expenses first. Either way the pager can jump to the first expense
+dated on or after a given day.
+"""
+
+from fintrack.expense import ExpenseList
+import datetime as dt
+
+PAGE_ROWS = 20
+"""Default number of expenses per page."""
+
+DESC_WIDTH = 32
+"""Descriptions longer than this are cut when shown."""
+
+class Pager():
+    def __init__(self,
+                 exp: ExpenseList,
+                 page_rows: int = PAGE_ROWS,
+                 by_date: bool = False):
+        """
+        Pager constructor. Starts at the first page.
+
+        Parameters
+        ----------
+        exp : ExpenseList
+            List to show. Changes to it show on the next render.
+        page_rows : int, optional
+            Number of expenses per page.
+        by_date : bool, optional
+            Whether to page in date order rather than insertion order.
+
+        Returns
+        -------
+        Pager
+            A class instance.
+        """
+
+        self.__exp = exp
+        self.__page_rows = max(1, page_rows)
+        self.__by_date = by_date
+        self.__page = 0
+
+    @property
+    def page(self) -> int:
+        """Current page, counted from 0."""
+
+        return min(self.__page, self.pages - 1)
+
+    @property
+    def pages(self) -> int:
+        """Number of pages, at least 1."""
+
+        return max(1, -(-len(self.__exp) // self.__page_rows))
+
+    @property
+    def by_date(self) -> bool:
+        return self.__by_date
+
+    def sort_by_date(self, on: bool = True) -> None:
+        """Switches between date and insertion order, back to the first page."""
+
+        self.__by_date = on
+        self.__page = 0
+
+    def go(self, page: int) -> bool:
+        """
+        Goes to a page, counted from 0. Returns False, staying put, if
+        there is no such page.
+        """
+
+        if not 0 <= page < self.pages:
+            return False
+        self.__page = page
+        return True
+
+    def next(self) -> bool:
+        return self.go(self.page + 1)
+
+    def prev(self) -> bool:
+        return self.go(self.page - 1)
+
+    def first(self) -> None:
+        self.__page = 0
+
+    def last(self) -> None:
+        self.__page = self.pages - 1
+
+    def jump_to_date(self, d: dt.date) -> bool:
+        """
+        Goes to the page holding the first expense dated d or later, in the
+        current order. Returns False, staying put, if there is none.
+        """
+
+        exp = self.__exp
+        if self.__by_date:
+            pos = exp._date_range(d, dt.date.max)[0]
+            if pos == len(exp):
+                return False
+        else:
+            dates = exp._columns()[2]
+            later = dates >= d.toordinal()
+            pos = int(later.argmax())
+            if not later[pos]:
+                return False
+
+        self.__page = pos // self.__page_rows
+        return True
+
+    def rows(self) -> list[int]:
+        """Returns the row numbers of the expenses on the current page."""
+
+        lo = self.page * self.__page_rows
+        hi = min(lo + self.__page_rows, len(self.__exp))
+        if self.__by_date:
+            return self.__exp._date_rows(lo, hi)
+        return list(range(lo, hi))
+
+    def render(self) -> str:
+        """Formats the current page as a table with a status line."""
+
+        n = len(self.__exp)
+        if n == 0:
+            return "No expenses."
+
+        lines = [f"{'row':>9}  {'date':<10}  {'category':<9}  {'amount':>12}  desc"]
+        for i in self.rows():
+            x = self.__exp._row_dict(i)
+            desc = x["desc"]
+            if len(desc) > DESC_WIDTH:
+                desc = desc[:DESC_WIDTH - 3] + "..."
+            date = "" if x["date"] == "None" else x["date"]
+            lines.append(f"{i:>9}  {date:<10}  {x['category']:<9}  "
+                         f"{x['amount']:>12.2f}  {desc}")
+
+        order = "date" if self.__by_date else "insertion"
+        lines.append(f"Page {self.page + 1} of {self.pages} "
+                     f"({n} expenses, {order} order)")
+        return "\n".join(lines)
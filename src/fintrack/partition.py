@@ -0,0 +1,358 @@
+"""
+Time-partitioned ledger storage. A partitioned ledger is a directory with
+one binary ledger file per month (plus one for undated expenses) and a
+manifest recording, for every partition, its file, date range, row count,
+total, per-category totals and a digest of its contents.
+
+Date range queries open only the partitions overlapping the range, and
+partitions entirely inside it are answered from the manifest alone. Saving
+rewrites only partitions whose contents changed.
+"""
+
+from fintrack.expense import ExpenseList, Category, NO_DATE, _atomic_write
+from fintrack import binary
+import datetime as dt
+import hashlib
+import json
+import logging
+import pathlib as pl
+from typing import TYPE_CHECKING, TypedDict
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+UNDATED = "undated"
+
+_UNDATED_MONTH = -1 << 40
+"""Month index standing for undated expenses in _months(), before any date."""
+
+class PartitionInfo(TypedDict):
+    """TypedDict for one partition's manifest entry."""
+
+    file: str
+    min: str | None
+    max: str | None
+    rows: int
+    total: float
+    by_cat: dict[str, float]
+    digest: str
+
+def _digest(exp: ExpenseList) -> str:
+    """
+    Hashes the contents of a partition, to tell if it changed, straight
+    from its columns: the amount, category and date columns, then the
+    description codes renumbered in order of first use, then the
+    descriptions they stand for in that order. The digest thus depends only
+    on the rows, not on how the description table of the list they were
+    taken from happens to be numbered or what else it holds.
+    """
+
+    import numpy as np
+
+    h = hashlib.sha1()
+    for col in exp._columns():
+        h.update(col.tobytes())
+
+    used, first, inv = np.unique(exp._codes(), return_index=True, return_inverse=True)
+    by_use = np.argsort(first, kind="stable")
+    rank = np.empty(len(used), dtype=np.int32)
+    rank[by_use] = np.arange(len(used), dtype=np.int32)
+    h.update(rank[inv.ravel()].tobytes())
+    table = exp.descriptions
+    for c in used[by_use].tolist():
+        h.update(table[c].encode("utf-8") + b"\0")
+    return h.hexdigest()
+
+def _months(exp: ExpenseList) -> tuple[list[str], "np.ndarray", list[int]]:
+    """
+    Groups the rows of a list by month. Returns the partition keys in
+    order, the row numbers sorted by key (stable) and where the rows of
+    each key end in them.
+    """
+
+    import numpy as np
+
+    _, _, dates = exp._columns()
+    days = dates.astype(np.int64)
+    del dates
+    months = (days - dt.date(1970, 1, 1).toordinal()).astype("datetime64[D]")
+    months = months.astype("datetime64[M]").astype(np.int64)
+    months[days == NO_DATE] = _UNDATED_MONTH
+
+    keys, inv = np.unique(months, return_inverse=True)
+    order = np.argsort(inv, kind="stable")
+    bounds = np.cumsum(np.bincount(inv, minlength=len(keys)))
+    # months before 1970 are negative too, only the sentinel is undated
+    names = [UNDATED if m == _UNDATED_MONTH else f"{1970 + m // 12:04d}-{m % 12 + 1:02d}"
+             for m in keys.tolist()]
+    return names, order, bounds.tolist()
+
+def _outside(part: ExpenseList, f: dt.date | None, t: dt.date | None) -> ExpenseList:
+    """Returns the expenses of a list outside a time period, undated ones
+    included."""
+
+    import numpy as np
+
+    _, _, days = part._columns()
+    outside = days == NO_DATE
+    if f is not None:
+        outside |= days < f.toordinal()
+    if t is not None:
+        outside |= days > t.toordinal()
+    rows = np.flatnonzero(outside)
+    del days, outside
+    return part._take(rows)
+
+class PartitionedLedger():
+    def __init__(self, directory: pl.Path):
+        """
+        PartitionedLedger constructor. Reads the manifest of a partitioned
+        ledger directory, if there is one; nothing else is read.
+
+        Parameters
+        ----------
+        directory : pl.Path
+            Directory of the partitioned ledger.
+
+        Returns
+        -------
+        PartitionedLedger
+            A class instance.
+
+        Raises
+        ------
+        ValueError
+            If the manifest is invalid.
+        """
+
+        self.__dir = directory
+        self.__parts: dict[str, PartitionInfo] = {}
+        self.__files_read = 0
+
+        path = directory / MANIFEST
+        if path.exists():
+            with open(path, "r") as f:
+                self.__parts = json.load(f)["partitions"]
+
+    @staticmethod
+    def is_partitioned(directory: pl.Path) -> bool:
+        """Checks if a directory holds a partitioned ledger."""
+
+        return (directory / MANIFEST).exists()
+
+    @property
+    def partitions(self) -> dict[str, PartitionInfo]:
+        return dict(self.__parts)
+
+    @property
+    def files_read(self) -> int:
+        """Number of partition files opened so far."""
+
+        return self.__files_read
+
+    def save(self, exp: ExpenseList) -> list[str]:
+        """
+        Splits a list into monthly partitions and writes the ones that
+        differ from what is on disk. Partitions no longer present are
+        deleted. The manifest is replaced atomically last.
+
+        A list loaded for a period only (see load) replaces just that
+        period of the ledger it came from: partitions it did not load are
+        kept untouched, and so are the rows of the partitions at the edges
+        of the period that fall outside it.
+
+        Parameters
+        ----------
+        exp : ExpenseList
+            The whole ledger, or a period of this one.
+
+        Returns
+        -------
+        list[str]
+            Keys (YYYY-MM or UNDATED) of the partitions written.
+
+        Raises
+        ------
+        ValueError
+            If exp is a period of another partitioned ledger and this
+            directory already holds one.
+        """
+
+        self.__dir.mkdir(parents=True, exist_ok=True)
+
+        kept: dict[str, PartitionInfo] = {}
+        if exp.partial_load is not None:
+            exp, kept = self._merge_period(exp)
+
+        parts: dict[str, PartitionInfo] = {}
+        written = []
+        keys, order, bounds = _months(exp)
+        start = 0
+        for key, stop in zip(keys, bounds):
+            part = exp._take(order[start:stop])
+            start = stop
+            info = self._describe(part, f"{key}{binary.SUFFIX}")
+            old = self.__parts.get(key)
+            if (old is None or old["digest"] != info["digest"]
+                    or not (self.__dir / info["file"]).exists()):
+                part.save(self.__dir / info["file"])
+                written.append(key)
+            parts[key] = info
+        parts = dict(sorted({**kept, **parts}.items()))
+
+        for key, info in self.__parts.items():
+            if key not in parts:
+                (self.__dir / info["file"]).unlink(missing_ok=True)
+
+        self.__parts = parts
+        self._write_manifest()
+        logger.info("Saved %d partitions, %d rewritten.", len(parts), len(written))
+        return written
+
+    def _merge_period(self, exp: ExpenseList) -> tuple[ExpenseList, dict[str, PartitionInfo]]:
+        """
+        Prepares saving a list that holds one period of a partitioned
+        ledger. Returns the rows of the partitions the list touches,
+        merged with the rows of those partitions outside the period, and
+        the manifest entries of the partitions it does not touch.
+        """
+
+        directory, f, t = exp.partial_load
+        if directory != self.__dir.resolve():
+            if self.__parts:
+                raise ValueError(f"The list holds only a period of {directory}, "
+                                 f"saving it would replace all of {self.__dir}.")
+            return exp, {}
+
+        period = {key : inside for key, _, inside in self._overlapping(f, t)}
+        touched = set(period) | set(_months(exp)[0])
+        merged = ExpenseList()
+        kept = {}
+        for key, info in sorted(self.__parts.items()):
+            if key not in touched:
+                kept[key] = info
+            elif not period.get(key, False):
+                merged.extend(_outside(self._read(info), f, t))
+        merged.extend(exp)
+        return merged, kept
+
+    @staticmethod
+    def _describe(part: ExpenseList, file: str) -> PartitionInfo:
+        """Builds the manifest entry of a partition."""
+
+        totals = part.totals()
+        days = sorted(totals["by_day"])
+        return {
+                "file" : file,
+                "min" : str(days[0]) if days else None,
+                "max" : str(days[-1]) if days else None,
+                "rows" : len(part),
+                "total" : totals["total"],
+                "by_cat" : {c.name : v for c, v in totals["by_cat"].items()},
+                "digest" : _digest(part)
+                }
+
+    def _write_manifest(self) -> None:
+        """Atomically replaces the manifest file."""
+
+        def write(tmp_path: pl.Path) -> None:
+            with open(tmp_path, "w") as f:
+                json.dump({"partitions" : self.__parts}, f)
+
+        _atomic_write(self.__dir / MANIFEST, write)
+
+    def _overlapping(self, f: dt.date | None, t: dt.date | None):
+        """
+        Yields the keys and manifest entries of the partitions overlapping
+        a time period, with a flag telling if the partition lies entirely
+        inside it. Without a period every partition, including the undated
+        one, is inside.
+        """
+
+        for key, info in sorted(self.__parts.items()):
+            if f is None and t is None:
+                yield key, info, True
+                continue
+            if info["min"] is None:
+                continue
+            lo = dt.date.fromisoformat(info["min"])
+            hi = dt.date.fromisoformat(info["max"])
+            if (f is not None and hi < f) or (t is not None and lo > t):
+                continue
+            inside = (f is None or f <= lo) and (t is None or hi <= t)
+            yield key, info, inside
+
+    def _read(self, info: PartitionInfo) -> ExpenseList:
+        """Opens one partition file."""
+
+        self.__files_read += 1
+        part = ExpenseList.from_bin(self.__dir / info["file"])
+        if part is None:
+            raise ValueError(f"Invalid partition {info['file']}.")
+        return part
+
+    def load(self, f: dt.date | None = None, t: dt.date | None = None) -> ExpenseList:
+        """
+        Loads the expenses of a time period, opening only the partitions
+        that overlap it.
+
+        Parameters
+        ----------
+        f : dt.date, optional
+            Date from. Everything, undated expenses included, is loaded if
+            neither f nor t is given.
+        t : dt.date, optional
+            Date to.
+
+        Returns
+        -------
+        ExpenseList
+            The matching expenses, in date order of their partitions.
+        """
+
+        new = ExpenseList()
+        for _, info, inside in self._overlapping(f, t):
+            part = self._read(info)
+            new.extend(part if inside else part.select(f, t))
+        if f is not None or t is not None:
+            new._mark_partial_load(self.__dir, f, t)
+        return new
+
+    def total(self, f: dt.date | None = None, t: dt.date | None = None) -> float:
+        """
+        Sums the expenses of a time period. Partitions entirely inside it
+        are summed from the manifest; only the ones at its edges are read.
+
+        Parameters
+        ----------
+        f : dt.date, optional
+            Date from.
+        t : dt.date, optional
+            Date to.
+
+        Returns
+        -------
+        float
+            Sum of amounts of the matching expenses.
+        """
+
+        total = 0.0
+        for _, info, inside in self._overlapping(f, t):
+            if inside:
+                total += info["total"]
+            else:
+                total += self._read(info).total_between(f or dt.date.min,
+                                                        t or dt.date.max)
+        return total
+
+    def totals_by_cat(self) -> dict[Category, float]:
+        """Returns the total of every category, from the manifest alone."""
+
+        sums = {c : 0.0 for c in Category}
+        for info in self.__parts.values():
+            for name, v in info["by_cat"].items():
+                sums[Category[name]] += v
+        return sums
@@ -0,0 +1,313 @@
+"""
+Local HTTP JSON server over an in-memory ledger. The ledger is loaded once
+and kept in memory, and every request is answered from it, so queries cost
+no more than the running totals, the date index or one vectorized filter.
+
+Endpoints:
+    GET  /expenses?from=D&to=D&category=C&offset=N&limit=N
+         matching expenses, in insertion order, at most MAX_LIMIT at once
+    POST /expenses
+         adds the expense in the body, {"amount", "category", "desc", "date"}
+    GET  /totals?from=D&to=D&category=C
+         sum of the matching expenses
+    GET  /summary
+         grand total and totals by category
+    GET  /rollup?period=month&by_cat=1
+         totals by day, week, month or year, see ExpenseList.rollup
+
+Dates are YYYY-MM-DD. Errors are answered with a 4xx status and
+{"error": message}.
+
+The server runs on asyncio: connections are served concurrently, with
+HTTP/1.1 keep-alive, by one event loop that alone touches the ledger, so
+requests need no locking.
+"""
+
+from fintrack.expense import (Expense, ExpenseList, Category, CAT_TO_STR,
+                              STR_TO_CAT, ROLLUP_PERIODS)
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+import asyncio
+import contextlib
+import datetime as dt
+import json
+import logging
+import math
+import signal
+
+logger = logging.getLogger(__name__)
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+DEFAULT_LIMIT = 100
+"""Expenses returned by /expenses when no limit is given."""
+
+MAX_LIMIT = 10_000
+"""Most expenses returned by one /expenses request."""
+
+MAX_BODY = 64 * 1024
+"""Largest request body accepted, in bytes."""
+
+class RequestError(ValueError):
+    """Raised by a handler to answer with an error status."""
+
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+def _query_date(query: dict[str, list[str]], name: str) -> dt.date | None:
+    if name not in query:
+        return None
+    try:
+        return dt.date.fromisoformat(query[name][0])
+    except ValueError:
+        raise RequestError(f"Invalid date for {name}.")
+
+def _query_cat(query: dict[str, list[str]]) -> Category | None:
+    if "category" not in query:
+        return None
+    cat = STR_TO_CAT.get(query["category"][0])
+    if cat is None:
+        raise RequestError("Invalid category.")
+    return cat
+
+def _query_int(query: dict[str, list[str]], name: str, default: int) -> int:
+    try:
+        value = int(query[name][0]) if name in query else default
+    except ValueError:
+        value = -1
+    if value < 0:
+        raise RequestError(f"Invalid value for {name}.")
+    return value
+
+def _bucket_key(key) -> str:
+    """JSON key of a rollup bucket: YYYY-MM-DD, YYYY-MM or YYYY."""
+
+    if isinstance(key, tuple):
+        return f"{key[0]}-{key[1]:02}"
+    return str(key)
+
+class LedgerServer():
+    def __init__(self, exp: ExpenseList, host: str = HOST, port: int = PORT):
+        """
+        LedgerServer constructor. Call start() or run() to serve.
+
+        Parameters
+        ----------
+        exp : ExpenseList
+            Ledger to serve. Expenses posted are added to it.
+        host : str, optional
+            Address to listen on.
+        port : int, optional
+            Port to listen on, 0 for any free one.
+        """
+
+        self.__exp = exp
+        self.__host = host
+        self.__port = port
+        self.__server: asyncio.Server | None = None
+        self.__requests = 0
+
+    @property
+    def exp(self) -> ExpenseList:
+        return self.__exp
+
+    @property
+    def requests(self) -> int:
+        """Number of requests answered so far."""
+
+        return self.__requests
+
+    def dispatch(self, method: str, target: str, body: bytes = b"") -> tuple[int, dict]:
+        """
+        Answers one request.
+
+        Parameters
+        ----------
+        method : str
+            HTTP method.
+        target : str
+            Request target, path and query string.
+        body : bytes, optional
+            Request body.
+
+        Returns
+        -------
+        tuple[int, dict]
+            Status code and the JSON document to send.
+        """
+
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        routes = {
+                "/expenses" : {"GET" : self._get_expenses, "POST" : self._post_expense},
+                "/totals" : {"GET" : self._get_totals},
+                "/summary" : {"GET" : self._get_summary},
+                "/rollup" : {"GET" : self._get_rollup}
+                }
+        try:
+            methods = routes.get(url.path.rstrip("/") or "/")
+            if methods is None:
+                raise RequestError("Not found.", HTTPStatus.NOT_FOUND)
+            handler = methods.get(method)
+            if handler is None:
+                raise RequestError("Method not allowed.", HTTPStatus.METHOD_NOT_ALLOWED)
+            status, doc = handler(query, body)
+        except RequestError as e:
+            status, doc = e.status, {"error" : str(e)}
+        except Exception:
+            logger.exception("Failed to answer %s %s.", method, target)
+            status, doc = HTTPStatus.INTERNAL_SERVER_ERROR, {"error" : "Internal error."}
+        self.__requests += 1
+        return int(status), doc
+
+    def _get_expenses(self, query, body) -> tuple[int, dict]:
+        found = self.__exp.select(_query_date(query, "from"),
+                                  _query_date(query, "to"),
+                                  _query_cat(query))
+        offset = _query_int(query, "offset", 0)
+        limit = min(_query_int(query, "limit", DEFAULT_LIMIT), MAX_LIMIT)
+        rows = range(offset, min(offset + limit, len(found)))
+        return HTTPStatus.OK, {
+                "count" : len(found),
+                "offset" : offset,
+                "expenses" : [found._row_dict(i) for i in rows]
+                }
+
+    def _post_expense(self, query, body) -> tuple[int, dict]:
+        try:
+            new = json.loads(body)
+            new.setdefault("desc", "")
+            new.setdefault("date", None)
+            if not isinstance(new["amount"], (int, float)):
+                raise TypeError("amount")
+            # json.loads takes NaN and Infinity, which would spoil every total
+            if not math.isfinite(new["amount"]):
+                raise ValueError("amount")
+            new = Expense.from_dict(new)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise RequestError("Invalid expense.")
+        self.__exp.add(new)
+        return HTTPStatus.CREATED, {"row" : len(self.__exp) - 1}
+
+    def _get_totals(self, query, body) -> tuple[int, dict]:
+        total = self.__exp.total(_query_date(query, "from"),
+                                 _query_date(query, "to"),
+                                 _query_cat(query))
+        return HTTPStatus.OK, {"total" : total}
+
+    def _get_summary(self, query, body) -> tuple[int, dict]:
+        exp = self.__exp
+        return HTTPStatus.OK, {
+                "count" : len(exp),
+                "total" : exp.total(),
+                "by_cat" : {c : exp.total(cat=cat) for cat, c in CAT_TO_STR.items()}
+                }
+
+    def _get_rollup(self, query, body) -> tuple[int, dict]:
+        period = query.get("period", ["month"])[0]
+        if period not in ROLLUP_PERIODS:
+            raise RequestError("Invalid period.")
+        by_cat = query.get("by_cat", ["0"])[0] not in ("0", "false", "")
+        rollup = self.__exp.rollup(period, by_cat)
+        if by_cat:
+            rollup = {k : {CAT_TO_STR[c] : v[c] for c in CAT_TO_STR}
+                      for k, v in rollup.items()}
+        return HTTPStatus.OK, {_bucket_key(k) : v for k, v in rollup.items()}
+
+    async def _handle(self,
+                      reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter) -> None:
+        """Serves the requests of one connection until it is closed."""
+
+        try:
+            while True:
+                headers = {}
+                try:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    while True:
+                        h = await reader.readline()
+                        if h in (b"\r\n", b"\n", b""):
+                            break
+                        k, _, v = h.decode("latin-1").partition(":")
+                        headers[k.strip().lower()] = v.strip()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # a line longer than the stream buffer limit
+                    length = None
+                else:
+                    try:
+                        method, target, version = line.decode("latin-1").split()
+                        length = int(headers.get("content-length", 0))
+                    except ValueError:
+                        method, target, version, length = "", "", "HTTP/1.0", -1
+
+                if length is None:
+                    status = HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE
+                    doc = {"error" : "Request line or header too long."}
+                    keep = False
+                elif not 0 <= length <= MAX_BODY:
+                    status, doc = HTTPStatus.BAD_REQUEST, {"error" : "Bad request."}
+                    keep = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, doc = self.dispatch(method, target, body)
+                    keep = (version == "HTTP/1.1"
+                            and headers.get("connection", "").lower() != "close")
+
+                data = json.dumps(doc).encode()
+                writer.write(
+                        f"HTTP/1.1 {int(status)} {HTTPStatus(status).phrase}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep else 'close'}\r\n"
+                        "\r\n".encode() + data)
+                await writer.drain()
+                if not keep:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> int:
+        """
+        Starts listening. Requests are served by the running event loop.
+
+        Returns
+        -------
+        int
+            The port listened on.
+        """
+
+        self.__server = await asyncio.start_server(self._handle, self.__host, self.__port)
+        port = self.__server.sockets[0].getsockname()[1]
+        logger.info("Serving %d expenses on %s:%d.", len(self.__exp), self.__host, port)
+        return port
+
+    async def run(self) -> None:
+        """
+        Starts listening, prints the address and serves until cancelled.
+        SIGTERM cancels it too, so the caller gets to save on either.
+        """
+
+        port = await self.start()
+        loop = asyncio.get_running_loop()
+        with contextlib.suppress(NotImplementedError):
+            # not available on Windows
+            loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        print(f"Serving on http://{self.__host}:{port}", flush=True)
+        try:
+            async with self.__server:
+                await self.__server.serve_forever()
+        finally:
+            with contextlib.suppress(NotImplementedError):
+                loop.remove_signal_handler(signal.SIGTERM)
+
+    def close(self) -> None:
+        """Stops listening."""
+
+        if self.__server is not None:
+            self.__server.close()
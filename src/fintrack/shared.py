@@ -0,0 +1,205 @@
+"""
+Shared ledgers: one JSON Lines file used by several processes at once.
+
+Access is coordinated with advisory fcntl locks on the file. Readers take
+a shared lock, so any number of them can read at once; writers take an
+exclusive lock and only ever append whole lines, so they are serialized
+and never overwrite each other. Each process remembers how far into the
+file it has read and picks up the rows other processes appended by
+reading from there on (refresh()), never reloading the whole file.
+
+Expenses added to a list opened with SharedLedger.open are appended to the
+file as they are added. Rows written by other processes join the list in
+the order they are picked up.
+
+Needs fcntl, so it is only available on Unix.
+"""
+
+from fintrack.expense import Expense, ExpenseList, _finish_torn_line
+from collections.abc import Iterator
+import contextlib
+import json
+import logging
+import os
+import pathlib as pl
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class SharedLedgerError(OSError):
+    """Raised when a shared ledger cannot be used."""
+
+class SharedLedger():
+    def __init__(self, store_path: pl.Path, owner: ExpenseList):
+        """
+        SharedLedger constructor. Use SharedLedger.open() to get a list
+        attached to a shared ledger file.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            The shared JSONL file. Created if missing.
+        owner : ExpenseList
+            List whose additions are appended to the file.
+        """
+
+        if fcntl is None:
+            raise SharedLedgerError("Shared ledgers need fcntl, only available on Unix.")
+
+        self.__path = store_path
+        self.__owner = owner
+        # one descriptor for reading and appending: flock locks belong to
+        # the open file, so a second one would conflict with the first
+        self.__file = open(store_path, "a+b", buffering=0)
+        self.__offset = 0
+        # rows read while appending, taken into the list on the next refresh
+        self.__pending = ExpenseList()
+        self.__read = 0
+        self.__written = 0
+
+    @classmethod
+    def open(cls, store_path: pl.Path) -> ExpenseList:
+        """
+        Opens a shared ledger file, creating it if missing, and reads it
+        under a shared lock.
+
+        Parameters
+        ----------
+        store_path : pl.Path
+            Path to the JSONL file.
+
+        Returns
+        -------
+        ExpenseList
+            The expenses in the file, with the shared ledger attached.
+
+        Raises
+        ------
+        SharedLedgerError
+            If locking is not supported here.
+        OSError
+            If the file cannot be opened.
+        """
+
+        exp = ExpenseList()
+        shared = cls(store_path, exp)
+        shared.refresh()
+        exp.attach_journal(shared)
+        logger.info("Opened shared ledger %s with %d expenses.", store_path, len(exp))
+        return exp
+
+    @property
+    def path(self) -> pl.Path:
+        return self.__path
+
+    @property
+    def offset(self) -> int:
+        """Bytes of the file read or written by this process so far."""
+
+        return self.__offset
+
+    @property
+    def rows_read(self) -> int:
+        """Number of rows picked up from other processes or on open."""
+
+        return self.__read
+
+    @property
+    def rows_written(self) -> int:
+        """Number of rows appended by this process."""
+
+        return self.__written
+
+    @contextlib.contextmanager
+    def _locked(self, op: int) -> Iterator[None]:
+        fcntl.flock(self.__file.fileno(), op)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.__file.fileno(), fcntl.LOCK_UN)
+
+    def _read_new(self) -> ExpenseList:
+        """
+        Reads the whole lines past the offset. Must hold a lock. A torn
+        last line, left by a writer that died mid-write, is left unread;
+        invalid lines are logged and skipped.
+        """
+
+        size = os.fstat(self.__file.fileno()).st_size
+        if size < self.__offset:
+            raise SharedLedgerError(f"Shared ledger {self.__path} was truncated.")
+
+        new = ExpenseList()
+        if size == self.__offset:
+            return new
+
+        data = os.pread(self.__file.fileno(), size - self.__offset, self.__offset)
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                new.add(Expense.from_dict(json.loads(line)))
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Skipping invalid line in shared ledger %s.", self.__path)
+        self.__offset += end
+        return new
+
+    def refresh(self) -> int:
+        """
+        Picks up the rows other processes appended since the last read,
+        under a shared lock.
+
+        Returns
+        -------
+        int
+            Number of new rows.
+        """
+
+        new, self.__pending = self.__pending, ExpenseList()
+        with self._locked(fcntl.LOCK_SH):
+            new.extend(self._read_new())
+        if not len(new):
+            return 0
+
+        # taken in without writing them back
+        self.__owner.attach_journal(None)
+        try:
+            self.__owner.extend(new)
+        finally:
+            self.__owner.attach_journal(self)
+        self.__read += len(new)
+        return len(new)
+
+    def log_rows(self, exp: ExpenseList, start: int, stop: int) -> None:
+        """
+        Appends rows start..stop of the owning list to the file under an
+        exclusive lock. Called by ExpenseList whenever expenses are added.
+        Rows other processes appended before are read on the way and join
+        the list on the next refresh(). This function returns nothing.
+        """
+
+        data = "".join(json.dumps(exp._row_dict(i)) + "\n"
+                       for i in range(start, stop)).encode()
+        with self._locked(fcntl.LOCK_EX):
+            end = _finish_torn_line(self.__file.fileno(), self.__path)
+            self.__pending.extend(self._read_new())
+            self.__file.write(data)
+            self.__offset = end + len(data)
+        self.__written += stop - start
+
+    def sync(self) -> None:
+        """Fsyncs the rows appended so far."""
+
+        os.fsync(self.__file.fileno())
+
+    def close(self) -> None:
+        """Syncs the file, closes it and detaches it from the list."""
+
+        self.sync()
+        self.__file.close()
+        self.__owner.attach_journal(None)
@@ -0,0 +1,168 @@
+"""
+Opt-in timing instrumentation. When enabled, by setting the FINTRACK_STATS
+environment variable or passing --stats, every instrumented ExpenseList
+load, save, view and aggregate records its call count, wall time, rows and
+bytes read or written. Views also record their phases separately (row
+selection, DataFrame building, printing), named like view_cat.print.
+
+When disabled, instrumented functions cost one flag check per call.
+"""
+
+from collections.abc import Callable, Iterator
+from typing import Any, TypedDict
+import contextlib
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+ENV_VAR = "FINTRACK_STATS"
+
+class OpStats(TypedDict):
+    """TypedDict for the totals recorded for one operation."""
+
+    calls: int
+    seconds: float
+    rows: int
+    bytes: int
+
+class _Record():
+    """One running timed operation."""
+
+    __slots__ = ("op", "rows", "bytes")
+
+    def __init__(self, op: str):
+        self.op = op
+        self.rows = 0
+        self.bytes = 0
+
+_enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+_lock = threading.Lock()
+_ops: dict[str, OpStats] = {}
+_active = threading.local()
+
+def enabled() -> bool:
+    return _enabled
+
+def enable(on: bool = True) -> None:
+    """Turns recording on or off for the whole process."""
+
+    global _enabled
+    _enabled = on
+
+def reset() -> None:
+    """Drops everything recorded so far."""
+
+    with _lock:
+        _ops.clear()
+
+def report() -> dict[str, OpStats]:
+    """Returns a copy of the totals recorded so far, by operation name."""
+
+    with _lock:
+        return {k : OpStats(**v) for k, v in _ops.items()}
+
+def _stack() -> list[_Record]:
+    stack = getattr(_active, "stack", None)
+    if stack is None:
+        stack = _active.stack = []
+    return stack
+
+def add_bytes(n: int) -> None:
+    """Adds bytes read or written to every operation running in this thread."""
+
+    if not _enabled:
+        return
+    for record in _stack():
+        record.bytes += n
+
+@contextlib.contextmanager
+def _timer(op: str) -> Iterator[_Record]:
+    record = _Record(op)
+    stack = _stack()
+    stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+        with _lock:
+            total = _ops.setdefault(op, {"calls" : 0, "seconds" : 0.0,
+                                         "rows" : 0, "bytes" : 0})
+            total["calls"] += 1
+            total["seconds"] += seconds
+            total["rows"] += record.rows
+            total["bytes"] += record.bytes
+
+def timer(op: str) -> contextlib.AbstractContextManager:
+    """
+    Times a block as operation op. The record it yields, None if recording
+    is disabled, takes the rows and bytes the block processed.
+    """
+
+    if not _enabled:
+        return contextlib.nullcontext()
+    return _timer(op)
+
+def _rows_of(x: Any) -> int | None:
+    """Row count of an expense list (or anything with exp_list), else None."""
+
+    return len(x) if hasattr(x, "exp_list") and not isinstance(x, type) else None
+
+def instrument(op: str) -> Callable:
+    """
+    Decorator recording every call of a function as operation op. Rows are
+    the length of the returned expense list, else of the list the method is
+    called on; reading a file given as an argument counts its size as bytes
+    read. Bytes written are added by the writers, see add_bytes.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+
+            with _timer(op) as record:
+                for x in args[1:2]:
+                    if isinstance(x, os.PathLike) and op.startswith(("from_", "import_")):
+                        with contextlib.suppress(OSError):
+                            if os.path.isfile(x):
+                                record.bytes += os.path.getsize(x)
+                result = fn(*args, **kwargs)
+                rows = _rows_of(result)
+                if rows is None:
+                    rows = _rows_of(args[0]) if args else None
+                record.rows = rows or 0
+                return result
+        return wrapper
+    return decorator
+
+def print_report(file=None) -> None:
+    """Prints the recorded totals as a table, slowest operations first."""
+
+    file = file or sys.stdout
+    ops = report()
+    if not ops:
+        print(f"No stats recorded. Set {ENV_VAR}=1 or pass --stats to enable.",
+              file=file)
+        return
+
+    print(f"{'operation':<26}{'calls':>7}{'total ms':>11}{'mean ms':>10}"
+          f"{'rows':>11}{'bytes':>13}", file=file)
+    for op, x in sorted(ops.items(), key=lambda kv: -kv[1]["seconds"]):
+        print(f"{op:<26}{x['calls']:>7}{x['seconds'] * 1e3:>11.2f}"
+              f"{x['seconds'] * 1e3 / x['calls']:>10.2f}{x['rows']:>11}"
+              f"{x['bytes']:>13}", file=file)
+
+def log_report() -> None:
+    """Writes the recorded totals to the log, one line per operation."""
+
+    for op, x in report().items():
+        logger.info("stats %s: %d calls, %.6f s, %d rows, %d bytes",
+                    op, x["calls"], x["seconds"], x["rows"], x["bytes"])
@@ -0,0 +1,241 @@
+"""
+Write-ahead journal for an ExpenseList, with group commit, snapshot
+compaction and crash recovery.
+
+A journaled ledger is a directory with two files:
+    snapshot.ftb   binary ledger with the expenses up to some point
+    journal.jsonl  a header line {"base": n} followed by one JSON line per
+                   expense added after the first n
+
+Every added expense is appended to the journal, which is fsynced once per
+group_commit expenses. Every compact_every expenses the whole list is
+written to a new snapshot (temporary file renamed over the old one) and the
+journal restarts from it. On open, the snapshot is mapped and only the
+journal lines it does not already contain are replayed.
+"""
+
+from fintrack.expense import Expense, ExpenseList, _atomic_write
+from fintrack import binary
+import json
+import logging
+import os
+import pathlib as pl
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT = f"snapshot{binary.SUFFIX}"
+JOURNAL = "journal.jsonl"
+
+GROUP_COMMIT = 32
+"""Number of journaled expenses per fsync."""
+
+COMPACT_EVERY = 10_000
+"""Number of journaled expenses after which a new snapshot is written."""
+
+class JournalError(ValueError):
+    """Raised when a journaled ledger cannot be recovered."""
+
+def _write_header(path: pl.Path, base: int) -> None:
+    """Atomically replaces the journal with an empty one starting at row base."""
+
+    def write(tmp_path: pl.Path) -> None:
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps({"base" : base}) + "\n")
+
+    _atomic_write(path, write)
+
+def _read_journal(path: pl.Path) -> tuple[int, ExpenseList]:
+    """
+    Reads a journal file. A torn last line, left by a crash in the middle
+    of a write, is cut off the file.
+
+    Returns
+    -------
+    tuple[int, ExpenseList]
+        The base row of the journal and its expenses.
+
+    Raises
+    ------
+    JournalError
+        If the header or a line other than the last one is invalid.
+    """
+
+    records = ExpenseList()
+    with open(path, "rb+") as f:
+        try:
+            base = int(json.loads(f.readline())["base"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise JournalError("Invalid journal header.") from e
+
+        good = f.tell()
+        for n, line in enumerate(f, start=2):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("Unterminated line.")
+                records.add(Expense.from_dict(json.loads(line)))
+            except (KeyError, TypeError, ValueError) as e:
+                if f.read(1):
+                    raise JournalError(f"Invalid journal line {n}.") from e
+                logger.warning("Dropping torn journal line %d.", n)
+                f.truncate(good)
+                break
+            good += len(line)
+
+    return base, records
+
+class Journal():
+    def __init__(self,
+                 directory: pl.Path,
+                 owner: ExpenseList,
+                 logged: int,
+                 group_commit: int = GROUP_COMMIT,
+                 compact_every: int = COMPACT_EVERY):
+        """
+        Journal constructor. Use Journal.open() to get a recovered ledger
+        with a journal attached.
+
+        Parameters
+        ----------
+        directory : pl.Path
+            Directory of the journaled ledger.
+        owner : ExpenseList
+            List whose additions are journaled.
+        logged : int
+            Number of expenses already in the journal file.
+        group_commit : int, optional
+            Number of journaled expenses per fsync.
+        compact_every : int, optional
+            Journal length that triggers a new snapshot, 0 to never compact
+            automatically.
+        """
+
+        self.__dir = directory
+        self.__owner = owner
+        self.__logged = logged
+        self.__unsynced = 0
+        self.__group_commit = max(1, group_commit)
+        self.__compact_every = compact_every
+        self.__file = open(directory / JOURNAL, "a")
+
+    @staticmethod
+    def is_journaled(directory: pl.Path) -> bool:
+        """Checks if a directory holds a journaled ledger."""
+
+        return (directory / SNAPSHOT).exists() or (directory / JOURNAL).exists()
+
+    @classmethod
+    def open(cls,
+             directory: pl.Path,
+             group_commit: int = GROUP_COMMIT,
+             compact_every: int = COMPACT_EVERY,
+             create: bool = True) -> ExpenseList:
+        """
+        Opens a journaled ledger directory, creating it if missing, and
+        recovers its expenses: the snapshot plus the journal lines written
+        after it.
+
+        Parameters
+        ----------
+        directory : pl.Path
+            Directory of the journaled ledger.
+        group_commit : int, optional
+            Number of journaled expenses per fsync.
+        compact_every : int, optional
+            Journal length that triggers a new snapshot.
+        create : bool, optional
+            Start a new journaled ledger if the directory holds none.
+            Otherwise only existing ones are opened.
+
+        Returns
+        -------
+        ExpenseList
+            The recovered list, with the journal attached.
+
+        Raises
+        ------
+        JournalError
+            If the snapshot or the journal is corrupt, or the directory
+            holds no journaled ledger and create is False.
+        """
+
+        if not create and not cls.is_journaled(directory):
+            raise JournalError(f"{directory} holds no snapshot or journal.")
+        directory.mkdir(parents=True, exist_ok=True)
+        snapshot_path = directory / SNAPSHOT
+        journal_path = directory / JOURNAL
+
+        exp = ExpenseList()
+        if snapshot_path.exists():
+            exp = ExpenseList.from_bin(snapshot_path)
+            if exp is None:
+                raise JournalError("Invalid snapshot.")
+
+        if not journal_path.exists():
+            _write_header(journal_path, len(exp))
+
+        base, records = _read_journal(journal_path)
+        skip = len(exp) - base
+        if skip < 0 or skip > len(records):
+            raise JournalError("Journal does not continue the snapshot.")
+
+        tail = records._take(range(skip, len(records)))
+        exp.extend(tail)
+        logger.info("Recovered %d expenses, replayed %d from the journal.",
+                    len(exp), len(tail))
+
+        journal = cls(directory, exp, len(records), group_commit, compact_every)
+        exp.attach_journal(journal)
+        return exp
+
+    @property
+    def directory(self) -> pl.Path:
+        return self.__dir
+
+    def log_rows(self, exp: ExpenseList, start: int, stop: int) -> None:
+        """
+        Appends rows start..stop of the owning list to the journal. Called
+        by ExpenseList whenever expenses are added. This function returns
+        nothing.
+        """
+
+        for i in range(start, stop):
+            self.__file.write(json.dumps(exp._row_dict(i)) + "\n")
+        self.__logged += stop - start
+        self.__unsynced += stop - start
+
+        if self.__unsynced >= self.__group_commit:
+            self.sync()
+        if self.__compact_every and self.__logged >= self.__compact_every:
+            self.compact()
+
+    def sync(self) -> None:
+        """Flushes and fsyncs the journaled expenses not yet on disk."""
+
+        if not self.__unsynced:
+            return
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+        self.__unsynced = 0
+
+    def compact(self) -> None:
+        """
+        Writes the whole list to a new snapshot and restarts the journal
+        after it. Either file is replaced atomically, and a crash between the
+        two only makes recovery skip the lines the snapshot already has.
+        """
+
+        self.sync()
+        self.__owner.save(self.__dir / SNAPSHOT)
+        self.__file.close()
+        _write_header(self.__dir / JOURNAL, len(self.__owner))
+        self.__file = open(self.__dir / JOURNAL, "a")
+        self.__logged = 0
+        logger.info("Compacted journal into a snapshot of %d expenses.",
+                    len(self.__owner))
+
+    def close(self) -> None:
+        """Syncs the journal, closes it and detaches it from the list."""
+
+        self.sync()
+        self.__file.close()
+        self.__owner.attach_journal(None)
@@ -0,0 +1,7 @@
+from fintrack.expense import Expense, Category
+import datetime as dt
+
+def expense(i: int) -> Expense:
+    """Numbered test expense, dated within January 2025."""
+
+    return Expense(i, Category.FOOD, f"e{i}", dt.date(2025, 1, 1 + i % 28))
@@ -0,0 +1,78 @@
+from fintrack.autosave import AutoSaver
+from fintrack.expense import ExpenseList
+from tests.helpers import expense
+import pathlib as pl
+import subprocess
+import sys
+import time
+
+def test_autosave_coalesces(tmp_path):
+    path = tmp_path / "exp.jsonl"
+    saver = AutoSaver(path, delay=0.2)
+    exp = ExpenseList()
+    for i in range(5):
+        with saver.lock:
+            exp.add(expense(i))
+        saver.notify(exp)
+    assert not path.exists()
+
+    time.sleep(0.6)
+    assert saver.saves == 1
+    assert ExpenseList.load(path) == exp
+
+    saver.notify(exp)
+    saver.close()
+    assert saver.saves == 1
+
+def test_autosave_close_flushes(tmp_path):
+    path = tmp_path / "exp.json"
+    saver = AutoSaver(path, delay=60)
+    exp = ExpenseList([expense(1)])
+    saver.notify(exp)
+    saver.close()
+    assert ExpenseList.load(path) == exp
+
+def test_autosave_survives_errors(tmp_path, monkeypatch, caplog):
+    path = tmp_path / "exp.json"
+    saver = AutoSaver(path, delay=0.05)
+    save = ExpenseList.save
+
+    def broken(self, store_path):
+        raise ValueError("broken")
+
+    monkeypatch.setattr(ExpenseList, "save", broken)
+    exp = ExpenseList([expense(1)])
+    saver.notify(exp)
+    time.sleep(0.3)
+    assert saver.saves == 0
+    assert "Autosave" in caplog.text
+
+    monkeypatch.setattr(ExpenseList, "save", save)
+    exp.add(expense(2))
+    saver.notify(exp)
+    saver.close()
+    assert saver.saves == 1
+    assert ExpenseList.load(path) == exp
+
+def test_main_autosave_exit(tmp_path):
+    path = tmp_path / "exp.csv"
+    answers = [23, path, 1, 12.5, "food", "lunch", "n", 27]
+    src = pl.Path(__file__).resolve().parents[1]
+    result = subprocess.run([sys.executable, "-m", "fintrack"], cwd=tmp_path,
+                            input="\n".join(map(str, answers)) + "\n",
+                            capture_output=True, text=True, timeout=60,
+                            env={"PYTHONPATH" : str(src)})
+    assert result.returncode == 0, result.stderr
+    assert len(ExpenseList.load(path)) == 1
+    assert "exit" in (tmp_path / "expense_tracker.log").read_text()
+
+def test_main_autosave_eof(tmp_path):
+    path = tmp_path / "exp.csv"
+    answers = [23, path, 1, 12.5, "food", "lunch", "n"]
+    src = pl.Path(__file__).resolve().parents[1]
+    result = subprocess.run([sys.executable, "-m", "fintrack"], cwd=tmp_path,
+                            input="\n".join(map(str, answers)) + "\n",
+                            capture_output=True, text=True, timeout=60,
+                            env={"PYTHONPATH" : str(src)})
+    assert result.returncode == 0, result.stderr
+    assert len(ExpenseList.load(path)) == 1
@@ -0,0 +1,103 @@
+from fintrack.expense import ExpenseList, Expense, Category
+from fintrack import batch
+import pytest
+import datetime as dt
+import json
+import io
+
+CSV_RECORDS = ("amount,category,desc,date\n"
+               "10,food,lunch,2025-01-02\n"
+               "-1,food,negative,2025-01-02\n"
+               "5,rent,,None\n")
+
+@pytest.fixture(params=[".jsonl", ".json", ".csv", ".ftb", ".db"])
+def ledger(request, tmp_path, monkeypatch):
+    path = tmp_path / f"ledger{request.param}"
+    monkeypatch.setattr("sys.stdin", io.StringIO(CSV_RECORDS))
+    assert batch.run(["import", str(path)]) == 0
+    return path
+
+def test_import(ledger, capsys):
+    assert batch.run(["total", str(ledger)]) == 0
+    assert capsys.readouterr().out == "15.0\n"
+
+def test_add(ledger, capsys):
+    args = ["add", str(ledger), "--amount", "2.5", "--category", "health",
+            "--desc", "pills", "--date", "2025-01-03"]
+    assert batch.run(args) == 0
+    assert batch.run(["total", str(ledger), "--from", "2025-01-01",
+                      "--to", "2025-01-31"]) == 0
+    assert capsys.readouterr().out.splitlines()[-1] == "12.5"
+
+def test_summary(ledger, capsys):
+    assert batch.run(["summary", str(ledger)]) == 0
+    out = capsys.readouterr().out
+    assert "food: 10.0" in out and "rent: 5.0" in out
+
+def test_filter(ledger, capsys):
+    assert batch.run(["filter", str(ledger), "--category", "rent",
+                      "--format", "jsonl"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert out[-1] == ('{"amount": 5.0, "category": "rent", '
+                       '"desc": "", "date": "None"}')
+
+def test_csv_read_in_chunks(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "ledger.csv"
+    path.write_text(CSV_RECORDS)
+    monkeypatch.setattr(ExpenseList, "load", None)
+
+    assert batch.run(["total", str(path), "--category", "rent"]) == 0
+    assert batch.run(["total", str(path), "--from", "2025-01-01"]) == 0
+    assert batch.run(["filter", str(path), "--to", "2025-01-31",
+                      "--format", "jsonl"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert out[:2] == ["5.0", "10.0"]
+    assert out[2:] == ['{"amount": 10.0, "category": "food", '
+                       '"desc": "lunch", "date": "2025-01-02"}']
+    assert batch.run(["filter", str(tmp_path / "none.csv")]) == 1
+
+def test_append_keeps_invalid_csv_rows(tmp_path):
+    path = tmp_path / "ledger.csv"
+    path.write_text(CSV_RECORDS + "3,transport,bus,2025-01-04\n")
+    before = path.read_text()
+    assert batch.run(["add", str(path), "--amount", "1",
+                      "--category", "food"]) == 1
+    assert path.read_text() == before
+
+def test_export(ledger, tmp_path):
+    out = tmp_path / "out.json"
+    assert batch.run(["export", str(ledger), str(out)]) == 0
+    result = ExpenseList.from_json(out)
+    assert list(result.exp_list) == [
+            Expense(10, Category.FOOD, "lunch", dt.date(2025, 1, 2)),
+            Expense(5, Category.RENT, "")]
+
+def test_missing_ledger(tmp_path, capsys):
+    assert batch.run(["total", str(tmp_path / "none.db")]) == 1
+    assert batch.run(["total", str(tmp_path / "none.json")]) == 1
+
+def test_plain_directory(tmp_path):
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    assert batch.run(["total", str(plain)]) == 1
+    assert list(plain.iterdir()) == []
+
+    assert batch.run(["add", str(plain), "--amount", "1", "--category", "food"]) == 0
+    assert batch.run(["total", str(plain)]) == 0
+
+def test_invalid_args(tmp_path):
+    with pytest.raises(SystemExit):
+        batch.run(["add", str(tmp_path / "l.jsonl"), "--amount", "1",
+                   "--category", "cars"])
+
+def test_append_after_torn_line(tmp_path):
+    path = tmp_path / "l.jsonl"
+    ExpenseList([Expense(1, Category.FOOD, "a")]).save(path)
+    with open(path, "a") as f:
+        f.write('{"amount": 2, "categ')
+
+    new = ExpenseList([Expense(3, Category.RENT, "b")])
+    batch.append(path, new)
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    assert Expense.from_dict(json.loads(lines[-1])) == new.exp_list[0]
@@ -0,0 +1,66 @@
+from fintrack.expense import ExpenseList, Expense, Category
+from fintrack import binary
+import pytest
+import datetime as dt
+
+@pytest.fixture
+def exp_list():
+    exp_list = ExpenseList()
+    exp_list.add(Expense(100, Category.FOOD, "groceries", dt.date(2025, 6, 10)))
+    exp_list.add(Expense(5, Category.RENT, "bus pass"))
+    exp_list.add(Expense(2.5, Category.FOOD, "groceries", dt.date(2025, 5, 1)))
+    return exp_list
+
+@pytest.fixture
+def bin_path(exp_list, tmp_path):
+    exp_list.to_bin(tmp_path)
+    return tmp_path / f"exp{binary.SUFFIX}"
+
+def test_to_bin(bin_path):
+    assert bin_path.exists()
+    assert bin_path.read_bytes()[:4] == binary.MAGIC
+
+def test_to_bin_exists(exp_list, bin_path):
+    size = bin_path.stat().st_size
+    ExpenseList().to_bin(bin_path.parent)
+    assert bin_path.stat().st_size == size
+
+def test_from_bin(exp_list, bin_path):
+    result = ExpenseList.from_bin(bin_path)
+    assert result == exp_list
+    assert result.exp_list[1].desc == "bus pass"
+
+def test_from_bin_totals(exp_list, bin_path):
+    result = ExpenseList.from_bin(bin_path)
+    assert result.totals() == exp_list.totals()
+    assert result.check_totals()
+    assert result.total_between(dt.date(2025, 5, 1), dt.date(2025, 6, 1)) == 2.5
+
+def test_from_bin_add(exp_list, bin_path):
+    result = ExpenseList.from_bin(bin_path)
+    new = Expense(1, Category.HEALTH, "pills", dt.date(2025, 1, 1))
+    result.add(new)
+    exp_list.add(new)
+    assert result == exp_list
+    assert result.check_totals()
+
+def test_from_bin_empty(tmp_path):
+    ExpenseList().to_bin(tmp_path)
+    result = ExpenseList.from_bin(tmp_path / f"exp{binary.SUFFIX}")
+    assert len(result) == 0
+    assert result.totals()["total"] == 0
+
+def test_from_bin_truncated(bin_path):
+    bin_path.write_bytes(bin_path.read_bytes()[:-8])
+    assert ExpenseList.from_bin(bin_path) is None
+
+def test_from_bin_invalid(tmp_path):
+    path = tmp_path / f"exp{binary.SUFFIX}"
+    path.write_bytes(b"not a ledger at all, just some text")
+    assert ExpenseList.from_bin(path) is None
+
+def test_load_converts(exp_list, tmp_path):
+    exp_list.to_json(tmp_path)
+    result = ExpenseList.load(tmp_path / "exp.json")
+    result.to_bin(tmp_path)
+    assert ExpenseList.from_bin(tmp_path / f"exp{binary.SUFFIX}") == exp_list
@@ -0,0 +1,41 @@
+from fintrack.cache import QueryCache
+from fintrack.expense import ExpenseList, Expense, Category
+import datetime as dt
+
+def test_cache_lru():
+    cache = QueryCache(max_entries=2)
+    cache.get(0, "a", lambda: 1)
+    cache.get(0, "b", lambda: 2)
+    cache.get(0, "a", lambda: 1)
+    cache.get(0, "c", lambda: 3)
+    assert cache.stats()["entries"] == 2
+    assert cache.get(0, "b", lambda: 20) == 20
+    assert cache.get(0, "c", lambda: 30) == 3
+    assert (cache.hits, cache.misses) == (2, 4)
+
+def test_cache_memory_cap():
+    cache = QueryCache(max_bytes=100)
+    big = "x" * 1000
+    assert cache.get(0, "big", lambda: big) is big
+    assert cache.stats()["entries"] == 0
+    assert cache.get(0, "big", lambda: None) is big
+
+def test_cache_version():
+    cache = QueryCache()
+    cache.get(0, "a", lambda: 1)
+    assert cache.get(1, "a", lambda: 2) == 2
+    assert cache.stats()["entries"] == 1
+
+def test_views_cached(capsys):
+    exp = ExpenseList([Expense(i, Category.FOOD, "", dt.date(2025, 1, 1 + i))
+                       for i in range(5)])
+    exp.view_cat(Category.FOOD)
+    exp.view_by_date(dt.date(2025, 1, 1), dt.date(2025, 1, 3))
+    exp.view_cat(Category.FOOD)
+    assert (exp.query_cache.hits, exp.query_cache.misses) == (1, 2)
+
+    exp.add(Expense(1, Category.FOOD, "new", None))
+    capsys.readouterr()
+    exp.view_cat(Category.FOOD)
+    assert "new" in capsys.readouterr().out
+    assert exp.query_cache.misses == 3
@@ -82,3 +82,84 @@ def test_input_to_csv(exp, monkeypatch, tmp_path):
 
 # XXX no more tests -- I won't learn much more from them and will waste time
 #     I can use on other projects
+
+def test_input_to_jsonl(exp, monkeypatch, tmp_path):
+    monkeypatch.setattr("builtins.input", lambda _: str(tmp_path))
+    cli.input_to_jsonl(exp)
+    assert (tmp_path / "exp.jsonl").exists()
+
+def test_input_load_jsonl(exp, monkeypatch, tmp_path):
+    exp.to_jsonl(tmp_path)
+    monkeypatch.setattr("builtins.input", lambda _: str(tmp_path / "exp.jsonl"))
+    assert cli.input_load_jsonl() == exp
+
+def test_input_summarize_csv(exp, monkeypatch, tmp_path, capsys):
+    exp.to_csv(tmp_path)
+    inputs = iter([str(tmp_path / "exp.csv"), "", "n"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    cli.input_summarize_csv()
+    assert f"Total expenses: {float(EXP_AMT)}" in capsys.readouterr().out
+
+def test_input_filter_csv(exp, monkeypatch, tmp_path, capsys):
+    exp.add(Expense(7, Category.RENT, "rent", EXP_DATE))
+    exp.to_csv(tmp_path)
+    inputs = iter([str(tmp_path / "exp.csv"), "1", "y", "2012 12 1",
+                   "2012 12 31", "rent", "q"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    cli.input_filter_csv()
+    out = capsys.readouterr().out
+    assert "Page 1 of 1 (1 expenses" in out
+    assert "rent" in out and "food shopping" not in out
+
+def test_input_open_journal(monkeypatch, tmp_path):
+    monkeypatch.setattr("builtins.input", lambda _: str(tmp_path / "ledger"))
+    exp = cli.input_open_journal()
+    assert exp.journal is not None
+    exp.journal.close()
+
+def test_open_ledger_plain_directory(tmp_path, capsys):
+    assert cli.open_ledger(tmp_path) is None
+    assert "holds no snapshot or journal" in capsys.readouterr().out
+    assert list(tmp_path.iterdir()) == []
+
+def test_input_import_files(monkeypatch, tmp_path, exp):
+    exp.save(tmp_path / "a.csv")
+    exp.save(tmp_path / "b.jsonl")
+    answers = iter([str(tmp_path), "n"])
+    monkeypatch.setattr("builtins.input", lambda _: next(answers))
+    result = cli.input_import_files()
+    assert len(result) == 2
+
+def test_input_browse(monkeypatch, capsys):
+    exp = ExpenseList([Expense(i, EXP_CAT, f"item {i}", dt.date(2025, 1, 1 + i))
+                       for i in range(25)])
+    inputs = iter(["n", "x", "d", "2025 1 3", "3", "q"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    cli.input_browse(exp)
+    out = capsys.readouterr().out
+    assert "Page 2 of 2" in out
+    assert "Invalid command." in out
+    assert "No such page." in out
+
+def test_input_rollup(exp, monkeypatch, capsys):
+    inputs = iter(["week", "x", "y"])
+    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    cli.input_rollup(exp)
+    out = capsys.readouterr().out
+    assert "2012-12-10" in out
+
+def test_input_rollup_invalid(exp, monkeypatch, capsys):
+    monkeypatch.setattr("builtins.input", lambda _: "decade")
+    cli.input_rollup(exp)
+    assert "Invalid period." in capsys.readouterr().out
+
+def test_input_open_shared(monkeypatch, tmp_path):
+    path = tmp_path / "shared.jsonl"
+    monkeypatch.setattr("builtins.input", lambda _: str(path))
+    exp = cli.input_open_shared()
+    exp.add(Expense(*EXP_ARGS))
+    exp.journal.close()
+    assert len(cli.input_open_shared()) == 1
+
+    monkeypatch.setattr("builtins.input", lambda _: str(tmp_path / "shared.json"))
+    assert cli.input_open_shared().journal is None
@@ -0,0 +1,70 @@
+from fintrack.expense import ExpenseList, Expense, Category
+from fintrack import compression, batch
+import datetime as dt
+import gzip
+import pytest
+
+CODECS = [c for c in compression.available()]
+
+def ledger():
+    return ExpenseList([Expense(i, Category.FOOD, "lunch" if i % 3 else "rent",
+                                dt.date(2025, 1, 1 + i % 28) if i % 7 else None)
+                        for i in range(200)])
+
+@pytest.mark.parametrize("codec", CODECS)
+@pytest.mark.parametrize("fmt", [".json", ".csv", ".jsonl"])
+def test_compressed_round_trip(tmp_path, codec, fmt):
+    exp = ledger()
+    plain = tmp_path / f"exp{fmt}"
+    path = tmp_path / f"exp{fmt}{compression.SUFFIXES[codec]}"
+    assert exp.save(plain)
+    assert exp.save(path, level=1)
+    assert compression.sniff(path) == codec
+    assert path.stat().st_size < plain.stat().st_size
+    assert ExpenseList.load(path) == exp
+
+def test_compressed_magic_bytes(tmp_path):
+    exp = ledger()
+    exp.save(tmp_path / "exp.json")
+    data = (tmp_path / "exp.json").read_bytes()
+    (tmp_path / "exp.json").write_bytes(gzip.compress(data))
+    assert ExpenseList.from_json(tmp_path / "exp.json") == exp
+
+def test_compressed_to_csv(tmp_path):
+    exp = ledger()
+    exp.to_csv(tmp_path, codec="bz2")
+    assert ExpenseList.from_csv(tmp_path / "exp.csv.bz2") == exp
+    exp.to_csv(tmp_path, codec="nope")
+    assert sorted(x.name for x in tmp_path.iterdir()) == ["exp.csv.bz2"]
+
+def test_compressed_corrupt(tmp_path):
+    path = tmp_path / "exp.jsonl.gz"
+    path.write_bytes(gzip.compress(b'{"amount": 1}\n')[:-6])
+    assert ExpenseList.from_jsonl(path) is None
+
+def test_batch_export_compressed(tmp_path):
+    ledger().save(tmp_path / "exp.json")
+    assert batch.run(["export", str(tmp_path / "exp.json"),
+                      str(tmp_path / "out.csv.xz"), "--level", "9"]) == 0
+    assert ExpenseList.load(tmp_path / "out.csv.xz") == ledger()
+
+@pytest.mark.parametrize("codec, level", [("gzip", 10), ("bz2", 0), ("lzma", -1)])
+def test_invalid_level(tmp_path, codec, level):
+    path = tmp_path / f"exp.json{compression.SUFFIXES[codec]}"
+    with pytest.raises(compression.CompressionError):
+        compression.open_text(path, "w", level=level)
+    assert not ledger().save(path, level)
+    assert not path.exists()
+
+@pytest.mark.parametrize("level", ["42", "-5", "x"])
+def test_batch_export_invalid_level(tmp_path, capsys, level):
+    ledger().save(tmp_path / "exp.json")
+    with pytest.raises(SystemExit):
+        batch.run(["export", str(tmp_path / "exp.json"),
+                   str(tmp_path / "out.csv.xz"), "--level", level])
+    assert "invalid level" in capsys.readouterr().err
+
+def test_batch_export_level_out_of_codec_range(tmp_path):
+    ledger().save(tmp_path / "exp.json")
+    assert batch.run(["export", str(tmp_path / "exp.json"),
+                      str(tmp_path / "out.csv.gz"), "--level", "20"]) == 1
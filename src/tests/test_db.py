@@ -0,0 +1,117 @@
+from fintrack.expense import ExpenseList, Expense, Category
+from fintrack.db import ExpenseDB
+from fintrack import cli
+import pytest
+import datetime as dt
+import pathlib as pl
+import sqlite3
+import subprocess
+import sys
+
+@pytest.fixture
+def exp_list():
+    exp_list = ExpenseList()
+    exp_list.add(Expense(100, Category.FOOD, "groceries", dt.date(2025, 6, 10)))
+    exp_list.add(Expense(5, Category.RENT, "bus pass"))
+    exp_list.add(Expense(2.5, Category.FOOD, "coffee", dt.date(2025, 5, 1)))
+    return exp_list
+
+@pytest.fixture
+def db(exp_list, tmp_path):
+    db = ExpenseDB(tmp_path / "exp.db", batch_size=2)
+    db.insert_list(exp_list)
+    yield db
+    db.close()
+
+def test_db_round_trip(exp_list, db):
+    assert db.to_list() == exp_list
+    assert len(db) == 3
+
+def test_db_add_batched(db, tmp_path):
+    db.add(Expense(1, Category.HEALTH, "pills"))
+    other = sqlite3.connect(tmp_path / "exp.db")
+    count = "SELECT COUNT(*) FROM expenses"
+    assert other.execute(count).fetchone()[0] == 3
+    db.add(Expense(1, Category.HEALTH, "pills"))
+    assert other.execute(count).fetchone()[0] == 5
+
+def test_db_reopen(exp_list, db, tmp_path):
+    db.add(Expense(1, Category.HEALTH, "pills"))
+    db.close()
+    exp_list.add(Expense(1, Category.HEALTH, "pills"))
+    reopened = ExpenseDB.open(tmp_path / "exp.db")
+    assert reopened.to_list() == exp_list
+    reopened.close()
+
+def test_db_totals(db):
+    assert db._total_expenses() == 107.5
+    assert db.total_between(dt.date(2025, 5, 1), dt.date(2025, 6, 1)) == 2.5
+
+def test_db_views(db, capsys):
+    db.view_cat(Category.FOOD)
+    out = capsys.readouterr().out
+    assert "bus pass" not in out
+    assert "Expenses on food: 102.5" in out
+
+    db.view_by_date(dt.date(2025, 6, 1), dt.date(2025, 6, 30))
+    out = capsys.readouterr().out
+    assert "groceries" in out and "coffee" not in out
+
+    db.summary_by_cat()
+    out = capsys.readouterr().out
+    assert "food: 102.5" in out and "rent: 5.0" in out
+
+def test_db_queries_use_indexes(db, tmp_path):
+    conn = sqlite3.connect(tmp_path / "exp.db")
+    for where in ["day BETWEEN 1 AND 2", "category = 1"]:
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT TOTAL(amount) "
+                            f"FROM expenses WHERE {where}").fetchall()
+        assert "INDEX" in str(plan)
+
+def test_db_open_invalid(tmp_path):
+    path = tmp_path / "exp.db"
+    path.write_text("not a database" * 100)
+    assert ExpenseDB.open(path) is None
+    assert ExpenseDB.open(tmp_path / "exp.json") is None
+
+def test_input_open_db(monkeypatch, tmp_path):
+    monkeypatch.setattr("builtins.input", lambda _: str(tmp_path / "new.db"))
+    db = cli.input_open_db()
+    assert isinstance(db, ExpenseDB)
+    db.close()
+
+def test_input_to_db(exp_list, monkeypatch, tmp_path):
+    monkeypatch.setattr("builtins.input", lambda _: str(tmp_path))
+    cli.input_to_db(exp_list)
+    db = ExpenseDB.open(tmp_path / "exp.db")
+    assert db.to_list() == exp_list
+    db.close()
+
+def test_input_to_db_from_db(exp_list, db, monkeypatch, tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    db.add(Expense(1, Category.HEALTH, "pills"))
+    monkeypatch.setattr("builtins.input", lambda _: str(out))
+    cli.input_to_db(db)
+    exp_list.add(Expense(1, Category.HEALTH, "pills"))
+    copy = ExpenseDB.open(out / "exp.db")
+    assert copy.to_list() == exp_list
+    copy.close()
+
+def test_db_rollup(exp_list, db):
+    assert db.rollup("month") == exp_list.rollup("month")
+    assert db.rollup("year", by_cat=True) == exp_list.rollup("year", by_cat=True)
+    assert db.rollup("day", t=dt.date(2025, 6, 1)) == {dt.date(2025, 5, 1) : 2.5}
+
+def test_main_db_flushed_on_eof(tmp_path):
+    path = tmp_path / "exp.db"
+    answers = [1, 12.5, "food", "lunch", "n"] * 3
+    src = pl.Path(__file__).resolve().parents[1]
+    result = subprocess.run([sys.executable, "-m", "fintrack", str(path)],
+                            cwd=tmp_path, input="\n".join(map(str, answers)) + "\n",
+                            capture_output=True, text=True, timeout=60,
+                            env={"PYTHONPATH" : str(src)})
+    assert result.returncode == 0, result.stderr
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0] == 3
+    conn.close()
@@ -1,6 +1,11 @@
-from fintrack.expense import ExpenseList, Expense, Category
+from fintrack.expense import (ExpenseList, Expense, Category, STR_TO_CAT, NO_DATE,
+                              parse_day, format_day)
 import pytest
 import datetime as dt
+import json
+import pathlib as pl
+import subprocess
+import sys
 
 TEST_AMOUNT = 100.0
 TEST_CAT    = Category.FOOD
@@ -120,3 +125,385 @@ def test_view_by_date(exp, exp_list):
 def test_summary_by_cat(exp, exp_list):
     exp_list.add(exp)
     exp_list.summary_by_cat()
+
+def test_expense_list_len(exp, exp_list):
+    assert len(exp_list) == 0
+    exp_list.add(exp)
+    exp_list.add(exp)
+    assert len(exp_list) == 2
+
+def test_expense_list_view_lazy(exp, exp_list):
+    exp_list.add(exp)
+    exp_list.add(Expense(5, Category.RENT, "rent"))
+    view = exp_list.exp_list
+    assert len(view) == 2
+    assert view[0] == exp
+    assert view[-1].date is None
+    assert view[:1] == [exp]
+    with pytest.raises(IndexError):
+        view[2]
+
+def test_expense_list_columns_interned(exp_list):
+    exp_list.add(Expense(1, Category.FOOD, "".join(["bus ", "pass"])))
+    exp_list.add(Expense(2, Category.FOOD, "".join(["bus ", "pass"])))
+    assert exp_list.exp_list[0].desc is exp_list.exp_list[1].desc
+
+def test_view_cat_total(exp, exp_list, capsys):
+    exp_list.add(exp)
+    exp_list.add(Expense(5, Category.RENT, "rent"))
+    exp_list.view_cat(Category.FOOD)
+    out = capsys.readouterr().out
+    assert "rent" not in out
+    assert f"Expenses on food: {TEST_AMOUNT}" in out
+
+def test_totals_running(exp, exp_list):
+    exp_list.add(exp)
+    exp_list.add(Expense(5, Category.RENT, "rent", TEST_DATE))
+    exp_list.add(Expense(2, Category.FOOD, "snack"))
+    totals = exp_list.totals()
+    assert totals["total"] == TEST_AMOUNT + 7
+    assert totals["by_cat"][Category.FOOD] == TEST_AMOUNT + 2
+    assert totals["by_day"] == {TEST_DATE : TEST_AMOUNT + 5}
+    assert totals["by_month"] == {(2025, 6) : TEST_AMOUNT + 5}
+
+def test_totals_consistent(exp_list):
+    for i in range(200):
+        exp_list.add(Expense(i * 0.1,
+                             list(Category)[i % len(Category)],
+                             "x",
+                             dt.date(2025, 1 + i % 12, 1 + i % 28)))
+    assert exp_list.check_totals()
+    assert exp_list.totals()["by_month"].keys() == \
+            exp_list.recompute_totals()["by_month"].keys()
+
+def test_parse_day():
+    assert parse_day("2025-06-10") == TEST_DATE.toordinal()
+    assert parse_day("2025-6-10") == TEST_DATE.toordinal()
+    assert parse_day("None") == NO_DATE
+    for bad in ("", "2025-02-30", "20250610", "june"):
+        with pytest.raises(ValueError):
+            parse_day(bad)
+    assert format_day(TEST_DATE.toordinal()) == "2025-06-10"
+    assert format_day(NO_DATE) == "None"
+
+def test_expense_from_dict_day(exp):
+    new = Expense.from_dict(exp.to_dict())
+    assert new.day == TEST_DATE.toordinal()
+    assert new == exp and hash(new) == hash(exp)
+    assert new.date == TEST_DATE
+    undated = Expense.from_dict({**exp.to_dict(), "date" : "None"})
+    assert undated.day == NO_DATE and undated.date is None
+    with pytest.raises(ValueError):
+        Expense.from_dict({**exp.to_dict(), "date" : "2025-13-01"})
+
+def test_rollup(exp, exp_list):
+    exp_list.add(exp)
+    exp_list.add(Expense(5, Category.RENT, "rent", dt.date(2025, 6, 15)))
+    exp_list.add(Expense(7, Category.RENT, "rent", dt.date(2024, 12, 31)))
+    exp_list.add(Expense(2, Category.FOOD, "snack"))
+    assert exp_list.rollup("month") == {(2024, 12) : 7, (2025, 6) : TEST_AMOUNT + 5}
+    assert exp_list.rollup("year") == {2024 : 7, 2025 : TEST_AMOUNT + 5}
+    assert exp_list.rollup("week") == {dt.date(2024, 12, 30) : 7,
+                                       dt.date(2025, 6, 9) : TEST_AMOUNT + 5}
+    assert exp_list.rollup("day", f=dt.date(2025, 6, 11)) == {dt.date(2025, 6, 15) : 5}
+
+    by_cat = exp_list.rollup("year", by_cat=True)
+    assert by_cat[2025][Category.FOOD] == TEST_AMOUNT
+    assert by_cat[2025][Category.RENT] == 5
+    assert by_cat[2024][Category.HEALTH] == 0
+
+    with pytest.raises(ValueError):
+        exp_list.rollup("decade")
+
+def test_rollup_vectorized(exp_list, tmp_path):
+    for i in range(200):
+        exp_list.add(Expense(i * 0.1,
+                             list(Category)[i % len(Category)],
+                             "x",
+                             dt.date(2020 + i % 5, 1 + i % 12, 1 + i % 28)))
+    exp_list.to_bin(tmp_path)
+    mapped = ExpenseList.from_bin(tmp_path / "exp.ftb")
+    for period in ("day", "week", "month", "year"):
+        new = mapped.rollup(period, by_cat=True)
+        old = exp_list.rollup(period, by_cat=True)
+        assert new.keys() == old.keys()
+        assert all(new[k] == pytest.approx(old[k]) for k in old)
+    assert mapped.rollup("month") == pytest.approx(exp_list.totals()["by_month"])
+
+def test_view_rollup(exp, exp_list, capsys):
+    exp_list.add(exp)
+    exp_list.view_rollup("month", by_cat=True)
+    out = capsys.readouterr().out
+    assert "2025-06" in out
+    assert f"Total expenses: {TEST_AMOUNT}" in out
+
+def test_total_between_out_of_order(exp_list):
+    days = [5, 1, 9, 3, 3, 7]
+    for d in days:
+        exp_list.add(Expense(d, Category.FOOD, "x", dt.date(2025, 1, d)))
+    exp_list.add(Expense(100, Category.FOOD, "no date"))
+    assert exp_list.total_between(dt.date(2025, 1, 3),
+                                  dt.date(2025, 1, 7)) == 3 + 3 + 5 + 7
+    exp_list.add(Expense(2, Category.FOOD, "x", dt.date(2025, 1, 2)))
+    assert exp_list.total_between(dt.date(2025, 1, 1),
+                                  dt.date(2025, 1, 2)) == 1 + 2
+    assert exp_list.total_between(dt.date(2025, 2, 1),
+                                  dt.date(2025, 3, 1)) == 0
+
+def test_view_by_date_index(exp_list, capsys):
+    exp_list.add(Expense(1, Category.FOOD, "late", dt.date(2025, 3, 1)))
+    exp_list.add(Expense(2, Category.FOOD, "early", dt.date(2025, 1, 1)))
+    exp_list.add(Expense(4, Category.FOOD, "mid", dt.date(2025, 2, 1)))
+    exp_list.view_by_date(dt.date(2025, 1, 1), dt.date(2025, 2, 1))
+    out = capsys.readouterr().out
+    assert "late" not in out
+    assert out.index("early") < out.index("mid")
+    assert "Expenses between 2025-01-01 and 2025-02-01: 6.0" in out
+
+def test_total_between_from_json(exp_list, tmp_path):
+    for d in [20, 10, 15]:
+        exp_list.add(Expense(d, Category.FOOD, "x", dt.date(2025, 1, d)))
+    exp_list.to_json(tmp_path)
+    result = ExpenseList.from_json(tmp_path / "exp.json")
+    assert result.total_between(dt.date(2025, 1, 10),
+                                dt.date(2025, 1, 15)) == 25
+
+def test_expense_list_from_jsonl(exp, exp_list, tmp_path):
+    exp_list.add(exp)
+    exp_list.to_jsonl(tmp_path)
+    result = ExpenseList.from_jsonl(tmp_path / "exp.jsonl")
+    assert exp_list == result
+
+def test_expense_list_to_jsonl_appends(exp, exp_list, tmp_path):
+    store_path = tmp_path / "exp.jsonl"
+    exp_list.add(exp)
+    exp_list.to_jsonl(tmp_path)
+    first_line = store_path.read_text()
+    exp_list.add(Expense(5, Category.RENT, "rent", TEST_DATE))
+    exp_list.to_jsonl(tmp_path)
+    lines = store_path.read_text().splitlines()
+    assert len(lines) == 2
+    assert lines[0] + "\n" == first_line
+
+def test_expense_list_to_jsonl_foreign_file(exp, exp_list, tmp_path):
+    store_path = tmp_path / "exp.jsonl"
+    store_path.write_text("")
+    exp_list.add(exp)
+    exp_list.to_jsonl(tmp_path)
+    assert store_path.read_text() == ""
+
+def test_iter_jsonl(exp, tmp_path):
+    store_path = tmp_path / "exp.jsonl"
+    ExpenseList.append_jsonl(store_path, exp)
+    ExpenseList.append_jsonl(store_path, exp)
+    g = ExpenseList.iter_jsonl(store_path)
+    assert next(g) == exp
+    assert next(g) == exp
+    with pytest.raises(StopIteration):
+        next(g)
+
+def test_from_jsonl_torn_last_line(exp, tmp_path, capsys):
+    store_path = tmp_path / "exp.jsonl"
+    ExpenseList.append_jsonl(store_path, exp)
+    with open(store_path, "a") as f:
+        f.write('{"amount": 2, "categ')
+    assert list(ExpenseList.from_jsonl(store_path).exp_list) == [exp]
+    assert "torn last line 2" in capsys.readouterr().out
+
+    ExpenseList.append_jsonl(store_path, exp)
+    assert list(ExpenseList.from_jsonl(store_path).exp_list) == [exp, exp]
+
+def test_append_jsonl_keeps_unterminated_record(exp, tmp_path):
+    store_path = tmp_path / "exp.jsonl"
+    store_path.write_text(exp.to_json())
+    ExpenseList.append_jsonl(store_path, exp)
+    assert list(ExpenseList.from_jsonl(store_path).exp_list) == [exp, exp]
+
+def test_from_jsonl_invalid(tmp_path):
+    store_path = tmp_path / "exp.jsonl"
+    store_path.write_text('{"amount": 1}\n')
+    assert ExpenseList.from_jsonl(store_path) is None
+
+def test_import_csv_bad_rows(exp_list, tmp_path):
+    store_path = tmp_path / "exp.csv"
+    store_path.write_text("amount,category,desc,date\n"
+                          "10,food,ok,2025-01-02\n"
+                          "-5,food,negative,2025-01-02\n"
+                          "x,food,not a number,2025-01-02\n"
+                          "1,cars,unknown,2025-01-02\n"
+                          "1,food,bad date,2025-13-40\n"
+                          "2.5,rent,,None\n")
+    skipped = exp_list.import_csv(store_path)
+    assert [line for line, _ in skipped] == [3, 4, 5, 6]
+    assert len(exp_list) == 2
+    assert exp_list.exp_list[1] == Expense(2.5, Category.RENT, "")
+    assert exp_list.check_totals()
+
+def test_import_csv_appends(exp, exp_list, tmp_path):
+    exp_list.add(exp)
+    exp_list.to_csv(tmp_path)
+    exp_list.import_csv(tmp_path / "exp.csv")
+    assert list(exp_list.exp_list) == [exp, exp]
+    assert exp_list.total_between(TEST_DATE, TEST_DATE) == 2 * TEST_AMOUNT
+
+def test_import_csv_invalid_columns(exp_list, tmp_path):
+    store_path = tmp_path / "exp.csv"
+    store_path.write_text("a,b\n1,2\n")
+    assert exp_list.import_csv(store_path) is None
+    assert ExpenseList.from_csv(store_path) is None
+
+@pytest.fixture
+def csv_path(exp_list, tmp_path):
+    for i in range(25):
+        exp_list.add(Expense(i, list(STR_TO_CAT.values())[i % 3], f"d{i % 4}",
+                             dt.date(2025, 1, 1 + i)))
+    exp_list.to_csv(tmp_path, chunk_size=7)
+    return tmp_path / "exp.csv"
+
+def test_to_csv_chunked(exp_list, csv_path):
+    assert csv_path.read_text().count("amount") == 1
+    assert ExpenseList.from_csv(csv_path) == exp_list
+
+def test_iter_csv(exp_list, csv_path):
+    chunks = [c for c, _ in ExpenseList.iter_csv(csv_path, chunk_size=10)]
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert [x for c in chunks for x in c.exp_list] == list(exp_list.exp_list)
+
+def test_summarize_csv(exp_list, csv_path):
+    summary = ExpenseList.summarize_csv(csv_path, chunk_size=4)
+    assert summary["rows"] == 25
+    assert summary["total"] == exp_list.totals()["total"]
+    assert summary["by_cat"] == exp_list.totals()["by_cat"]
+
+def test_summarize_csv_dates(csv_path):
+    summary = ExpenseList.summarize_csv(csv_path, dt.date(2025, 1, 1),
+                                        dt.date(2025, 1, 3), chunk_size=2)
+    assert summary["rows"] == 3
+    assert summary["total"] == 0 + 1 + 2
+
+def test_filter_csv(exp_list, csv_path):
+    result = ExpenseList.filter_csv(csv_path, dt.date(2025, 1, 5),
+                                    dt.date(2025, 1, 20), chunk_size=3)
+    assert result == exp_list.filter_by_date(dt.date(2025, 1, 5),
+                                             dt.date(2025, 1, 20))
+    assert len(result) == 16
+
+def test_no_pandas_for_add_total_json(tmp_path):
+    code = ("import sys, pathlib as pl\n"
+            "from fintrack.expense import Expense, ExpenseList, Category\n"
+            "exp = ExpenseList()\n"
+            "exp.add(Expense(1, Category.FOOD, 'x'))\n"
+            "exp._total_expenses()\n"
+            f"exp.to_json(pl.Path({str(tmp_path)!r}))\n"
+            f"new = ExpenseList.from_json(pl.Path({str(tmp_path)!r}) / 'exp.json')\n"
+            "assert new == exp\n"
+            "new.add(Expense(2, Category.RENT, 'y'))\n"
+            "assert new.total() == 3 and new.total(cat=Category.FOOD) == 1\n"
+            "assert 'pandas' not in sys.modules\n"
+            "assert 'numpy' not in sys.modules\n")
+    src = pl.Path(__file__).parent.parent
+    subprocess.run([sys.executable, "-c", code], cwd=src, check=True)
+
+def test_expense_immutable(exp):
+    with pytest.raises(AttributeError):
+        exp.amount = 5
+    with pytest.raises(AttributeError):
+        exp.note = "new attribute"
+
+def test_expense_hash(exp):
+    tmp_exp = Expense(TEST_AMOUNT, TEST_CAT, TEST_DESC, TEST_DATE)
+    assert hash(exp) == hash(tmp_exp)
+    assert len({exp, tmp_exp}) == 1
+
+def test_expense_to_json_cached(exp):
+    assert exp.to_json() is exp.to_json()
+    assert Expense.from_dict(json.loads(exp.to_json())) == exp
+
+def test_expense_to_dict_copy(exp):
+    exp.to_dict()["amount"] = -1
+    assert exp.to_dict()["amount"] == TEST_AMOUNT
+
+def test_to_json_existing_not_overwritten(exp, exp_list, tmp_path):
+    store_path = tmp_path / "exp.json"
+    store_path.write_text("keep")
+    exp_list.add(exp)
+    exp_list.to_json(tmp_path)
+    assert store_path.read_text() == "keep"
+
+def test_save_atomic(exp, exp_list, tmp_path):
+    exp_list.add(exp)
+    for suffix in [".json", ".csv", ".jsonl", ".ftb"]:
+        store_path = tmp_path / f"ledger{suffix}"
+        store_path.write_text("old")
+        assert exp_list.save(store_path)
+        assert ExpenseList.load(store_path) == exp_list
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "ledger.csv", "ledger.ftb", "ledger.json", "ledger.jsonl"]
+
+def test_from_files_parallel(tmp_path):
+    files = []
+    for month in (3, 1, 2):
+        new = ExpenseList()
+        for day in (20, 5):
+            new.add(Expense(month * 100 + day, TEST_CAT, TEST_DESC,
+                            dt.date(2025, month, day)))
+        files.append(new)
+    files[0].save(tmp_path / "a.csv")
+    files[1].save(tmp_path / "b.json")
+    files[2].save(tmp_path / "c.jsonl")
+    (tmp_path / "d.json").write_text("{")
+    (tmp_path / "e.jsonl").write_text('{"amount": 1}\n')
+    (tmp_path / "f.ftb").write_bytes(b"junk")
+
+    result, reports = ExpenseList.from_files(tmp_path, workers=2)
+    assert [r["rows"] for r in reports] == [2, 2, 2, 0, 0, 0]
+    assert "Expecting property name" in reports[3]["error"]
+    assert reports[4]["error"] == "Invalid record on line 1."
+    assert reports[5]["error"] == "File too short."
+    expected = ExpenseList()
+    for new in files:
+        expected.extend(new)
+    assert result == expected
+
+    result, _ = ExpenseList.from_files(str(tmp_path / "*.json*"), by_date=True)
+    assert [x.date.month for x in result.exp_list] == [1, 1, 2, 2]
+    assert [x.date.day for x in result.exp_list] == [5, 20, 5, 20]
+
+def test_json_dictionary_encoded(tmp_path):
+    exp_list = ExpenseList([Expense(i, Category.RENT if i % 2 else TEST_CAT,
+                                    "rent" if i % 2 else TEST_DESC,
+                                    None if i == 3 else TEST_DATE)
+                            for i in range(10)])
+    exp_list.to_json(tmp_path)
+    doc = json.loads((tmp_path / "exp.json").read_text())
+    assert doc["descs"] == [TEST_DESC, "rent"]
+    assert doc["categories"] == ["rent", "food"]
+    assert doc["date"][3] is None
+    assert ExpenseList.from_json(tmp_path / "exp.json") == exp_list
+
+    legacy = tmp_path / "legacy.json"
+    legacy.write_text(json.dumps(exp_list.to_dict()))
+    assert ExpenseList.from_json(legacy) == exp_list
+    assert (tmp_path / "exp.json").stat().st_size < legacy.stat().st_size
+
+def test_json_encoded_invalid(tmp_path):
+    exp_list = ExpenseList([Expense(1, TEST_CAT, TEST_DESC, TEST_DATE)])
+    doc = exp_list.to_encoded()
+    doc["desc"] = [5]
+    store_path = tmp_path / "bad.json"
+    store_path.write_text(json.dumps(doc))
+    assert ExpenseList.from_json(store_path) is None
+
+def test_description_table(exp):
+    exp_list = ExpenseList([exp] * 3 + [Expense(1, TEST_CAT, "other")])
+    assert list(exp_list.descriptions) == [TEST_DESC, "other"]
+    assert exp_list.filter_by_cat(TEST_CAT).descriptions == [TEST_DESC, "other"]
+
+def test_rollup_kept_on_add(exp, exp_list):
+    exp_list.add(exp)
+    assert exp_list.rollup("week") == {dt.date(2025, 6, 9) : TEST_AMOUNT}
+    exp_list.add(Expense(5, Category.RENT, "rent", dt.date(2025, 6, 11)))
+    exp_list.add(Expense(7, Category.RENT, "rent", dt.date(2025, 1, 1)))
+    assert exp_list.rollup("week") == {dt.date(2024, 12, 30) : 7,
+                                       dt.date(2025, 6, 9) : TEST_AMOUNT + 5}
+    assert exp_list.rollup("week", by_cat=True)[dt.date(2025, 6, 9)][Category.RENT] == 5
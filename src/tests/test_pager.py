@@ -0,0 +1,60 @@
+from fintrack.pager import Pager
+from fintrack.expense import ExpenseList, Expense, Category
+import datetime as dt
+import pytest
+
+@pytest.fixture
+def exp():
+    # dates run backwards, so date order is the reverse of insertion order
+    return ExpenseList([Expense(i, Category.FOOD, f"item {i}",
+                                dt.date(2025, 1, 25 - i) if i else None)
+                        for i in range(25)])
+
+def test_pages(exp):
+    pager = Pager(exp, page_rows=10)
+    assert pager.pages == 3
+    assert pager.rows() == list(range(10))
+    assert pager.next() and pager.next()
+    assert pager.rows() == list(range(20, 25))
+    assert not pager.next()
+    assert pager.page == 2
+    assert pager.prev() and pager.page == 1
+    pager.first()
+    assert not pager.prev()
+    assert not pager.go(3)
+
+def test_by_date(exp):
+    pager = Pager(exp, page_rows=10, by_date=True)
+    assert pager.rows() == [0] + list(range(24, 15, -1))
+
+def test_jump_to_date(exp):
+    pager = Pager(exp, page_rows=10)
+    assert pager.jump_to_date(dt.date(2025, 1, 10))
+    assert pager.page == 0
+    pager.sort_by_date()
+    assert pager.jump_to_date(dt.date(2025, 1, 10))
+    assert 15 in pager.rows()
+    assert pager.page == 1
+    assert not pager.jump_to_date(dt.date(2026, 1, 1))
+    assert pager.page == 1
+
+def test_render(exp):
+    pager = Pager(exp, page_rows=10)
+    pager.last()
+    text = pager.render()
+    assert "item 24" in text and "item 19" not in text
+    assert "2025-01-01" in text
+    assert "Page 3 of 3 (25 expenses, insertion order)" in text
+    assert Pager(ExpenseList()).render() == "No expenses."
+
+def test_render_after_add(exp):
+    pager = Pager(exp, page_rows=10)
+    pager.last()
+    exp.add(Expense(1, Category.RENT, "new", None))
+    assert "new" in pager.render()
+
+def test_mapped(exp, tmp_path):
+    exp.to_bin(tmp_path)
+    mapped = ExpenseList.from_bin(tmp_path / "exp.ftb")
+    pager = Pager(mapped, page_rows=10, by_date=True)
+    assert pager.render() == Pager(exp, page_rows=10, by_date=True).render()
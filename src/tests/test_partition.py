@@ -0,0 +1,119 @@
+from fintrack.expense import ExpenseList, Expense, Category
+from fintrack.partition import PartitionedLedger, MANIFEST, UNDATED
+from fintrack import batch
+import datetime as dt
+import pytest
+
+def ledger():
+    exp = ExpenseList()
+    for month in (1, 2, 3):
+        for day in (1, 15, 28):
+            exp.add(Expense(month * 10 + day, Category.FOOD, f"m{month}",
+                            dt.date(2025, month, day)))
+    exp.add(Expense(5, Category.RENT, "undated", None))
+    return exp
+
+def test_partition_save_load(tmp_path):
+    exp = ledger()
+    written = PartitionedLedger(tmp_path).save(exp)
+    assert written == [UNDATED, "2025-01", "2025-02", "2025-03"]
+    assert (tmp_path / MANIFEST).exists()
+
+    parts = PartitionedLedger(tmp_path)
+    info = parts.partitions["2025-02"]
+    assert info["rows"] == 3
+    assert info["min"] == "2025-02-01" and info["max"] == "2025-02-28"
+    assert info["by_cat"]["FOOD"] == info["total"] == 20 * 3 + 1 + 15 + 28
+
+    result = parts.load()
+    assert sorted(result.exp_list, key=hash) == sorted(exp.exp_list, key=hash)
+
+def test_partition_pruning(tmp_path):
+    exp = ledger()
+    PartitionedLedger(tmp_path).save(exp)
+
+    parts = PartitionedLedger(tmp_path)
+    f, t = dt.date(2025, 2, 10), dt.date(2025, 2, 20)
+    result = parts.load(f, t)
+    assert parts.files_read == 1
+    assert list(result.exp_list) == list(exp.select(f, t).exp_list)
+
+    parts = PartitionedLedger(tmp_path)
+    assert parts.total(dt.date(2025, 1, 1), dt.date(2025, 3, 1)) == \
+            exp.total_between(dt.date(2025, 1, 1), dt.date(2025, 3, 1))
+    assert parts.files_read == 1
+
+    parts = PartitionedLedger(tmp_path)
+    assert parts.total() == exp._total_expenses()
+    assert parts.totals_by_cat()[Category.RENT] == 5
+    assert parts.files_read == 0
+
+def test_partition_rewrites_changed(tmp_path):
+    exp = ledger()
+    PartitionedLedger(tmp_path).save(exp)
+
+    exp.add(Expense(1, Category.HEALTH, "new", dt.date(2025, 3, 2)))
+    assert PartitionedLedger(tmp_path).save(exp) == ["2025-03"]
+
+    dropped = exp.select(dt.date(2025, 2, 1), dt.date(2025, 3, 31))
+    assert PartitionedLedger(tmp_path).save(dropped) == []
+    assert not (tmp_path / "2025-01.ftb").exists()
+    assert PartitionedLedger(tmp_path).total() == dropped._total_expenses()
+
+def test_batch_partitioned(tmp_path, capsys):
+    PartitionedLedger(tmp_path).save(ledger())
+    assert batch.run(["add", str(tmp_path), "--amount", "7",
+                      "--category", "food", "--date", "2025-04-01"]) == 0
+    assert "2025-04" in PartitionedLedger(tmp_path).partitions
+
+    capsys.readouterr()
+    assert batch.run(["total", str(tmp_path), "--from", "2025-04-01"]) == 0
+    assert float(capsys.readouterr().out) == pytest.approx(7)
+
+def test_partition_before_1970(tmp_path):
+    exp = ExpenseList([Expense(1, Category.FOOD, "a", dt.date(1965, 3, 4)),
+                       Expense(2, Category.FOOD, "b", dt.date(1969, 12, 31)),
+                       Expense(3, Category.RENT, "c", None),
+                       Expense(4, Category.FOOD, "d", dt.date(2024, 1, 1))])
+    written = PartitionedLedger(tmp_path).save(exp)
+    assert sorted(written) == sorted([UNDATED, "1965-03", "1969-12", "2024-01"])
+
+    parts = PartitionedLedger(tmp_path)
+    result = parts.load()
+    assert sorted(result.exp_list, key=hash) == sorted(exp.exp_list, key=hash)
+    assert parts.total(dt.date(1969, 1, 1), dt.date(1969, 12, 31)) == 2
+
+def test_partition_digest_ignores_other_descriptions(tmp_path):
+    exp = ledger()
+    PartitionedLedger(tmp_path).save(exp)
+
+    exp.add(Expense(1, Category.HEALTH, "brand new", dt.date(2025, 3, 2)))
+    assert PartitionedLedger(tmp_path).save(exp) == ["2025-03"]
+
+    exp = ledger()
+    exp.add(Expense(1, Category.HEALTH, "m1", dt.date(2025, 1, 2)))
+    parts = PartitionedLedger(tmp_path)
+    assert parts.save(exp) == ["2025-01", "2025-03"]
+
+def test_partition_save_period(tmp_path):
+    exp = ledger()
+    PartitionedLedger(tmp_path).save(exp)
+
+    f, t = dt.date(2025, 2, 10), dt.date(2025, 3, 1)
+    period = PartitionedLedger(tmp_path).load(f, t)
+    assert len(period) == 3
+    period.add(Expense(2, Category.HEALTH, "in", dt.date(2025, 2, 20)))
+    period.add(Expense(3, Category.HEALTH, "out", dt.date(2025, 1, 2)))
+    written = PartitionedLedger(tmp_path).save(period)
+    assert sorted(written) == ["2025-01", "2025-02", "2025-03"]
+
+    result = PartitionedLedger(tmp_path).load()
+    assert len(result) == len(exp) + 2
+    assert result.total() == exp.total() + 5
+    assert set(PartitionedLedger(tmp_path).partitions) == \
+            {UNDATED, "2025-01", "2025-02", "2025-03"}
+
+    PartitionedLedger(tmp_path / "other").save(ledger())
+    with pytest.raises(ValueError):
+        PartitionedLedger(tmp_path / "other").save(period)
+    assert PartitionedLedger(tmp_path / "new").save(period)
@@ -0,0 +1,149 @@
+from fintrack.server import LedgerServer
+from fintrack.expense import ExpenseList, Expense, Category
+from fintrack import batch
+import asyncio
+import datetime as dt
+import http.client
+import json
+import pathlib as pl
+import pytest
+import signal
+import subprocess
+import sys
+
+@pytest.fixture
+def srv():
+    exp = ExpenseList([Expense(10, Category.FOOD, "lunch", dt.date(2025, 1, 5)),
+                       Expense(500, Category.RENT, "rent", dt.date(2025, 2, 1)),
+                       Expense(3, Category.FOOD, "coffee")])
+    return LedgerServer(exp, port=0)
+
+def test_totals(srv):
+    assert srv.dispatch("GET", "/totals") == (200, {"total" : 513})
+    assert srv.dispatch("GET", "/totals?category=food") == (200, {"total" : 13})
+    assert srv.dispatch("GET", "/totals?from=2025-01-01&to=2025-01-31") == \
+            (200, {"total" : 10})
+    assert srv.dispatch("GET", "/totals?to=2025-02-01&category=rent") == \
+            (200, {"total" : 500})
+
+def test_expenses(srv):
+    status, doc = srv.dispatch("GET", "/expenses?category=food&limit=1&offset=1")
+    assert status == 200
+    assert doc["count"] == 2
+    assert doc["expenses"] == [{"amount" : 3, "category" : "food",
+                                "desc" : "coffee", "date" : "None"}]
+
+def test_post(srv):
+    body = json.dumps({"amount" : 7.5, "category" : "health", "date" : "2025-03-01"})
+    assert srv.dispatch("POST", "/expenses", body.encode()) == (201, {"row" : 3})
+    assert srv.exp.exp_list[3] == Expense(7.5, Category.HEALTH, "", dt.date(2025, 3, 1))
+    assert srv.dispatch("GET", "/summary")[1]["by_cat"]["health"] == 7.5
+
+def test_summary_rollup(srv):
+    status, doc = srv.dispatch("GET", "/summary")
+    assert doc["total"] == 513 and doc["by_cat"]["rent"] == 500
+    status, doc = srv.dispatch("GET", "/rollup?period=month&by_cat=1")
+    assert list(doc) == ["2025-01", "2025-02"]
+    assert doc["2025-02"]["rent"] == 500
+    assert srv.dispatch("GET", "/rollup?period=year")[1] == {"2025" : 510}
+
+@pytest.mark.parametrize("method, target, body, status", [
+        ("GET", "/nowhere", b"", 404),
+        ("DELETE", "/expenses", b"", 405),
+        ("GET", "/totals?from=2025-13-01", b"", 400),
+        ("GET", "/totals?category=cars", b"", 400),
+        ("GET", "/expenses?limit=-1", b"", 400),
+        ("GET", "/rollup?period=decade", b"", 400),
+        ("POST", "/expenses", b"{", 400),
+        ("POST", "/expenses", b'{"amount": -1, "category": "food"}', 400),
+        ("POST", "/expenses", b'{"amount": "1", "category": "food"}', 400),
+        ("POST", "/expenses", b'{"amount": NaN, "category": "food"}', 400),
+        ("POST", "/expenses", b'{"amount": Infinity, "category": "food"}', 400),
+        ("POST", "/expenses", b"[]", 400)
+        ])
+def test_errors(srv, method, target, body, status):
+    code, doc = srv.dispatch(method, target, body)
+    assert code == status
+    assert "error" in doc
+
+def test_keep_alive(srv):
+    async def client():
+        port = await srv.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        docs = []
+        for target in ("/totals", "/summary"):
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+            status = await reader.readline()
+            headers = {}
+            while (line := await reader.readline()) != b"\r\n":
+                k, _, v = line.decode().partition(":")
+                headers[k.lower()] = v.strip()
+            docs.append((status, json.loads(await reader.readexactly(
+                    int(headers["content-length"])))))
+        writer.close()
+        srv.close()
+        return docs
+
+    docs = asyncio.run(client())
+    assert docs[0] == (b"HTTP/1.1 200 OK\r\n", {"total" : 513})
+    assert docs[1][1]["total"] == 513
+
+def test_long_line(srv):
+    async def client():
+        port = await srv.start()
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /totals?x=" + b"a" * 70_000 + b" HTTP/1.1\r\n\r\n")
+        response = await reader.read()
+        writer.close()
+        srv.close()
+        return response
+
+    response = asyncio.run(client())
+    assert response.startswith(b"HTTP/1.1 431 ")
+    assert b"Connection: close" in response
+
+def serve(path):
+    src = pl.Path(__file__).resolve().parents[1]
+    proc = subprocess.Popen([sys.executable, "-m", "fintrack", "serve", str(path),
+                             "--port", "0"],
+                            cwd=path.parent, stdout=subprocess.PIPE, text=True,
+                            env={"PYTHONPATH" : str(src)})
+    port = int(proc.stdout.readline().rsplit(":", 1)[1])
+    return proc, http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+
+def post(conn):
+    conn.request("POST", "/expenses", json.dumps({"amount" : 2, "category" : "food"}))
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+@pytest.mark.parametrize("stop", [signal.SIGINT, signal.SIGTERM])
+def test_serve_command(tmp_path, stop):
+    path = tmp_path / "exp.json"
+    ExpenseList([Expense(1, Category.FOOD, "x")]).save(path)
+    proc, conn = serve(path)
+    try:
+        assert post(conn) == 201
+        conn.close()
+    finally:
+        proc.send_signal(stop)
+        proc.wait(timeout=10)
+    assert proc.returncode == 0
+    assert len(ExpenseList.load(path)) == 2
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".db"])
+def test_serve_writes_adds_at_once(tmp_path, suffix):
+    path = tmp_path / f"exp{suffix}"
+    assert batch.run(["add", str(path), "--amount", "1", "--category", "food"]) == 0
+    proc, conn = serve(path)
+    try:
+        assert post(conn) == 201
+        assert post(conn) == 201
+        conn.close()
+    finally:
+        proc.kill()
+        proc.wait(timeout=10)
+    ledger = batch._open(path)
+    assert len(ledger) == 3
+    if suffix == ".db":
+        ledger.close()
@@ -0,0 +1,97 @@
+from fintrack.shared import SharedLedger, SharedLedgerError
+from fintrack.expense import ExpenseList
+from fintrack import batch
+from tests.helpers import expense
+import multiprocessing
+import pytest
+
+def append_many(path, first: int, n: int) -> None:
+    exp = SharedLedger.open(path)
+    for i in range(first, first + n):
+        exp.add(expense(i))
+    exp.journal.close()
+
+def batch_append_many(path, first: int, n: int) -> None:
+    for i in range(first, first + n):
+        new = ExpenseList()
+        new.add(expense(i))
+        batch.append(path, new)
+
+def test_open_creates(tmp_path):
+    exp = SharedLedger.open(tmp_path / "shared.jsonl")
+    assert len(exp) == 0
+    assert (tmp_path / "shared.jsonl").exists()
+    exp.journal.close()
+    assert exp.journal is None
+
+def test_readers_tail(tmp_path):
+    path = tmp_path / "shared.jsonl"
+    a = SharedLedger.open(path)
+    b = SharedLedger.open(path)
+    a.add(expense(1))
+    a.add(expense(2))
+    assert b.journal.refresh() == 2
+    assert b.journal.refresh() == 0
+    assert list(b.exp_list) == list(a.exp_list)
+
+    offset = b.journal.offset
+    b.add(expense(3))
+    assert b.journal.offset == path.stat().st_size > offset
+    assert a.journal.refresh() == 1
+    assert a.exp_list[2] == expense(3)
+    assert ExpenseList.from_jsonl(path) == a
+
+def test_writer_picks_up_others(tmp_path):
+    path = tmp_path / "shared.jsonl"
+    a = SharedLedger.open(path)
+    b = SharedLedger.open(path)
+    a.add(expense(1))
+    b.add(expense(2))
+    assert len(b) == 1
+    assert b.journal.refresh() == 1
+    assert sorted(x.amount for x in b.exp_list) == [1, 2]
+    assert len(SharedLedger.open(path)) == 2
+
+def test_torn_line(tmp_path):
+    path = tmp_path / "shared.jsonl"
+    path.write_text(expense(1).to_json() + "\n" + '{"amount": 2, "cat')
+    exp = SharedLedger.open(path)
+    assert len(exp) == 1
+    exp.add(expense(3))
+    assert [x.amount for x in SharedLedger.open(path).exp_list] == [1, 3]
+
+def test_truncated(tmp_path):
+    path = tmp_path / "shared.jsonl"
+    exp = SharedLedger.open(path)
+    exp.add(expense(1))
+    path.write_text("")
+    with pytest.raises(SharedLedgerError):
+        exp.journal.refresh()
+
+def test_concurrent_writers(tmp_path):
+    path = tmp_path / "shared.jsonl"
+    workers = [multiprocessing.Process(target=append_many, args=(path, k * 100, 50))
+               for k in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert all(w.exitcode == 0 for w in workers)
+
+    exp = SharedLedger.open(path)
+    assert sorted(x.amount for x in exp.exp_list) == \
+            sorted(k * 100 + i for k in range(4) for i in range(50))
+
+def test_concurrent_batch_appends(tmp_path):
+    path = tmp_path / "shared.jsonl"
+    workers = [multiprocessing.Process(target=target, args=(path, k * 100, 50))
+               for k, target in enumerate([append_many, batch_append_many] * 2)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert all(w.exitcode == 0 for w in workers)
+
+    exp = ExpenseList.from_jsonl(path)
+    assert sorted(x.amount for x in exp.exp_list) == \
+            sorted(k * 100 + i for k in range(4) for i in range(50))
@@ -0,0 +1,41 @@
+from fintrack.expense import ExpenseList, Expense, Category
+from fintrack import stats
+import datetime as dt
+import pytest
+
+@pytest.fixture
+def recording():
+    stats.reset()
+    stats.enable()
+    yield
+    stats.enable(False)
+    stats.reset()
+
+def ledger():
+    return ExpenseList([Expense(i, Category.FOOD, "x", dt.date(2025, 1, 1 + i))
+                        for i in range(10)])
+
+def test_stats_disabled(tmp_path):
+    stats.reset()
+    ledger().save(tmp_path / "exp.json")
+    assert stats.report() == {}
+
+def test_stats_load_save(recording, tmp_path):
+    path = tmp_path / "exp.json"
+    ledger().save(path)
+    ExpenseList.from_json(path)
+    ops = stats.report()
+    assert ops["save"]["bytes"] == path.stat().st_size
+    assert ops["from_json"] == {"calls" : 1, "seconds" : ops["from_json"]["seconds"],
+                                "rows" : 10, "bytes" : path.stat().st_size}
+
+def test_stats_view_phases(recording, capsys):
+    exp = ledger()
+    exp.view_by_date(dt.date(2025, 1, 1), dt.date(2025, 1, 5))
+    ops = stats.report()
+    assert ops["view_by_date.to_df"]["rows"] == 5
+    for op in ("view_by_date", "view_by_date.select", "view_by_date.print"):
+        assert ops[op]["calls"] == 1
+
+    stats.print_report()
+    assert "view_by_date.print" in capsys.readouterr().out
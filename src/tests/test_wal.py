@@ -0,0 +1,94 @@
+from fintrack.expense import ExpenseList
+from fintrack.wal import Journal, JournalError, JOURNAL, SNAPSHOT
+from tests.helpers import expense
+import pytest
+
+def test_journal_recover(tmp_path):
+    exp = Journal.open(tmp_path, group_commit=4)
+    for i in range(10):
+        exp.add(expense(i))
+    exp.journal.close()
+
+    result = Journal.open(tmp_path)
+    assert list(result.exp_list) == [expense(i) for i in range(10)]
+    assert result.check_totals()
+    result.journal.close()
+
+def test_journal_group_commit(tmp_path):
+    exp = Journal.open(tmp_path, group_commit=3)
+    journal = tmp_path / JOURNAL
+    size = journal.stat().st_size
+    exp.add(expense(1))
+    exp.add(expense(2))
+    assert journal.stat().st_size == size
+    exp.add(expense(3))
+    assert len(journal.read_text().splitlines()) == 4
+    exp.journal.close()
+
+def test_journal_compact(tmp_path):
+    exp = Journal.open(tmp_path, group_commit=1, compact_every=5)
+    for i in range(12):
+        exp.add(expense(i))
+    assert (tmp_path / SNAPSHOT).exists()
+    assert len((tmp_path / JOURNAL).read_text().splitlines()) == 1 + 2
+    exp.journal.close()
+
+    result = Journal.open(tmp_path)
+    assert result == exp
+    result.journal.close()
+
+def test_journal_crash_after_snapshot(tmp_path):
+    exp = Journal.open(tmp_path, group_commit=1, compact_every=0)
+    for i in range(6):
+        exp.add(expense(i))
+    # snapshot written, but the journal was not restarted after it
+    exp.save(tmp_path / SNAPSHOT)
+    exp.add(expense(6))
+    exp.journal.close()
+
+    result = Journal.open(tmp_path)
+    assert list(result.exp_list) == [expense(i) for i in range(7)]
+    result.journal.close()
+
+def test_journal_torn_tail(tmp_path):
+    exp = Journal.open(tmp_path, group_commit=1)
+    exp.add(expense(1))
+    exp.journal.close()
+    with open(tmp_path / JOURNAL, "a") as f:
+        f.write('{"amount": 2, "categ')
+
+    result = Journal.open(tmp_path)
+    assert list(result.exp_list) == [expense(1)]
+    result.add(expense(2))
+    result.journal.close()
+    result = Journal.open(tmp_path)
+    assert list(result.exp_list) == [expense(1), expense(2)]
+    result.journal.close()
+
+def test_journal_corrupt(tmp_path):
+    exp = Journal.open(tmp_path, group_commit=1)
+    exp.add(expense(1))
+    exp.add(expense(2))
+    exp.journal.close()
+    lines = (tmp_path / JOURNAL).read_text().splitlines()
+    lines[1] = "garbage"
+    (tmp_path / JOURNAL).write_text("\n".join(lines) + "\n")
+    with pytest.raises(JournalError):
+        Journal.open(tmp_path)
+
+def test_journal_import(tmp_path):
+    src = ExpenseList([expense(i) for i in range(3)])
+    src.to_csv(tmp_path)
+    exp = Journal.open(tmp_path / "ledger")
+    exp.import_csv(tmp_path / "exp.csv")
+    exp.journal.close()
+    assert Journal.open(tmp_path / "ledger") == src
+
+def test_journal_open_existing_only(tmp_path):
+    with pytest.raises(JournalError):
+        Journal.open(tmp_path / "ledger", create=False)
+    assert not (tmp_path / "ledger").exists()
+    Journal.open(tmp_path / "ledger").journal.close()
+    exp = Journal.open(tmp_path / "ledger", create=False)
+    assert exp == ExpenseList()
+    exp.journal.close()